@@ -5,136 +5,2855 @@ Extrai dados dos arquivos JTL do JMeter e gera visualizações avançadas
 """
 
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
 from pathlib import Path
 import xml.etree.ElementTree as ET
 from datetime import datetime
+import argparse
+import copy
+import cProfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+import importlib.util
+import io
+import json
+import os
+import pstats
+import re
+import shutil
+import sqlite3
+import sys
+import time
+import tracemalloc
 import warnings
+import zlib
 warnings.filterwarnings('ignore')
 
-# Configurações de estilo profissional
-sns.set_style("whitegrid")
-sns.set_palette("husl")
-plt.rcParams['figure.dpi'] = 300
-plt.rcParams['savefig.dpi'] = 300
-plt.rcParams['font.size'] = 10
-plt.rcParams['axes.titlesize'] = 12
-plt.rcParams['axes.titleweight'] = 'bold'
-plt.rcParams['figure.titlesize'] = 14
-plt.rcParams['figure.titleweight'] = 'bold'
+def _importar_script(nome_arquivo, nome_modulo):
+    """Importa um script do diretório (os nomes com hífen não são importáveis)"""
+    spec = importlib.util.spec_from_file_location(nome_modulo, Path(__file__).resolve().parent / nome_arquivo)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+plano_jmx = _importar_script('plano-jmx.py', 'plano_jmx')
+
+_bibliotecas_graficas = {}
+
+def _carregar_bibliotecas_graficas():
+    """Importa matplotlib/seaborn e aplica o estilo, uma única vez"""
+    if not _bibliotecas_graficas:
+        with etapa_perfil('importar_matplotlib'):
+            import matplotlib.pyplot as pyplot
+            import seaborn
+        
+        # Configurações de estilo profissional
+        seaborn.set_style("whitegrid")
+        seaborn.set_palette("husl")
+        pyplot.rcParams['figure.dpi'] = 300
+        pyplot.rcParams['savefig.dpi'] = 300
+        pyplot.rcParams['font.size'] = 10
+        pyplot.rcParams['axes.titlesize'] = 12
+        pyplot.rcParams['axes.titleweight'] = 'bold'
+        pyplot.rcParams['figure.titlesize'] = 14
+        pyplot.rcParams['figure.titleweight'] = 'bold'
+        _bibliotecas_graficas.update(plt=pyplot, sns=seaborn)
+    return _bibliotecas_graficas
+
+class _BibliotecaGrafica:
+    """Adia o import de matplotlib/seaborn até o primeiro uso (o modo metricas nunca os importa)"""
+    
+    def __init__(self, nome):
+        """Referência preguiçosa para 'plt' ou 'sns'"""
+        self._nome = nome
+    
+    def __getattr__(self, atributo):
+        """Carrega as bibliotecas na primeira consulta de atributo"""
+        return getattr(_carregar_bibliotecas_graficas()[self._nome], atributo)
+
+plt = _BibliotecaGrafica('plt')
+sns = _BibliotecaGrafica('sns')
+
+ARQUIVO_PADRAO = Path(__file__).resolve().parent.parent / 'jmeter' / 'resultados.jtl'
+ARQUIVO_JMX_PADRAO = Path(__file__).resolve().parent.parent / 'jmeter' / 'teste-carga.jmx'
+
+# Leitura em streaming: apenas as colunas necessárias, com tipos fixos
+COLUNAS_STREAMING = {
+    'timeStamp': 'int64',
+    'elapsed': 'int32',
+    'label': 'category',
+    'success': 'bool',
+    'allThreads': 'int32',
+    'Latency': 'int32',
+    'Connect': 'int32',
+    'bytes': 'int64',
+    'responseCode': 'category',
+    'responseMessage': 'category',
+    'failureMessage': 'category',
+}
+COLUNAS_CENARIO = {'threadName': 'category'}
+# Representação compacta da carga completa: textos como categorias, inteiros de 32 bits
+TIPOS_COMPACTOS = {
+    'timeStamp': 'int64', 'elapsed': 'int32', 'label': 'category', 'responseCode': 'category',
+    'responseMessage': 'category', 'threadName': 'category', 'dataType': 'category', 'success': 'bool',
+    'failureMessage': 'category', 'bytes': 'int64', 'sentBytes': 'int32', 'grpThreads': 'int32',
+    'allThreads': 'int32', 'URL': 'category', 'Latency': 'int32', 'IdleTime': 'int32', 'Connect': 'int32',
+    'Hostname': 'category',
+}
+# Colunas gravadas no cache colunar (coluna -> dtype; 'category' vira códigos + categorias)
+COLUNAS_CACHE = {**COLUNAS_STREAMING, **COLUNAS_CENARIO}
+VERSAO_CACHE = 1
+# threadName do JMeter: "<nome do Thread Group> <grupo>-<thread>"
+PADRAO_THREAD_NAME = re.compile(r'^(.*?)\s+\d+-\d+$')
+# JTL XML: atributo da amostra -> coluna equivalente do CSV
+ATRIBUTOS_XML = {
+    'ts': 'timeStamp', 't': 'elapsed', 'lb': 'label', 'rc': 'responseCode',
+    'rm': 'responseMessage', 'tn': 'threadName', 'dt': 'dataType', 's': 'success',
+    'by': 'bytes', 'sby': 'sentBytes', 'ng': 'grpThreads', 'na': 'allThreads',
+    'lt': 'Latency', 'it': 'IdleTime', 'ct': 'Connect', 'hn': 'Hostname',
+}
+# Colunas lidas do XML: atributos + elementos filhos (<java.net.URL>, assertionResult)
+COLUNAS_XML = [*ATRIBUTOS_XML.values(), 'URL', 'failureMessage']
+COLUNAS_NUMERICAS_XML = {
+    'timeStamp', 'elapsed', 'bytes', 'sentBytes', 'grpThreads', 'allThreads', 'Latency', 'IdleTime', 'Connect',
+}
+# Faixa aceitável de (throughput x tempo médio) / threads ativas
+LIMITES_LEI_LITTLE = (0.8, 1.2)
+# Thread Groups usados no ajuste do modelo de escalabilidade
+PADRAO_CENARIOS_ESCALABILIDADE = re.compile(r'scalab|escalab', re.IGNORECASE)
+TAMANHO_CHUNK_PADRAO = 500_000
+LIMIAR_STREAMING_BYTES = 512 * 1024 * 1024  # Arquivos maiores usam streaming
+TAMANHO_BLOCO_TAIL = 64 * 1024 * 1024  # Máximo de bytes lidos por vez no modo acompanhamento
+BITS_PRECISAO_HISTOGRAMA = 7  # Erro relativo máximo de 2^-8 (~0,39%)
+JANELA_PADRAO_MS = 1000
+BITS_PRECISAO_JANELAS = 5  # Percentis por janela: erro relativo máximo de 2^-6 (~1,6%)
+LIMITE_AMOSTRAS_SINTETICAS = 2_000_000  # Amostras sintéticas geradas por vez na correção de omissão coordenada
+LARGURA_CHAVE_JANELA = 4096  # Maior que qualquer índice de bucket: chave = janela * largura + bucket
+LINHAS_MINIMAS_COMPACTACAO = 100_000  # Tabelas parciais dos acumuladores só são somadas acima disto
+FAIXAS_POR_DECADA = 10  # Linhas do heatmap de latência: 10 faixas logarítmicas por potência de 10 (~26% cada)
+COLUNAS_MAXIMAS_HEATMAP = 600  # Acima disso, janelas vizinhas são somadas em uma coluna do heatmap
+ENDPOINTS_HEATMAP = 9  # Endpoints (os de mais amostras) no heatmap por endpoint
+# Taxonomia de erros: padrões verificados em ordem sobre "código mensagem" antes das regras por código HTTP
+PADROES_ERRO = [
+    ('banco_ocupado', re.compile(r'SQLITE_BUSY|database is locked', re.IGNORECASE)),
+    ('timeout', re.compile(r'timeout|timed out', re.IGNORECASE)),
+    ('conexao_recusada', re.compile(r'refused|ConnectException|connection reset|NoHttpResponse|broken pipe', re.IGNORECASE)),
+]
+# Classe -> natureza: capacidade (some com menos carga) ou defeito (falha com qualquer carga)
+NATUREZA_ERRO = {
+    'banco_ocupado': 'capacidade', 'timeout': 'capacidade', 'conexao_recusada': 'capacidade',
+    'sobrecarga_http': 'capacidade', 'http_5xx': 'defeito', 'http_4xx': 'defeito',
+    'assercao': 'defeito', 'outro': 'indefinido',
+}
+PREFIXO_NAO_HTTP = re.compile(r'^Non HTTP response (?:code|message):\s*')
+TAMANHO_MAXIMO_MENSAGEM = 120
+MINIMO_ERROS_RAJADA = 5  # Rajada: janelas seguidas com pelo menos este número de erros da classe...
+FATOR_RAJADA = 4  # ...e pelo menos FATOR_RAJADA vezes a média de erros da classe por janela
+
+JANELAS_ANOMALIA = 61  # Largura (em janelas) da mediana/MAD móvel centrada: ~1 min com janelas de 1 s
+LIMIAR_ANOMALIA = 3.5  # z robusto = 0,6745 * (x - mediana) / MAD acima do qual a janela é anômala
+VARIACAO_MINIMA_ANOMALIA = 0.5  # ...e o p99 50% acima (ou o throughput 50% abaixo) da mediana móvel
+MINIMO_REQUISICOES_ANOMALIA = 20  # Janelas com menos requisições não têm p99 confiável
+MINIMO_AMOSTRAS_LENTAS = 5  # Pico sustentado: pelo menos estas amostras acima do p99 de referência na janela
+FATOR_ENDPOINT_AFETADO = 1.5  # Tempo médio do endpoint no intervalo / tempo médio fora dele
+
+HISTORICO_PADRAO = 'historico-execucoes.db'
+METRICAS_HISTORICO = ['amostras', 'falhas', 'taxa_erro', 'media', 'maximo', 'p50', 'p90', 'p95', 'p99', 'throughput']
+COLUNAS_JANELAS_HISTORICO = ['requisicoes', 'taxa_erro', 'tempo_medio', 'p50', 'p90', 'p95', 'p99', 'max_tempo', 'threads']
+FUNCOES_CPROFILE = 25  # Funções listadas do cProfile da etapa mais lenta
+JANELA_SKEW_MS = 100  # Resolução das séries de latência comparadas entre nós para estimar o deslocamento do relógio
+MAXIMO_SKEW_MS = 5_000  # A correlação procura o deslocamento até esta distância da diferença entre os inícios
+JANELAS_FILTRO_SKEW = 51  # Mediana móvel subtraída antes da correlação: sobram os picos, somem rampas e patamares
+CORRELACAO_MINIMA_SKEW = 0.3  # Abaixo disso a correlação não é confiável e vale a diferença entre os inícios
+TOLERANCIA_ORDEM_MS = 10_000  # Atraso máximo esperado entre amostras fora de ordem no mesmo JTL (tempo de resposta)
+
+class PerfilEtapas:
+    """Tempo de parede, CPU e pico de memória (tracemalloc) de cada etapa; etapas repetidas acumulam"""
+    
+    def __init__(self, medir_memoria=True, cprofile=False):
+        """Inicializa sem etapas medidas"""
+        self.etapas = {}
+        self.medir_memoria = medir_memoria
+        self.cprofile = cprofile
+        self._perfis = {}
+        self._pilha = []
+        self._deslocamento = 0  # Memória em uso nos reinícios do tracemalloc (Python < 3.9)
+        self._inicio = None
+        self._inicio_cpu = None
+        self.total_segundos = None
+        self.total_cpu_segundos = None
+    
+    def iniciar(self):
+        """Liga o tracemalloc e marca o início da execução"""
+        if self.medir_memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._inicio = time.perf_counter()
+        self._inicio_cpu = time.process_time()
+        return self
+    
+    def finalizar(self):
+        """Registra a duração total e desliga o tracemalloc"""
+        self.total_segundos = time.perf_counter() - self._inicio
+        self.total_cpu_segundos = time.process_time() - self._inicio_cpu
+        if self.medir_memoria and tracemalloc.is_tracing():
+            tracemalloc.stop()
+    
+    def _memoria(self):
+        """(atual, pico) do tracemalloc, contando o que estava em uso antes dos reinícios"""
+        atual, pico = tracemalloc.get_traced_memory()
+        return self._deslocamento + atual, self._deslocamento + pico
+    
+    def _zerar_pico(self):
+        """Zera o pico do tracemalloc; sem reset_peak (Python < 3.9) reinicia o rastreamento"""
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        else:
+            # Os blocos já alocados deixam de ser rastreados: o que estava em uso vira deslocamento
+            self._deslocamento += tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            tracemalloc.start()
+    
+    @contextmanager
+    def etapa(self, nome):
+        """Mede o bloco como a etapa nome"""
+        memoria = self.medir_memoria and tracemalloc.is_tracing()
+        quadro = {'base': 0, 'pico': 0}
+        if memoria:
+            quadro['base'], pico = self._memoria()
+            # O reset abaixo apagaria o pico da etapa externa: ele é guardado antes
+            if self._pilha:
+                self._pilha[-1]['pico'] = max(self._pilha[-1]['pico'], pico)
+            self._zerar_pico()
+        perfil = None
+        if self.cprofile and not self._pilha:
+            perfil = self._perfis.setdefault(nome, cProfile.Profile())
+        registro = self.etapas.setdefault(nome, {'nivel': len(self._pilha), 'chamadas': 0, 'segundos': 0.0,
+                                                 'cpu_segundos': 0.0, 'pico_mb': None})
+        self._pilha.append(quadro)
+        inicio, inicio_cpu = time.perf_counter(), time.process_time()
+        if perfil is not None:
+            perfil.enable()
+        try:
+            yield
+        finally:
+            if perfil is not None:
+                perfil.disable()
+            registro['chamadas'] += 1
+            registro['segundos'] += time.perf_counter() - inicio
+            registro['cpu_segundos'] += time.process_time() - inicio_cpu
+            self._pilha.pop()
+            if memoria:
+                pico = max(quadro['pico'], self._memoria()[1])
+                if self._pilha:
+                    self._pilha[-1]['pico'] = max(self._pilha[-1]['pico'], pico)
+                registro['pico_mb'] = max(registro['pico_mb'] or 0, (pico - quadro['base']) / 1024 / 1024)
+    
+    def incorporar(self, etapas):
+        """Soma etapas medidas em outro processo (ex.: gráficos renderizados em paralelo)"""
+        for nome, medida in (etapas or {}).items():
+            registro = self.etapas.setdefault(nome, {**medida, 'chamadas': 0, 'segundos': 0.0, 'cpu_segundos': 0.0})
+            registro['chamadas'] += medida['chamadas']
+            registro['segundos'] += medida['segundos']
+            registro['cpu_segundos'] += medida['cpu_segundos']
+            if medida['pico_mb'] is not None:
+                registro['pico_mb'] = max(registro['pico_mb'] or 0, medida['pico_mb'])
+    
+    def perfil_mais_lento(self):
+        """(nome, cProfile.Profile) da etapa de nível superior mais lenta, ou None"""
+        if not self._perfis:
+            return None
+        nome = max(self._perfis, key=lambda n: self.etapas[n]['segundos'])
+        return nome, self._perfis[nome]
+    
+    def para_dict(self):
+        """Totais e etapas, arredondados, para serialização em JSON"""
+        return {
+            'total_segundos': round(self.total_segundos, 4) if self.total_segundos is not None else None,
+            'total_cpu_segundos': round(self.total_cpu_segundos, 4) if self.total_cpu_segundos is not None else None,
+            'etapas': {
+                nome: {**e, 'segundos': round(e['segundos'], 4), 'cpu_segundos': round(e['cpu_segundos'], 4),
+                       'pico_mb': round(e['pico_mb'], 2) if e['pico_mb'] is not None else None}
+                for nome, e in self.etapas.items()
+            },
+        }
+    
+    def relatorio(self):
+        """Tabela das etapas, na ordem de execução, com a fração do tempo total"""
+        total = self.total_segundos or sum(e['segundos'] for e in self.etapas.values() if e['nivel'] == 0)
+        linhas = [
+            f"⏱️  Perfil da execução: {total:.2f}s de parede, {self.total_cpu_segundos or 0:.2f}s de CPU",
+            f"   {'Etapa':<44}{'Chamadas':>9}{'Parede (s)':>12}{'%':>7}{'CPU (s)':>10}{'Pico (MB)':>11}",
+        ]
+        for nome, e in self.etapas.items():
+            rotulo = ('  ' * e['nivel'] + nome)[:43]
+            fracao = e['segundos'] / total * 100 if total else 0
+            pico = f"{e['pico_mb']:.1f}" if e['pico_mb'] is not None else '-'
+            linhas.append(f"   {rotulo:<44}{e['chamadas']:>9}{e['segundos']:>12.3f}{fracao:>6.1f}%{e['cpu_segundos']:>10.3f}{pico:>11}")
+        return '\n'.join(linhas)
+
+_perfil = None  # PerfilEtapas ativo (--perfil); sem ele as etapas não são medidas
+
+def etapa_perfil(nome):
+    """Contexto que mede o bloco no perfil ativo (sem custo fora do modo --perfil)"""
+    return _perfil.etapa(nome) if _perfil is not None else nullcontext()
+
+def _iterar_medindo(iteravel, nome):
+    """Repassa os itens medindo o tempo de cada next() como a etapa nome"""
+    iterador = iter(iteravel)
+    while True:
+        with etapa_perfil(nome):
+            item = next(iterador, None)
+        if item is None:
+            return
+        yield item
+
+class HistogramaLatencia:
+    """Histograma log-linear (estilo HDR) de tempos em ms, mesclável; erro relativo máximo 2^-(bits+1)"""
+    
+    def __init__(self, bits=BITS_PRECISAO_HISTOGRAMA):
+        """Inicializa histograma vazio"""
+        self.bits = bits
+        self.contagens = np.zeros(0, dtype=np.int64)
+        self.total = 0
+        self.soma = 0
+        self.minimo = None
+        self.maximo = None
+    
+    @classmethod
+    def de_valores(cls, valores, bits=BITS_PRECISAO_HISTOGRAMA):
+        """Cria histograma a partir de um array de tempos"""
+        histograma = cls(bits)
+        histograma.adicionar(valores)
+        return histograma
+    
+    def indices(self, valores):
+        """Índice de bucket de cada valor (vetorizado)"""
+        valores = np.maximum(np.asarray(valores, dtype=np.int64), 0)
+        # frexp: v = m * 2^exp com m em [0.5, 1), logo floor(log2(v)) = exp - 1
+        _, expoente = np.frexp(valores)
+        deslocamento = np.maximum(expoente.astype(np.int64) - 1 - self.bits, 0)
+        return (deslocamento << self.bits) + (valores >> deslocamento)
+    
+    def adicionar(self, valores):
+        """Incorpora um array de tempos ao histograma em uma passada"""
+        valores = np.asarray(valores)
+        if len(valores) == 0:
+            return
+        self.adicionar_indices(self.indices(valores))
+        self.total += len(valores)
+        self.soma += int(valores.sum(dtype=np.int64))
+        menor, maior = int(valores.min()), int(valores.max())
+        self.minimo = menor if self.minimo is None else min(self.minimo, menor)
+        self.maximo = maior if self.maximo is None else max(self.maximo, maior)
+    
+    def adicionar_indices(self, indices):
+        """Soma contagens de índices já calculados (sem atualizar totais)"""
+        self._somar_contagens(np.bincount(indices))
+    
+    def _somar_contagens(self, contagens):
+        """Soma um vetor de contagens, ampliando o vetor interno se preciso"""
+        if len(contagens) > len(self.contagens):
+            contagens = contagens.astype(np.int64, copy=True)
+            contagens[:len(self.contagens)] += self.contagens
+            self.contagens = contagens
+        else:
+            self.contagens[:len(contagens)] += contagens
+    
+    def mesclar(self, outro):
+        """Incorpora outro histograma de mesma precisão"""
+        if outro.bits != self.bits:
+            raise ValueError("Histogramas com precisões diferentes não podem ser mesclados")
+        if outro.total == 0:
+            return self
+        self._somar_contagens(outro.contagens)
+        self.total += outro.total
+        self.soma += outro.soma
+        self.minimo = outro.minimo if self.minimo is None else min(self.minimo, outro.minimo)
+        self.maximo = outro.maximo if self.maximo is None else max(self.maximo, outro.maximo)
+        return self
+    
+    def valores_buckets(self):
+        """Valor representativo (ponto médio) de cada bucket"""
+        return self.valores_indices(np.arange(len(self.contagens), dtype=np.int64))
+    
+    def valores_indices(self, indices):
+        """Valor representativo (ponto médio) de índices de bucket arbitrários"""
+        indices = np.asarray(indices, dtype=np.int64)
+        deslocamento = np.maximum((indices >> self.bits) - 1, 0)
+        inferior = (indices - (deslocamento << self.bits)) << deslocamento
+        return inferior + ((1 << deslocamento) - 1) / 2
+    
+    def quantis(self, qs):
+        """Quantis com interpolação linear entre ranks, custo O(buckets)"""
+        qs = np.atleast_1d(np.asarray(qs, dtype=float))
+        if self.total == 0:
+            return np.zeros(len(qs))
+        cumulativo = np.cumsum(self.contagens)
+        valores = np.clip(self.valores_buckets(), self.minimo, self.maximo)
+        posicao = (self.total - 1) * qs
+        inferior = np.floor(posicao).astype(np.int64)
+        superior = np.minimum(inferior + 1, self.total - 1)
+        valor_inferior = valores[np.searchsorted(cumulativo, inferior + 1)]
+        valor_superior = valores[np.searchsorted(cumulativo, superior + 1)]
+        return valor_inferior + (posicao - inferior) * (valor_superior - valor_inferior)
+    
+    def quantil(self, q):
+        """Quantil único (ver quantis)"""
+        return float(self.quantis([q])[0])
+    
+    def media(self):
+        """Média exata dos valores incorporados"""
+        return self.soma / self.total if self.total > 0 else 0
+    
+    def para_dict(self):
+        """Representação serializável (JSON) com apenas os buckets ocupados"""
+        ocupados = np.nonzero(self.contagens)[0]
+        return {
+            'bits': self.bits,
+            'total': self.total,
+            'soma': self.soma,
+            'minimo': self.minimo,
+            'maximo': self.maximo,
+            'indices': ocupados.tolist(),
+            'contagens': self.contagens[ocupados].tolist(),
+        }
+    
+    @classmethod
+    def de_dict(cls, dados):
+        """Reconstrói um histograma gravado com para_dict"""
+        histograma = cls(dados['bits'])
+        if dados['indices']:
+            histograma.contagens = np.zeros(max(dados['indices']) + 1, dtype=np.int64)
+            histograma.contagens[dados['indices']] = dados['contagens']
+        histograma.total = dados['total']
+        histograma.soma = dados['soma']
+        histograma.minimo = dados['minimo']
+        histograma.maximo = dados['maximo']
+        return histograma
+    
+    def corrigir_omissao(self, intervalo_ms):
+        """Histograma com as amostras que a thread deixou de enviar a cada intervalo_ms (omissão coordenada)"""
+        corrigido = copy.deepcopy(self)
+        if self.total == 0 or intervalo_ms <= 0:
+            return corrigido
+        
+        ocupados = np.flatnonzero(self.contagens)
+        valores = np.clip(self.valores_indices(ocupados), self.minimo, self.maximo)
+        faltantes = np.maximum(np.floor(valores / intervalo_ms).astype(np.int64) - 1, 0)
+        com_faltantes = faltantes > 0
+        valores, faltantes = valores[com_faltantes], faltantes[com_faltantes]
+        contagens = self.contagens[ocupados][com_faltantes]
+        
+        cortes = np.searchsorted(np.cumsum(faltantes), np.arange(LIMITE_AMOSTRAS_SINTETICAS, faltantes.sum(), LIMITE_AMOSTRAS_SINTETICAS))
+        for bloco in np.split(np.arange(len(valores)), np.unique(cortes + 1)):
+            if len(bloco) == 0:
+                continue
+            repeticoes = faltantes[bloco]
+            base = np.repeat(valores[bloco], repeticoes)
+            pesos = np.repeat(contagens[bloco], repeticoes)
+            passo = np.arange(len(base)) - np.repeat(np.cumsum(repeticoes) - repeticoes, repeticoes) + 1
+            sinteticos = np.rint(base - passo * intervalo_ms).astype(np.int64)
+            corrigido._somar_contagens(np.bincount(self.indices(sinteticos), weights=pesos).astype(np.int64))
+            corrigido.total += int(pesos.sum())
+            corrigido.soma += int((sinteticos * pesos).sum())
+            corrigido.minimo = min(corrigido.minimo, int(sinteticos.min()))
+        return corrigido
+    
+    def bootstrap_quantis(self, qs, reamostragens, rng):
+        """Quantis de todas as reamostragens (multinomial sobre os buckets), array (len(qs), reamostragens)"""
+        ocupados = np.nonzero(self.contagens)[0]
+        valores = np.clip(self.valores_indices(ocupados), self.minimo, self.maximo)
+        probabilidades = self.contagens[ocupados] / self.total
+        cumulativo = rng.multinomial(self.total, probabilidades, size=reamostragens).cumsum(axis=1)
+        resultados = []
+        for q in qs:
+            posto = max(int(np.ceil(q * self.total)), 1)
+            resultados.append(valores[(cumulativo >= posto).argmax(axis=1)])
+        return np.array(resultados)
+    
+    @classmethod
+    def por_grupo(cls, codigos, valores, n_grupos, bits=BITS_PRECISAO_HISTOGRAMA):
+        """Um histograma por grupo (códigos 0..n_grupos-1) em uma passada"""
+        valores = np.asarray(valores, dtype=np.int64)
+        histogramas = [cls(bits) for _ in range(n_grupos)]
+        if len(valores) == 0:
+            return histogramas
+        
+        indices = histogramas[0].indices(valores)
+        largura = int(indices.max()) + 1
+        matriz = np.bincount(codigos * largura + indices, minlength=n_grupos * largura).reshape(n_grupos, largura)
+        totais = np.bincount(codigos, minlength=n_grupos)
+        somas = np.bincount(codigos, weights=valores, minlength=n_grupos)
+        minimos = np.full(n_grupos, np.iinfo(np.int64).max)
+        maximos = np.full(n_grupos, np.iinfo(np.int64).min)
+        np.minimum.at(minimos, codigos, valores)
+        np.maximum.at(maximos, codigos, valores)
+        
+        for g, histograma in enumerate(histogramas):
+            if totais[g] == 0:
+                continue
+            histograma.contagens = matriz[g].copy()
+            histograma.total = int(totais[g])
+            histograma.soma = int(somas[g])
+            histograma.minimo = int(minimos[g])
+            histograma.maximo = int(maximos[g])
+        return histogramas
+
+def metricas_omissao_coordenada(histograma, intervalo_ms=None):
+    """Percentis corrigidos para omissão coordenada, com o intervalo do plano (intervalo_ms) ou, sem ele, a mediana"""
+    if histograma.total == 0:
+        return {}
+    origem = 'plano'
+    if intervalo_ms is None:
+        # Estimativa circular (a mediana já sofre a omissão): só quando o plano não define timers
+        intervalo_ms, origem = max(histograma.quantil(0.50), 1), 'mediana'
+    corrigido = histograma.corrigir_omissao(intervalo_ms)
+    p50, p90, p95, p99 = corrigido.quantis([0.50, 0.90, 0.95, 0.99])
+    return {
+        'intervalo_ms': float(intervalo_ms),
+        'origem_intervalo': origem,
+        'amostras_sinteticas': corrigido.total - histograma.total,
+        'avg_response_time': corrigido.media(),
+        'p50': float(p50),
+        'p90': float(p90),
+        'p95': float(p95),
+        'p99': float(p99),
+    }
+
+def componentes_latencia(df):
+    """{conexao, servidor, transferencia, bytes: array} de cada amostra, com o que o JTL permitir"""
+    componentes = {}
+    if 'Latency' in df.columns and 'elapsed' in df.columns:
+        elapsed = df['elapsed'].to_numpy(dtype=np.int64)
+        latencia = df['Latency'].to_numpy(dtype=np.int64)
+        latencia = np.where(latencia > 0, latencia, elapsed)
+        conexao = df['Connect'].to_numpy(dtype=np.int64) if 'Connect' in df.columns else np.zeros_like(latencia)
+        componentes['conexao'] = conexao
+        componentes['servidor'] = np.maximum(latencia - conexao, 0)
+        componentes['transferencia'] = np.maximum(elapsed - latencia, 0)
+    if 'bytes' in df.columns:
+        componentes['bytes'] = df['bytes'].to_numpy(dtype=np.int64)
+    return componentes
+
+def resumir_decomposicao(somas, amostras):
+    """Médias (ms) dos componentes e taxa de transferência a partir das somas"""
+    if not amostras or not somas:
+        return {}
+    resumo = {}
+    if 'servidor' in somas:
+        resumo['connect_time'] = somas['conexao'] / amostras
+        resumo['server_time'] = somas['servidor'] / amostras
+        resumo['transfer_time'] = somas['transferencia'] / amostras
+    if 'bytes' in somas:
+        resumo['avg_bytes'] = somas['bytes'] / amostras
+        if 'transferencia' in somas:
+            # Respostas pequenas chegam no mesmo ms do primeiro byte: taxa sobre o tempo total de transferência
+            segundos = somas['transferencia'] / 1000
+            resumo['bytes_per_second'] = somas['bytes'] / segundos if segundos > 0 else 0
+    return resumo
+
+class AgregadoEndpoint:
+    """Agregados parciais de um endpoint, mescláveis entre chunks"""
+    
+    def __init__(self):
+        """Inicializa agregado vazio"""
+        self.count = 0
+        self.sucessos = 0
+        self.histograma = HistogramaLatencia()
+        self.ts_inicio = None
+        self.ts_fim = None
+        self.tem_sucesso = False
+        self.somas = {}
+    
+    def mesclar(self, outro):
+        """Incorpora o agregado de outro chunk do mesmo endpoint"""
+        for componente, soma in outro.somas.items():
+            self.somas[componente] = self.somas.get(componente, 0) + soma
+        self.count += outro.count
+        self.sucessos += outro.sucessos
+        self.tem_sucesso = self.tem_sucesso or outro.tem_sucesso
+        self.histograma.mesclar(outro.histograma)
+        if outro.ts_inicio is not None:
+            self.ts_inicio = outro.ts_inicio if self.ts_inicio is None else min(self.ts_inicio, outro.ts_inicio)
+            self.ts_fim = outro.ts_fim if self.ts_fim is None else max(self.ts_fim, outro.ts_fim)
+        return self
+    
+    def metricas(self):
+        """Dicionário de métricas do endpoint"""
+        tem_tempo = self.histograma.total > 0
+        p90, p95, p99 = self.histograma.quantis([0.90, 0.95, 0.99])
+        duracao = (self.ts_fim - self.ts_inicio) / 1000 if self.ts_inicio is not None else 0
+        return {
+            'count': self.count,
+            'avg_time': self.histograma.media() if tem_tempo else 0,
+            'max_time': self.histograma.maximo if tem_tempo else 0,
+            'error_rate': ((self.count - self.sucessos) / self.count * 100) if self.tem_sucesso else 0,
+            'p90': float(p90) if tem_tempo else 0,
+            'p95': float(p95) if tem_tempo else 0,
+            'p99': float(p99) if tem_tempo else 0,
+            'throughput': self.count / duracao if duracao > 0 else 0,
+            'decomposicao': resumir_decomposicao(self.somas, self.count),
+        }
+
+def decomposicao_total(agregados):
+    """Decomposição de todas as amostras a partir dos agregados por endpoint"""
+    somas = {}
+    for agregado in agregados:
+        for componente, soma in agregado.somas.items():
+            somas[componente] = somas.get(componente, 0) + soma
+    return resumir_decomposicao(somas, sum(a.count for a in agregados))
+
+def agregar_endpoints(df):
+    """AgregadoEndpoint de cada label em uma única passada (bincount sobre os rótulos fatorados)"""
+    if 'label' not in df.columns or df.empty:
+        return {}
+    
+    codigos, rotulos = pd.factorize(df['label'], sort=False)
+    validos = codigos >= 0
+    if not validos.all():
+        df, codigos = df[validos], codigos[validos]
+    n_grupos = len(rotulos)
+    agregados = [AgregadoEndpoint() for _ in range(n_grupos)]
+    
+    contagens = np.bincount(codigos, minlength=n_grupos)
+    for g, agregado in enumerate(agregados):
+        agregado.count = int(contagens[g])
+    
+    if 'success' in df.columns:
+        sucessos = np.bincount(codigos, weights=df['success'].to_numpy(dtype=bool), minlength=n_grupos)
+        for g, agregado in enumerate(agregados):
+            agregado.sucessos = int(sucessos[g])
+            agregado.tem_sucesso = True
+    
+    if 'elapsed' in df.columns:
+        histogramas = HistogramaLatencia.por_grupo(codigos, df['elapsed'].to_numpy(), n_grupos)
+        for agregado, histograma in zip(agregados, histogramas):
+            agregado.histograma = histograma
+    
+    for componente, valores in componentes_latencia(df).items():
+        somas = np.bincount(codigos, weights=valores, minlength=n_grupos)
+        for g, agregado in enumerate(agregados):
+            agregado.somas[componente] = int(somas[g])
+    
+    if 'timeStamp' in df.columns:
+        timestamps = df['timeStamp'].to_numpy(dtype=np.int64)
+        inicios = np.full(n_grupos, np.iinfo(np.int64).max)
+        fins = np.full(n_grupos, np.iinfo(np.int64).min)
+        np.minimum.at(inicios, codigos, timestamps)
+        np.maximum.at(fins, codigos, timestamps)
+        for g, agregado in enumerate(agregados):
+            agregado.ts_inicio = int(inicios[g])
+            agregado.ts_fim = int(fins[g])
+    
+    return dict(zip(rotulos, agregados))
+
+def decompor_janelas(somas):
+    """Médias de conexão, servidor e transferência e bytes/s a partir das colunas soma_<componente>"""
+    colunas = {}
+    for componente in ('conexao', 'servidor', 'transferencia'):
+        if f'soma_{componente}' in somas.columns:
+            colunas[f'{componente}_medio'] = somas[f'soma_{componente}'] / somas['requisicoes']
+    if 'soma_bytes' in somas.columns and 'soma_transferencia' in somas.columns:
+        segundos = somas['soma_transferencia'] / 1000
+        colunas['bytes_por_segundo'] = (somas['soma_bytes'] / segundos.where(segundos > 0)).fillna(0)
+    return colunas
+
+def faixas_latencia(tempos):
+    """Faixa logarítmica de cada tempo: f cobre [10^(f/F), 10^((f+1)/F)) ms, F = FAIXAS_POR_DECADA"""
+    # A folga evita que 1000 ms caia na faixa de baixo por arredondamento do log10
+    return np.floor(np.log10(np.maximum(tempos, 1)) * FAIXAS_POR_DECADA + 1e-9).astype(np.int16)
+
+def limites_faixas(faixas):
+    """Limite inferior (ms) de cada faixa de faixas_latencia"""
+    return 10 ** (np.asarray(faixas, dtype=float) / FAIXAS_POR_DECADA)
+
+class _TabelasParciais:
+    """Base dos acumuladores por janela: uma tabela parcial por chunk, somadas quando dobram de tamanho"""
+    
+    TABELAS = {}  # {atributo: agregação do groupby por todos os níveis do índice}
+    
+    def __init__(self):
+        """Inicializa sem tabelas"""
+        for nome in self.TABELAS:
+            setattr(self, nome, [])
+        self._linhas_pendentes = 0
+        self._linhas_compactadas = 0
+    
+    def _acrescentar(self, nome, tabela):
+        """Guarda a tabela parcial de um chunk"""
+        getattr(self, nome).append(tabela)
+        self._linhas_pendentes += len(tabela)
+    
+    def _compactar_se_necessario(self):
+        """Compacta quando as linhas pendentes passam das já compactadas"""
+        if self._linhas_pendentes > max(self._linhas_compactadas, LINHAS_MINIMAS_COMPACTACAO):
+            self._compactar()
+    
+    def _compactar(self):
+        """Soma as tabelas parciais de cada atributo em uma única tabela"""
+        for nome, agregacao in self.TABELAS.items():
+            partes = getattr(self, nome)
+            if len(partes) > 1:
+                tabela = pd.concat(partes)
+                if isinstance(agregacao, dict):
+                    agregacao = {coluna: funcao for coluna, funcao in agregacao.items() if coluna in tabela.columns}
+                niveis = list(range(tabela.index.nlevels)) if tabela.index.nlevels > 1 else 0
+                setattr(self, nome, [tabela.groupby(level=niveis, sort=False).agg(agregacao)])
+        self._contar_linhas()
+    
+    def _contar_linhas(self):
+        """Zera as pendências após compactar ou podar"""
+        self._linhas_compactadas = sum(len(t) for nome in self.TABELAS for t in getattr(self, nome))
+        self._linhas_pendentes = 0
+    
+    def _janelas_tabela(self, nome, tabela):
+        """Janela de cada linha da tabela (primeiro nível do índice)"""
+        return tabela.index.get_level_values(0)
+    
+    def _podar_tabelas(self, limite, nomes):
+        """Mantém nas tabelas (já compactadas) de nomes só as janelas a partir de limite"""
+        for nome in nomes:
+            partes = getattr(self, nome)
+            if partes:
+                setattr(self, nome, [partes[0][self._janelas_tabela(nome, partes[0]) >= limite]])
+        self._contar_linhas()
+    
+    def _mesclar_tabelas(self, outro):
+        """Incorpora as tabelas de outro acumulador da mesma classe"""
+        for nome in self.TABELAS:
+            getattr(self, nome).extend(getattr(outro, nome))
+        self._compactar()
+
+class AcumuladorJanelas(_TabelasParciais):
+    """Métricas, histogramas esparsos (janela, bucket) e heatmap por janela de timeStamp // janela_ms"""
+    
+    TABELAS = {
+        '_escalares': {
+            'requisicoes': 'sum', 'sucessos': 'sum', 'soma_tempo': 'sum', 'max_tempo': 'max', 'threads': 'max',
+            'soma_conexao': 'sum', 'soma_servidor': 'sum', 'soma_transferencia': 'sum', 'soma_bytes': 'sum',
+        },
+        '_buckets': 'sum',  # chave janela * LARGURA_CHAVE_JANELA + bucket -> contagem
+        '_endpoints': 'sum',  # (janela, endpoint) -> somas de tempo e decomposição
+        '_faixas': 'sum',  # (janela, endpoint, faixa) -> contagem do heatmap
+    }
+    
+    def __init__(self, janela_ms=JANELA_PADRAO_MS, bits=BITS_PRECISAO_JANELAS):
+        """Inicializa sem janelas"""
+        super().__init__()
+        self.janela_ms = janela_ms
+        self.modelo = HistogramaLatencia(bits)
+    
+    def adicionar_chunk(self, chunk):
+        """Incorpora um chunk em uma passada (groupby por janela)"""
+        if chunk.empty or 'timeStamp' not in chunk.columns:
+            return
+        
+        janelas = chunk['timeStamp'].to_numpy(dtype=np.int64) // self.janela_ms
+        colunas = {'janela': janelas}
+        agregacoes = {'requisicoes': ('janela', 'size')}
+        if 'success' in chunk.columns:
+            colunas['sucessos'] = chunk['success'].to_numpy(dtype=np.int64)
+            agregacoes['sucessos'] = ('sucessos', 'sum')
+        if 'elapsed' in chunk.columns:
+            tempos = chunk['elapsed'].to_numpy(dtype=np.int64)
+            colunas['tempo'] = tempos
+            agregacoes['soma_tempo'] = ('tempo', 'sum')
+            agregacoes['max_tempo'] = ('tempo', 'max')
+        if 'allThreads' in chunk.columns:
+            colunas['threads'] = chunk['allThreads'].to_numpy()
+            agregacoes['threads'] = ('threads', 'max')
+        componentes = {f'soma_{nome}': valores for nome, valores in componentes_latencia(chunk).items()}
+        for nome, valores in componentes.items():
+            colunas[nome] = valores
+            agregacoes[nome] = (nome, 'sum')
+        
+        self._acrescentar('_escalares', pd.DataFrame(colunas).groupby('janela').agg(**agregacoes))
+        
+        if 'label' in chunk.columns and 'elapsed' in chunk.columns:
+            # Tempo e decomposição por (janela, endpoint): apenas somas, mescláveis entre chunks
+            por_endpoint = pd.DataFrame({'janela': janelas, 'endpoint': chunk['label'].to_numpy(), 'requisicoes': 1,
+                                         'soma_tempo': tempos, **componentes})
+            self._acrescentar('_endpoints', por_endpoint.groupby(['janela', 'endpoint'], observed=True, sort=False).sum())
+        
+        if 'elapsed' in chunk.columns:
+            chaves = janelas * LARGURA_CHAVE_JANELA + self.modelo.indices(tempos)
+            self._acrescentar('_buckets', pd.Series(chaves).value_counts(sort=False))
+            
+            # Heatmap: contagens por (janela, endpoint, faixa logarítmica); sem label, endpoint ''
+            endpoints = chunk['label'].array if 'label' in chunk.columns else ''
+            faixas = pd.DataFrame({'janela': janelas, 'endpoint': endpoints, 'faixa': faixas_latencia(tempos)})
+            self._acrescentar('_faixas', faixas.groupby(['janela', 'endpoint', 'faixa'], observed=True, sort=False).size())
+        
+        self._compactar_se_necessario()
+    
+    def _janelas_tabela(self, nome, tabela):
+        """Janela de cada linha; nos buckets ela está na chave"""
+        if nome == '_buckets':
+            return tabela.index // LARGURA_CHAVE_JANELA
+        return super()._janelas_tabela(nome, tabela)
+    
+    def podar(self, janelas_mantidas):
+        """Descarta tudo exceto as últimas janelas_mantidas janelas"""
+        self._compactar()
+        if self._escalares:
+            self._podar_tabelas(self._escalares[0].index.max() - janelas_mantidas + 1, self.TABELAS)
+    
+    def mesclar(self, outro):
+        """Incorpora as janelas de outro acumulador com a mesma configuração"""
+        if outro.janela_ms != self.janela_ms or outro.modelo.bits != self.modelo.bits:
+            raise ValueError("Janelas com configurações diferentes não podem ser mescladas")
+        self._mesclar_tabelas(outro)
+        return self
+    
+    def serie(self):
+        """DataFrame com uma linha por janela (vazias incluídas): throughput, erros, percentis, threads"""
+        self._compactar()
+        if not self._escalares:
+            return pd.DataFrame()
+        
+        escalares = self._escalares[0].sort_index()
+        janelas = np.arange(escalares.index.min(), escalares.index.max() + 1)
+        escalares = escalares.reindex(janelas)
+        requisicoes = escalares['requisicoes'].fillna(0).to_numpy(dtype=np.int64)
+        
+        serie = pd.DataFrame(index=pd.to_datetime(janelas * self.janela_ms, unit='ms'))
+        serie.index.name = 'inicio'
+        serie['requisicoes'] = requisicoes
+        serie['throughput'] = requisicoes / (self.janela_ms / 1000)
+        if 'sucessos' in escalares.columns:
+            serie['taxa_erro'] = ((escalares['requisicoes'] - escalares['sucessos']) / escalares['requisicoes'] * 100).to_numpy()
+        if 'soma_tempo' in escalares.columns:
+            serie['tempo_medio'] = (escalares['soma_tempo'] / escalares['requisicoes']).to_numpy()
+            quantis = self._quantis_por_janela(janelas, [0.50, 0.90, 0.95, 0.99])
+            for nome, valores in zip(['p50', 'p90', 'p95', 'p99'], quantis):
+                serie[nome] = np.minimum(valores, escalares['max_tempo'].to_numpy())
+            serie['max_tempo'] = escalares['max_tempo'].to_numpy()
+        if 'threads' in escalares.columns:
+            serie['threads'] = escalares['threads'].to_numpy()
+        for nome, valores in decompor_janelas(escalares).items():
+            serie[nome] = valores.to_numpy()
+        serie.attrs['janela_ms'] = self.janela_ms
+        return serie
+    
+    def decomposicao_por_endpoint(self):
+        """Decomposição por (endpoint, inicio) das janelas com requisições"""
+        self._compactar()
+        if not self._endpoints:
+            return pd.DataFrame()
+        
+        somas = self._endpoints[0].sort_index()
+        decomposicao = decompor_janelas(somas)
+        if not decomposicao:
+            return pd.DataFrame()
+        tabela = pd.DataFrame({'requisicoes': somas['requisicoes']})
+        for nome, valores in decomposicao.items():
+            tabela[nome] = valores
+        janelas = pd.to_datetime(somas.index.get_level_values('janela') * self.janela_ms, unit='ms')
+        tabela.index = pd.MultiIndex.from_arrays([somas.index.get_level_values('endpoint'), janelas], names=['endpoint', 'inicio'])
+        tabela.attrs['janela_ms'] = self.janela_ms
+        return tabela.sort_index()
+    
+    def tempos_por_endpoint(self):
+        """Requisições e soma dos tempos por (janela, endpoint), janela como índice inteiro"""
+        self._compactar()
+        if not self._endpoints:
+            return pd.DataFrame(columns=['requisicoes', 'soma_tempo'])
+        return self._endpoints[0][['requisicoes', 'soma_tempo']].sort_index()
+    
+    def contar_acima(self, janelas, limiares):
+        """Amostras de cada janela acima do limiar da janela, contadas nos buckets (limiar NaN não conta)"""
+        self._compactar()
+        janelas = np.asarray(janelas, dtype=np.int64)
+        if not self._buckets or len(janelas) == 0:
+            return np.zeros(len(janelas), dtype=np.int64)
+        buckets = self._buckets[0]
+        chaves = buckets.index.to_numpy(dtype=np.int64)
+        posicao = chaves // LARGURA_CHAVE_JANELA - janelas[0]
+        dentro = (posicao >= 0) & (posicao < len(janelas))
+        posicao = posicao[dentro]
+        acima = self.modelo.valores_indices(chaves[dentro] % LARGURA_CHAVE_JANELA) > np.asarray(limiares, dtype=float)[posicao]
+        contagens = buckets.to_numpy(dtype=np.int64)[dentro]
+        return np.bincount(posicao[acima], weights=contagens[acima], minlength=len(janelas)).astype(np.int64)
+    
+    def heatmap(self):
+        """Células ocupadas do heatmap: colunas janela, endpoint, faixa (faixas_latencia) e contagem"""
+        self._compactar()
+        if not self._faixas:
+            return pd.DataFrame(columns=['janela', 'endpoint', 'faixa', 'contagem'])
+        tabela = self._faixas[0].rename('contagem').reset_index()
+        tabela['endpoint'] = tabela['endpoint'].astype(str)
+        tabela.attrs['janela_ms'] = self.janela_ms
+        return tabela
+    
+    def anomalias(self):
+        """Intervalos anômalos da série (ver detectar_anomalias)"""
+        return detectar_anomalias(self)
+    
+    def _quantis_por_janela(self, janelas, qs):
+        """Quantis de todas as janelas de uma vez, a partir dos buckets esparsos"""
+        buckets = self._buckets[0].sort_index()
+        chaves = buckets.index.to_numpy(dtype=np.int64)
+        contagens = buckets.to_numpy(dtype=np.int64)
+        janela_bucket = chaves // LARGURA_CHAVE_JANELA
+        valores = self.modelo.valores_indices(chaves % LARGURA_CHAVE_JANELA)
+        cumulativo = np.cumsum(contagens)
+        
+        # Posição da primeira chave de cada janela e total de amostras por janela
+        inicio = np.searchsorted(janela_bucket, janelas, side='left')
+        fim = np.searchsorted(janela_bucket, janelas, side='right')
+        deslocamento = np.where(inicio > 0, cumulativo[np.maximum(inicio - 1, 0)], 0)
+        totais = np.where(fim > 0, cumulativo[np.maximum(fim - 1, 0)], 0) - deslocamento
+        vazias = totais == 0
+        totais = np.maximum(totais, 1)
+        
+        resultados = []
+        ultimo = len(valores) - 1
+        for q in qs:
+            posicao = (totais - 1) * q
+            inferior = np.floor(posicao).astype(np.int64)
+            superior = np.minimum(inferior + 1, totais - 1)
+            valor_inferior = valores[np.minimum(np.searchsorted(cumulativo, deslocamento + inferior + 1), ultimo)]
+            valor_superior = valores[np.minimum(np.searchsorted(cumulativo, deslocamento + superior + 1), ultimo)]
+            resultado = valor_inferior + (posicao - inferior) * (valor_superior - valor_inferior)
+            resultados.append(np.where(vazias, np.nan, resultado))
+        return resultados
+
+def _mediana_mad_moveis(valores, largura):
+    """Mediana e MAD móveis centradas, vetorizadas (NaN ignorado, bordas com janela parcial)"""
+    metade = largura // 2
+    preenchido = np.pad(np.asarray(valores, dtype=float), metade, constant_values=np.nan)
+    janelas = np.lib.stride_tricks.sliding_window_view(preenchido, 2 * metade + 1)
+    mediana = np.nanmedian(janelas, axis=1)
+    mad = np.nanmedian(np.abs(janelas - mediana[:, None]), axis=1)
+    return mediana, mad
+
+def _z_robusto(valores, largura):
+    """(z robusto, mediana móvel) de cada janela; o MAD tem piso de 1% da mediana"""
+    mediana, mad = _mediana_mad_moveis(valores, largura)
+    escala = np.maximum(mad, np.maximum(np.abs(mediana) * 0.01, 1e-9))
+    return 0.6745 * (valores - mediana) / escala, mediana
+
+def _endpoints_afetados(tempos, inicio, fim):
+    """Endpoints cujo tempo médio nas janelas [inicio, fim) passa de FATOR_ENDPOINT_AFETADO x o resto do teste"""
+    if tempos.empty:
+        return []
+    janelas = tempos.index.get_level_values(0)
+    dentro = tempos[(janelas >= inicio) & (janelas < fim)].groupby(level=1, observed=True).sum()
+    total = tempos.groupby(level=1, observed=True).sum()
+    fora = total.sub(dentro, fill_value=0).reindex(dentro.index)
+    medio_dentro = dentro['soma_tempo'] / dentro['requisicoes']
+    medio_fora = fora['soma_tempo'] / fora['requisicoes'].where(fora['requisicoes'] > 0)
+    fator = (medio_dentro / medio_fora.where(medio_fora > 0)).dropna()
+    afetados = fator[fator >= FATOR_ENDPOINT_AFETADO].sort_values(ascending=False)
+    return [
+        {
+            'endpoint': str(endpoint),
+            'tempo_medio': float(medio_dentro[endpoint]),
+            'tempo_medio_fora': float(medio_fora[endpoint]),
+            'fator': float(valor),
+        }
+        for endpoint, valor in afetados.items()
+    ]
+
+def detectar_anomalias(janelas, largura=JANELAS_ANOMALIA, limiar=LIMIAR_ANOMALIA):
+    """Picos sustentados de p99 e quedas de throughput (z robusto de mediana/MAD móveis), em ordem cronológica"""
+    serie = janelas.serie()
+    if serie.empty or len(serie) < 3 or 'p99' not in serie.columns:
+        return []
+    
+    janela_ms = janelas.janela_ms
+    indices_janela = serie.index.as_unit('ms').asi8 // janela_ms
+    requisicoes = serie['requisicoes'].to_numpy(dtype=np.int64)
+    internas = np.ones(len(serie), dtype=bool)
+    internas[[0, -1]] = False
+    
+    p99 = np.where(requisicoes >= MINIMO_REQUISICOES_ANOMALIA, serie['p99'].to_numpy(dtype=float), np.nan)
+    z_p99, mediana_p99 = _z_robusto(p99, largura)
+    lentas = janelas.contar_acima(indices_janela, mediana_p99)
+    z_lentas, _ = _z_robusto(lentas, largura)
+    sustentado = (lentas >= MINIMO_AMOSTRAS_LENTAS) & (z_lentas > limiar)
+    pico = internas & (z_p99 > limiar) & (p99 >= mediana_p99 * (1 + VARIACAO_MINIMA_ANOMALIA)) & sustentado
+    
+    throughput = serie['throughput'].to_numpy(dtype=float)
+    z_throughput, mediana_throughput = _z_robusto(throughput, largura)
+    queda = internas & (z_throughput < -limiar) & (throughput <= mediana_throughput * (1 - VARIACAO_MINIMA_ANOMALIA))
+    threads = None
+    if 'threads' in serie.columns:
+        # Janelas sem amostras concluídas (travamento total) herdam as threads da anterior
+        threads = serie['threads'].ffill().to_numpy(dtype=float)
+        mediana_threads, _ = _mediana_mad_moveis(threads, largura)
+        queda &= threads >= mediana_threads
+    
+    anomala = pico | queda
+    anomala[1:-1] |= anomala[:-2] & anomala[2:]  # Uma janela normal não divide o intervalo
+    bordas = np.diff(np.concatenate([[0], anomala.astype(np.int8), [0]]))
+    tempos_endpoint = janelas.tempos_por_endpoint()
+    
+    anomalias = []
+    for inicio, fim in zip(np.flatnonzero(bordas == 1), np.flatnonzero(bordas == -1)):
+        trecho = slice(inicio, fim)
+        tipos = [nome for nome, marcas in (('p99', pico), ('throughput', queda)) if marcas[trecho].any()]
+        maior = inicio + int(np.nanargmax(np.where(pico[trecho], p99[trecho], -np.inf))) if pico[trecho].any() else None
+        menor = inicio + int(np.argmin(np.where(queda[trecho], throughput[trecho], np.inf))) if queda[trecho].any() else None
+        anomalias.append({
+            'inicio': serie.index[inicio].isoformat(timespec='milliseconds'),
+            'fim': (serie.index[fim - 1] + pd.Timedelta(milliseconds=janela_ms)).isoformat(timespec='milliseconds'),
+            'janelas': int(fim - inicio),
+            'tipos': tipos,
+            'p99_pico': float(p99[maior]) if maior is not None else None,
+            'p99_referencia': float(mediana_p99[maior]) if maior is not None else None,
+            'throughput_minimo': float(throughput[menor]) if menor is not None else None,
+            'throughput_referencia': float(mediana_throughput[menor]) if menor is not None else None,
+            'threads': int(np.nanmax(threads[trecho])) if threads is not None and not np.isnan(threads[trecho]).all() else None,
+            'endpoints': _endpoints_afetados(tempos_endpoint, indices_janela[inicio], indices_janela[fim - 1] + 1),
+        })
+    return anomalias
+
+def normalizar_codigo_resposta(codigo):
+    """responseCode sem o prefixo "Non HTTP response code: " ('' se ausente)"""
+    if codigo is None or pd.isna(codigo):
+        return ''
+    return PREFIXO_NAO_HTTP.sub('', str(codigo)).strip()
+
+def normalizar_mensagem_erro(mensagem):
+    """Modelo da mensagem de falha: números, ids e URLs viram marcadores"""
+    if mensagem is None or pd.isna(mensagem):
+        return ''
+    texto = PREFIXO_NAO_HTTP.sub('', str(mensagem))
+    texto = re.sub(r'https?://\S+', '<url>', texto)
+    texto = re.sub(r'\b[0-9a-fA-F]{8}(?:-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}\b|\b0x[0-9a-fA-F]+\b', '<id>', texto)
+    texto = re.sub(r'\d+', '<n>', texto)
+    return ' '.join(texto.split())[:TAMANHO_MAXIMO_MENSAGEM]
+
+def classificar_erro(codigo, mensagem):
+    """Classe da falha (chave de NATUREZA_ERRO) a partir do código e da mensagem normalizados"""
+    texto = f'{codigo} {mensagem}'
+    for classe, padrao in PADROES_ERRO:
+        if padrao.search(texto):
+            return classe
+    if not codigo.isdigit():
+        return 'outro'
+    numero = int(codigo)
+    if numero in (429, 503):
+        return 'sobrecarga_http'
+    if numero >= 500:
+        return 'http_5xx'
+    if numero >= 400:
+        return 'http_4xx'
+    return 'assercao'  # Resposta 2xx/3xx marcada como falha por uma asserção
+
+def _normalizar_categorias(coluna, funcao):
+    """Aplica funcao aos valores distintos da coluna (não a cada linha)"""
+    codigos, valores = pd.factorize(coluna, sort=False)
+    normalizados = np.array([funcao(v) for v in valores] + [funcao(None)], dtype=object)
+    return normalizados[codigos]
+
+def _instante(ms):
+    """Timestamp JTL (ms) em texto ISO, para o JSON das métricas"""
+    return pd.Timestamp(int(ms), unit='ms').isoformat(timespec='milliseconds')
+
+def _horario(instante):
+    """Hora (HH:MM:SS) de um instante ISO gravado por _instante"""
+    return f"{pd.Timestamp(instante):%H:%M:%S}"
+
+class AcumuladorErros(_TabelasParciais):
+    """Falhas agrupadas por código, mensagem normalizada e endpoint, no total e por janela"""
+    
+    CHAVES = ['codigo', 'mensagem', 'endpoint']
+    TABELAS = {
+        '_grupos': {'contagem': 'sum', 'primeiro': 'min', 'ultimo': 'max'},  # (codigo, mensagem, endpoint)
+        '_janelas': 'sum',  # (janela, codigo, mensagem, endpoint) -> falhas
+    }
+    
+    def __init__(self, janela_ms=JANELA_PADRAO_MS):
+        """Inicializa sem falhas"""
+        super().__init__()
+        self.janela_ms = janela_ms
+        # Início e fim de todas as amostras, para a série de erros cobrir o teste inteiro
+        self.janela_inicio = None
+        self.janela_fim = None
+    
+    def adicionar_chunk(self, chunk):
+        """Incorpora as falhas de um chunk (requer timeStamp e success)"""
+        if chunk.empty or 'timeStamp' not in chunk.columns or 'success' not in chunk.columns:
+            return
+        
+        timestamps = chunk['timeStamp'].to_numpy(dtype=np.int64)
+        inicio, fim = int(timestamps.min()) // self.janela_ms, int(timestamps.max()) // self.janela_ms
+        self.janela_inicio = inicio if self.janela_inicio is None else min(self.janela_inicio, inicio)
+        self.janela_fim = fim if self.janela_fim is None else max(self.janela_fim, fim)
+        
+        falhas = ~chunk['success'].to_numpy(dtype=bool)
+        if not falhas.any():
+            return
+        parte = chunk[falhas]
+        n = len(parte)
+        
+        def normalizada(nome, funcao):
+            return _normalizar_categorias(parte[nome], funcao) if nome in parte.columns else np.full(n, '', dtype=object)
+        
+        # failureMessage (asserções) é mais específica que a mensagem HTTP
+        mensagem = normalizada('failureMessage', normalizar_mensagem_erro)
+        mensagem_http = normalizada('responseMessage', normalizar_mensagem_erro)
+        tabela = pd.DataFrame({
+            'codigo': normalizada('responseCode', normalizar_codigo_resposta),
+            'mensagem': np.where(mensagem != '', mensagem, mensagem_http),
+            'endpoint': parte['label'].astype(str).to_numpy() if 'label' in parte.columns else '',
+            'ts': timestamps[falhas],
+        })
+        grupos = tabela.groupby(self.CHAVES, sort=False).agg(
+            contagem=('ts', 'size'), primeiro=('ts', 'min'), ultimo=('ts', 'max'),
+        )
+        tabela['janela'] = tabela['ts'] // self.janela_ms
+        self._acrescentar('_grupos', grupos)
+        self._acrescentar('_janelas', tabela.groupby(['janela', *self.CHAVES], sort=False).size())
+        self._compactar_se_necessario()
+    
+    def podar(self, janelas_mantidas):
+        """Descarta as janelas antigas (os grupos continuam acumulados)"""
+        self._compactar()
+        if self.janela_fim is None:
+            return
+        limite = self.janela_fim - janelas_mantidas + 1
+        self.janela_inicio = max(self.janela_inicio, limite)
+        self._podar_tabelas(limite, ['_janelas'])
+    
+    def mesclar(self, outro):
+        """Incorpora as falhas de outro acumulador com a mesma janela"""
+        if outro.janela_ms != self.janela_ms:
+            raise ValueError("Janelas com configurações diferentes não podem ser mescladas")
+        if outro.janela_inicio is not None:
+            self.janela_inicio = outro.janela_inicio if self.janela_inicio is None else min(self.janela_inicio, outro.janela_inicio)
+            self.janela_fim = outro.janela_fim if self.janela_fim is None else max(self.janela_fim, outro.janela_fim)
+        self._mesclar_tabelas(outro)
+        return self
+    
+    def _classes(self, indice):
+        """Classe de cada (codigo, mensagem, ...) do índice, calculada por par distinto"""
+        pares = pd.MultiIndex.from_arrays([indice.get_level_values('codigo'), indice.get_level_values('mensagem')])
+        codigos, distintos = pd.factorize(pares, sort=False)
+        classes = np.array([classificar_erro(codigo, mensagem) for codigo, mensagem in distintos], dtype=object)
+        return classes[codigos]
+    
+    def grupos(self):
+        """DataFrame com um grupo de falhas por linha, do mais frequente ao menos frequente"""
+        self._compactar()
+        if not self._grupos or self._grupos[0].empty:
+            return pd.DataFrame()
+        grupos = self._grupos[0]
+        classes = self._classes(grupos.index)
+        grupos = grupos.reset_index()
+        grupos.insert(3, 'classe', classes)
+        grupos.insert(4, 'natureza', [NATUREZA_ERRO[c] for c in classes])
+        return grupos.sort_values(['contagem', 'primeiro'], ascending=[False, True], ignore_index=True)
+    
+    def serie(self):
+        """Erros por janela (linhas, janelas vazias incluídas) e classe (colunas)"""
+        self._compactar()
+        if not self._janelas or self._janelas[0].empty:
+            return pd.DataFrame()
+        contagens = self._janelas[0]
+        tabela = pd.DataFrame({
+            'janela': contagens.index.get_level_values('janela'),
+            'classe': self._classes(contagens.index),
+            'erros': contagens.to_numpy(),
+        }).pivot_table(index='janela', columns='classe', values='erros', aggfunc='sum', fill_value=0)
+        janelas = np.arange(self.janela_inicio, self.janela_fim + 1)
+        tabela = tabela.reindex(janelas, fill_value=0)
+        tabela.index = pd.to_datetime(janelas * self.janela_ms, unit='ms')
+        tabela.index.name = 'inicio'
+        tabela.columns.name = None
+        tabela.attrs['janela_ms'] = self.janela_ms
+        return tabela
+    
+    def rajadas(self, serie=None):
+        """Janelas seguidas com pelo menos FATOR_RAJADA vezes a média da classe, em ordem cronológica"""
+        serie = self.serie() if serie is None else serie
+        rajadas = []
+        for classe in serie.columns:
+            contagens = serie[classe].to_numpy(dtype=np.int64)
+            limiar = max(MINIMO_ERROS_RAJADA, FATOR_RAJADA * contagens.mean())
+            acima = contagens >= limiar
+            acima[1:-1] |= acima[:-2] & acima[2:]  # Uma janela abaixo do limiar não divide a rajada
+            bordas = np.diff(np.concatenate([[0], acima.astype(np.int8), [0]]))
+            for inicio, fim in zip(np.flatnonzero(bordas == 1), np.flatnonzero(bordas == -1)):
+                rajadas.append({
+                    'classe': classe,
+                    'natureza': NATUREZA_ERRO[classe],
+                    'inicio': serie.index[inicio].isoformat(timespec='milliseconds'),
+                    'fim': (serie.index[fim - 1] + pd.Timedelta(milliseconds=self.janela_ms)).isoformat(timespec='milliseconds'),
+                    'janelas': int(fim - inicio),
+                    'erros': int(contagens[inicio:fim].sum()),
+                    'pico_por_janela': int(contagens[inicio:fim].max()),
+                    'media_por_janela': float(contagens.mean()),
+                })
+        return sorted(rajadas, key=lambda r: r['inicio'])
+    
+    def resumo(self):
+        """Dicionário serializável: totais por classe, grupos e rajadas ({} sem falhas)"""
+        grupos = self.grupos()
+        if grupos.empty:
+            return {}
+        total = int(grupos['contagem'].sum())
+        classes = grupos.groupby('classe').agg(
+            contagem=('contagem', 'sum'), primeiro=('primeiro', 'min'), ultimo=('ultimo', 'max'),
+        ).sort_values('contagem', ascending=False)
+        return {
+            'janela_ms': self.janela_ms,
+            'total': total,
+            'por_classe': {
+                classe: {
+                    'natureza': NATUREZA_ERRO[classe],
+                    'contagem': int(linha.contagem),
+                    'percentual': linha.contagem / total * 100,
+                    'primeira_ocorrencia': _instante(linha.primeiro),
+                    'ultima_ocorrencia': _instante(linha.ultimo),
+                }
+                for classe, linha in classes.iterrows()
+            },
+            'grupos': [
+                {
+                    'codigo': linha.codigo,
+                    'mensagem': linha.mensagem,
+                    'endpoint': linha.endpoint,
+                    'classe': linha.classe,
+                    'natureza': linha.natureza,
+                    'contagem': int(linha.contagem),
+                    'primeira_ocorrencia': _instante(linha.primeiro),
+                    'ultima_ocorrencia': _instante(linha.ultimo),
+                }
+                for linha in grupos.itertuples()
+            ],
+            'rajadas': self.rajadas(),
+        }
+
+def juntar_serie_erros(serie, erros):
+    """Acrescenta à série temporal uma coluna erros_<classe> por classe de falha"""
+    por_classe = erros.serie()
+    if serie.empty or por_classe.empty:
+        return serie
+    por_classe = por_classe.reindex(serie.index, fill_value=0)
+    for classe in por_classe.columns:
+        serie[f'erros_{classe}'] = por_classe[classe].to_numpy()
+    return serie
+
+class AcumuladorMetricas:
+    """Agregados incrementais de um JTL, alimentados chunk a chunk"""
+    
+    def __init__(self, janela_ms=None):
+        """Inicializa agregados vazios (janela_ms ativa as métricas por janela)"""
+        self.janela_ms = janela_ms
+        self.janelas = AcumuladorJanelas(janela_ms) if janela_ms else None
+        self.erros = AcumuladorErros(janela_ms or JANELA_PADRAO_MS)
+        self.total = 0
+        self.sucessos = 0
+        self.ts_inicio = None
+        self.ts_fim = None
+        self.histograma = HistogramaLatencia()
+        self.endpoints = {}
+        self.tem_tempo = False
+        self.tem_sucesso = False
+        self.tem_timestamp = False
+    
+    def adicionar_chunk(self, chunk):
+        """Incorpora um chunk (DataFrame) aos agregados"""
+        if chunk.empty:
+            return
+        
+        self.total += len(chunk)
+        
+        if 'success' in chunk.columns:
+            self.tem_sucesso = True
+            self.sucessos += int(chunk['success'].sum())
+        
+        if 'elapsed' in chunk.columns:
+            self.tem_tempo = True
+            self.histograma.adicionar(chunk['elapsed'].to_numpy())
+        
+        if 'timeStamp' in chunk.columns:
+            self.tem_timestamp = True
+            inicio, fim = int(chunk['timeStamp'].min()), int(chunk['timeStamp'].max())
+            self.ts_inicio = inicio if self.ts_inicio is None else min(self.ts_inicio, inicio)
+            self.ts_fim = fim if self.ts_fim is None else max(self.ts_fim, fim)
+        
+        for endpoint, agregado in agregar_endpoints(chunk).items():
+            if endpoint in self.endpoints:
+                self.endpoints[endpoint].mesclar(agregado)
+            else:
+                self.endpoints[endpoint] = agregado
+        
+        self.erros.adicionar_chunk(chunk)
+        if self.janelas is not None:
+            self.janelas.adicionar_chunk(chunk)
+    
+    def metricas(self, omissao_coordenada=False, intervalo_ms=None):
+        """Converte os agregados no dicionário de calcular_metricas (ver calcular_metricas para omissao_coordenada)"""
+        if self.total == 0:
+            return {}
+        
+        success_requests = self.sucessos if self.tem_sucesso else 0
+        failed_requests = self.total - success_requests
+        p50, p90, p95, p99 = self.histograma.quantis([0.50, 0.90, 0.95, 0.99])
+        
+        duracao = (self.ts_fim - self.ts_inicio) / 1000 if self.tem_timestamp else 0
+        
+        endpoints = {endpoint: agregado.metricas() for endpoint, agregado in self.endpoints.items()}
+        
+        return {
+            'total_requests': self.total,
+            'success_requests': success_requests,
+            'failed_requests': failed_requests,
+            'error_rate': failed_requests / self.total * 100,
+            'avg_response_time': self.histograma.media() if self.tem_tempo else 0,
+            'min_response_time': self.histograma.minimo if self.tem_tempo else 0,
+            'max_response_time': self.histograma.maximo if self.tem_tempo else 0,
+            'p50': float(p50) if self.tem_tempo else 0,
+            'p90': float(p90) if self.tem_tempo else 0,
+            'p95': float(p95) if self.tem_tempo else 0,
+            'p99': float(p99) if self.tem_tempo else 0,
+            'throughput': self.total / duracao if duracao > 0 else 0,
+            'omissao_coordenada': metricas_omissao_coordenada(self.histograma, intervalo_ms) if omissao_coordenada and self.tem_tempo else {},
+            'decomposicao': decomposicao_total(self.endpoints.values()),
+            'erros': self.erros.resumo(),
+            'anomalias': self.janelas.anomalias() if self.janelas is not None else None,
+            'endpoints': endpoints
+        }
+    
+    def serie(self):
+        """Série temporal (AcumuladorJanelas.serie) com os erros por classe (juntar_serie_erros)"""
+        return juntar_serie_erros(self.janelas.serie(), self.erros)
+    
+    def heatmap(self):
+        """Contagens do heatmap de latência (AcumuladorJanelas.heatmap)"""
+        return self.janelas.heatmap()
+    
+    def mesclar(self, outro):
+        """Incorpora os agregados de outro acumulador"""
+        if outro.total == 0:
+            return self
+        self.total += outro.total
+        self.sucessos += outro.sucessos
+        self.tem_tempo = self.tem_tempo or outro.tem_tempo
+        self.tem_sucesso = self.tem_sucesso or outro.tem_sucesso
+        self.histograma.mesclar(outro.histograma)
+        if outro.tem_timestamp:
+            self.tem_timestamp = True
+            self.ts_inicio = outro.ts_inicio if self.ts_inicio is None else min(self.ts_inicio, outro.ts_inicio)
+            self.ts_fim = outro.ts_fim if self.ts_fim is None else max(self.ts_fim, outro.ts_fim)
+        for endpoint, agregado in outro.endpoints.items():
+            if endpoint in self.endpoints:
+                self.endpoints[endpoint].mesclar(agregado)
+            else:
+                self.endpoints[endpoint] = copy.deepcopy(agregado)
+        if self.erros.janela_inicio is None and outro.erros.janela_ms != self.erros.janela_ms:
+            self.erros = AcumuladorErros(outro.erros.janela_ms)
+        self.erros.mesclar(outro.erros)
+        if outro.janelas is not None:
+            if self.janelas is None:
+                self.janela_ms = outro.janela_ms
+                self.janelas = AcumuladorJanelas(outro.janela_ms, outro.janelas.modelo.bits)
+            self.janelas.mesclar(outro.janelas)
+        return self
+
+def extrair_cenario(thread_name):
+    """Nome do Thread Group a partir do threadName do JMeter"""
+    correspondencia = PADRAO_THREAD_NAME.match(str(thread_name))
+    return correspondencia.group(1) if correspondencia else str(thread_name)
+
+def normalizar_nome_cenario(nome):
+    """Chave para comparar nomes de Thread Group do JMX e do JTL"""
+    return ' '.join(plano_jmx.corrigir_codificacao(str(nome)).split()).casefold()
+
+def ordenar_cenarios(nomes):
+    """Ordena cenários pelo número inicial ("1. ...", "2. ...") e depois pelo nome"""
+    def chave(nome):
+        numero = re.match(r'^(\d+)', nome)
+        return (int(numero.group(1)) if numero else float('inf'), nome)
+    return sorted(nomes, key=chave)
+
+class AcumuladorCenarios:
+    """Um AcumuladorMetricas por cenário (Thread Group), em uma única leitura"""
+    
+    def __init__(self, janela_ms=None):
+        """Inicializa sem cenários"""
+        self.janela_ms = janela_ms
+        self.cenarios = {}
+    
+    def adicionar_chunk(self, chunk):
+        """Particiona o chunk por cenário e alimenta cada acumulador"""
+        if chunk.empty:
+            return
+        if 'threadName' not in chunk.columns:
+            self._acumulador(None).adicionar_chunk(chunk)
+            return
+        
+        # O prefixo é extraído apenas dos threadNames distintos, não de cada linha
+        codigos, thread_names = pd.factorize(chunk['threadName'], sort=False)
+        nomes_cenario = [extrair_cenario(t) for t in thread_names]
+        codigos_cenario, cenarios = pd.factorize(np.asarray(nomes_cenario, dtype=object)[codigos])
+        
+        for codigo, parte in chunk.groupby(codigos_cenario, sort=False):
+            self._acumulador(cenarios[codigo]).adicionar_chunk(parte)
+    
+    def _acumulador(self, cenario):
+        """Acumulador do cenário, criado na primeira amostra"""
+        if cenario not in self.cenarios:
+            self.cenarios[cenario] = AcumuladorMetricas(self.janela_ms)
+        return self.cenarios[cenario]
+    
+    def combinado(self):
+        """Acumulador com todos os cenários mesclados"""
+        total = AcumuladorMetricas(self.janela_ms)
+        for acumulador in self.cenarios.values():
+            total.mesclar(acumulador)
+        return total
+    
+    def nomes(self):
+        """Cenários em ordem de execução (None, se houver, por último)"""
+        nomes = ordenar_cenarios([n for n in self.cenarios if n is not None])
+        if None in self.cenarios:
+            nomes.append(None)
+        return nomes
+    
+    def metricas(self, omissao_coordenada=False):
+        """Métricas de cada cenário, em ordem de execução"""
+        return {nome: self.cenarios[nome].metricas(omissao_coordenada) for nome in self.nomes()}
+    
+    def series(self):
+        """Série temporal de cada cenário (requer janela_ms)"""
+        return {nome: self.cenarios[nome].serie() for nome in self.nomes()}
+    
+    def heatmaps(self):
+        """Contagens do heatmap de latência de cada cenário (requer janela_ms)"""
+        return {nome: self.cenarios[nome].heatmap() for nome in self.nomes()}
+
+class CacheColunar:
+    """Cache binário colunar de um JTL em "<arquivo>.cache/", lido com np.memmap e recriado se o JTL mudar"""
+    
+    def __init__(self, arquivo_jtl):
+        """Inicializa o cache associado ao arquivo JTL"""
+        self.arquivo = Path(arquivo_jtl)
+        self.diretorio = self.arquivo.with_name(self.arquivo.name + '.cache')
+        self.meta = None
+        self._escrita = None
+    
+    def _impressao_digital(self):
+        """Identificação do JTL: caminho absoluto, tamanho e mtime"""
+        info = self.arquivo.stat()
+        return {
+            'arquivo': str(self.arquivo.resolve()),
+            'tamanho': info.st_size,
+            'mtime_ns': info.st_mtime_ns,
+            'versao': VERSAO_CACHE,
+            'esquema': sorted(COLUNAS_CACHE),
+        }
+    
+    def valido(self):
+        """Indica se existe cache completo e atual para o JTL"""
+        try:
+            with open(self.diretorio / 'meta.json', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if meta.get('impressao_digital') != self._impressao_digital():
+            return False
+        self.meta = meta
+        return True
+    
+    def _coluna(self, nome, inicio=0, fim=None):
+        """Coluna (ou fatia) reconstruída a partir do memmap"""
+        info = self.meta['colunas'][nome]
+        linhas = self.meta['linhas']
+        if linhas == 0:
+            dados = np.zeros(0, dtype=info['dtype'])
+        else:
+            dados = np.memmap(self.diretorio / f'{nome}.bin', dtype=info['dtype'], mode='r', shape=(linhas,))
+        dados = dados[inicio:fim]
+        if 'categorias' in info:
+            return pd.Categorical.from_codes(dados, categories=info['categorias'])
+        return dados
+    
+    def carregar(self, colunas=None):
+        """DataFrame com as colunas em cache (todas, se colunas=None)"""
+        nomes = [c for c in self.meta['colunas'] if colunas is None or c in colunas]
+        return pd.DataFrame({nome: self._coluna(nome) for nome in nomes}, copy=False)
+    
+    def iterar_chunks(self, tamanho_chunk, colunas=None):
+        """Gera DataFrames com fatias consecutivas do cache"""
+        nomes = [c for c in self.meta['colunas'] if colunas is None or c in colunas]
+        for inicio in range(0, self.meta['linhas'], tamanho_chunk):
+            fim = inicio + tamanho_chunk
+            yield pd.DataFrame({nome: self._coluna(nome, inicio, fim) for nome in nomes}, copy=False)
+    
+    def iniciar_escrita(self):
+        """Prepara o diretório para gravar um novo cache"""
+        self.descartar()
+        self.diretorio.mkdir()
+        self._escrita = {'linhas': 0, 'colunas': {}, 'arquivos': {}, 'categorias': {}}
+    
+    def adicionar_chunk(self, chunk):
+        """Acrescenta um chunk (colunas JTL) aos arquivos do cache"""
+        escrita = self._escrita
+        for nome, dtype in COLUNAS_CACHE.items():
+            if nome not in chunk.columns:
+                continue
+            if nome not in escrita['arquivos']:
+                if escrita['linhas'] > 0:
+                    continue  # Coluna ausente nos chunks anteriores
+                escrita['arquivos'][nome] = open(self.diretorio / f'{nome}.bin', 'wb')
+            
+            if dtype == 'category':
+                # Códigos globais: categorias de cada chunk são mapeadas uma vez
+                categorias = escrita['categorias'].setdefault(nome, {})
+                codigos, valores = pd.factorize(chunk[nome], sort=False)
+                mapa = np.array([categorias.setdefault(v, len(categorias)) for v in valores] + [-1], dtype=np.int32)
+                dados = mapa[codigos]
+                escrita['colunas'][nome] = {'dtype': 'int32'}
+            else:
+                dados = chunk[nome].to_numpy(dtype=dtype)
+                escrita['colunas'][nome] = {'dtype': np.dtype(dtype).name}
+            escrita['arquivos'][nome].write(np.ascontiguousarray(dados).tobytes())
+        escrita['linhas'] += len(chunk)
+    
+    def finalizar(self):
+        """Fecha os arquivos e grava o meta.json (marca o cache como completo)"""
+        escrita = self._escrita
+        for arquivo in escrita['arquivos'].values():
+            arquivo.close()
+        
+        for nome, categorias in escrita['categorias'].items():
+            # Mesmo tipo de código que o pandas usaria: a leitura não precisa converter
+            tipo = pd.Categorical.from_codes([], categories=list(categorias) or ['']).codes.dtype
+            caminho = self.diretorio / f'{nome}.bin'
+            if tipo != np.int32 and escrita['linhas'] > 0:
+                np.fromfile(caminho, dtype=np.int32).astype(tipo).tofile(caminho)
+            escrita['colunas'][nome] = {'dtype': tipo.name, 'categorias': list(categorias)}
+        
+        self.meta = {
+            'impressao_digital': self._impressao_digital(),
+            'linhas': escrita['linhas'],
+            'colunas': escrita['colunas'],
+        }
+        with open(self.diretorio / 'meta.json', 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f, ensure_ascii=False)
+        self._escrita = None
+    
+    def descartar(self):
+        """Remove o diretório do cache"""
+        shutil.rmtree(self.diretorio, ignore_errors=True)
+        self.meta = None
+        self._escrita = None
+    
+    def gravar(self, df):
+        """Grava o cache a partir de um DataFrame completo"""
+        self.iniciar_escrita()
+        self.adicionar_chunk(df)
+        self.finalizar()
+
+def detectar_formato_jtl(arquivo_jtl):
+    """'xml' se o JTL começa com um elemento XML, senão 'csv'"""
+    with open(arquivo_jtl, 'rb') as f:
+        inicio = f.read(512)
+    if inicio.startswith(b'\xef\xbb\xbf'):
+        inicio = inicio[3:]
+    inicio = inicio.lstrip()
+    return 'xml' if inicio.startswith(b'<') else 'csv'
+
+def _mensagem_falha_xml(amostra):
+    """failureMessage da primeira assertionResult com falha ou erro"""
+    for assercao in amostra.iterfind('assertionResult'):
+        if assercao.findtext('failure') == 'true' or assercao.findtext('error') == 'true':
+            return assercao.findtext('failureMessage')
+    return None
+
+def _dataframe_xml(dados, colunas):
+    """Converte as listas de atributos de um chunk XML nos tipos das colunas CSV"""
+    df = pd.DataFrame(dados)
+    for nome in df.columns:
+        dtype = colunas.get(nome) if colunas is not None else None
+        if nome == 'success':
+            df[nome] = df[nome] == 'true'
+        elif nome in COLUNAS_NUMERICAS_XML:
+            df[nome] = pd.to_numeric(df[nome]).fillna(0).astype(dtype or 'int64')
+        elif dtype is not None:
+            df[nome] = df[nome].astype(dtype)
+    return df
+
+def ler_jtl_xml(arquivo_jtl, colunas=None, tamanho_chunk=TAMANHO_CHUNK_PADRAO):
+    """Gera DataFrames das amostras de nível superior de um JTL XML, com memória constante (iterparse)"""
+    nomes = [c for c in COLUNAS_XML if colunas is None or c in colunas]
+    atributos = [(atributo, nome) for atributo, nome in ATRIBUTOS_XML.items() if nome in nomes]
+    dados = {nome: [] for nome in nomes}
+    linhas = 0
+    profundidade = 0
+    raiz = None
+
+    for evento, elemento in ET.iterparse(arquivo_jtl, events=('start', 'end')):
+        if evento == 'start':
+            if raiz is None:
+                raiz = elemento
+            profundidade += 1
+            continue
+        profundidade -= 1
+        if profundidade != 1:
+            continue  # Filhos e sub-resultados são lidos junto com a amostra pai
+
+        valores = elemento.attrib
+        for atributo, nome in atributos:
+            dados[nome].append(valores.get(atributo))
+        if 'URL' in dados:
+            dados['URL'].append(elemento.findtext('java.net.URL'))
+        if 'failureMessage' in dados:
+            dados['failureMessage'].append(_mensagem_falha_xml(elemento))
+        raiz.clear()
+
+        linhas += 1
+        if linhas == tamanho_chunk:
+            yield _dataframe_xml(dados, colunas)
+            dados = {nome: [] for nome in nomes}
+            linhas = 0
+
+    if linhas:
+        yield _dataframe_xml(dados, colunas)
+
+def compactar_jtl(df):
+    """Converte as colunas de um DataFrame JTL para TIPOS_COMPACTOS quando não há perda"""
+    for nome in df.columns:
+        coluna = df[nome]
+        dtype = TIPOS_COMPACTOS.get(nome)
+        texto = pd.api.types.is_object_dtype(coluna) or pd.api.types.is_string_dtype(coluna)
+        if isinstance(coluna.dtype, pd.CategoricalDtype):
+            continue
+        if dtype == 'category' or (dtype is None and texto):
+            df[nome] = coluna.astype('category')
+        elif dtype == 'bool' and texto:
+            df[nome] = coluna.astype(str).str.lower() == 'true'
+        elif dtype in ('int32', 'int64') and pd.api.types.is_numeric_dtype(coluna) and coluna.notna().all():
+            limite = np.iinfo(dtype).max
+            if len(coluna) == 0 or coluna.abs().max() <= limite:
+                df[nome] = coluna.astype(dtype)
+    return df
+
+def _ausentes_csv(tipos):
+    """Argumentos de read_csv que mantêm textos vazios como '' (categorias iguais em todos os trechos)"""
+    return {
+        'keep_default_na': False,
+        'na_values': {nome: ['', 'NaN', 'nan', 'NA', 'null'] for nome, dtype in tipos.items() if dtype != 'category'},
+    }
+
+class ErroLeituraJTL(Exception):
+    """JTL que não pôde ser lido (arquivo inacessível, CSV ou XML malformado)"""
+
+# ValueError inclui pd.errors.ParserError, UnicodeDecodeError e valores inválidos nas colunas tipadas
+ERROS_LEITURA_JTL = (OSError, ValueError, ET.ParseError)
+
+def ler_jtl(arquivo_jtl, colunas=None, tamanho_chunk=None):
+    """Lê um JTL CSV ou XML; com tamanho_chunk retorna um iterador de DataFrames"""
+    if detectar_formato_jtl(arquivo_jtl) == 'xml':
+        chunks = ler_jtl_xml(arquivo_jtl, colunas, tamanho_chunk or TAMANHO_CHUNK_PADRAO)
+        if tamanho_chunk:
+            return chunks
+        df = pd.concat(list(chunks) or [pd.DataFrame()], ignore_index=True)
+        return compactar_jtl(df) if colunas is None else df
+
+    if colunas is None:
+        if tamanho_chunk:
+            return pd.read_csv(arquivo_jtl, chunksize=tamanho_chunk)
+        # Textos lidos direto como categorias: as strings repetidas nunca são materializadas
+        categorias = {nome: 'category' for nome, dtype in TIPOS_COMPACTOS.items() if dtype == 'category'}
+        return compactar_jtl(pd.read_csv(arquivo_jtl, dtype=categorias, **_ausentes_csv(TIPOS_COMPACTOS)))
+    return pd.read_csv(
+        arquivo_jtl,
+        usecols=lambda coluna: coluna in colunas,
+        dtype=colunas,
+        chunksize=tamanho_chunk,
+        **_ausentes_csv(colunas),
+    )
+
+def _correlacao_cruzada(referencia, serie, minimo, maximo):
+    """(atrasos, correlações) de referencia(t) com serie(t + atraso) no intervalo pedido, via FFT"""
+    n = 1 << int(2 * len(referencia) - 1).bit_length()
+    produto = np.fft.irfft(np.fft.rfft(serie, n) * np.conj(np.fft.rfft(referencia, n)), n)
+    atrasos = np.arange(minimo, maximo + 1)
+    norma = np.sqrt(np.sum(referencia ** 2) * np.sum(serie ** 2))
+    return atrasos, produto[atrasos % n] / norma if norma > 0 else np.zeros(len(atrasos))
+
+class JTLDistribuido:
+    """JTLs dos nós de um teste distribuído, mesclados por timeStamp com os relógios corrigidos"""
+    
+    def __init__(self, arquivos, deslocamentos=None, usar_cache=False, tolerancia_ms=TOLERANCIA_ORDEM_MS):
+        """deslocamentos: ms a subtrair do timeStamp de cada nó (None = estimar)"""
+        self.arquivos = [Path(a) for a in arquivos]
+        if deslocamentos is not None and len(deslocamentos) != len(self.arquivos):
+            raise ValueError("Informe um deslocamento por arquivo")
+        self.usar_cache = usar_cache
+        self.tolerancia_ms = tolerancia_ms
+        self.nos = None
+        if deslocamentos is not None:
+            self.nos = [{'arquivo': str(a), 'deslocamento_ms': int(d), 'metodo': 'informado', 'correlacao': None}
+                        for a, d in zip(self.arquivos, deslocamentos)]
+    
+    def __str__(self):
+        """Nomes dos arquivos dos nós"""
+        return ' + '.join(a.name for a in self.arquivos)
+    
+    def tamanho_bytes(self):
+        """Soma dos tamanhos dos JTLs"""
+        return sum(a.stat().st_size for a in self.arquivos)
+    
+    def _chunks_no(self, indice, colunas, tamanho_chunk):
+        """Chunks de um nó, do cache colunar se houver um válido"""
+        arquivo = self.arquivos[indice]
+        cache = CacheColunar(arquivo) if self.usar_cache else None
+        if cache is not None and cache.valido():
+            return cache.iterar_chunks(tamanho_chunk, colunas)
+        return ler_jtl(arquivo, colunas, tamanho_chunk)
+    
+    def _latencias_no(self, indice):
+        """Requisições e soma dos tempos por JANELA_SKEW_MS, e o primeiro timeStamp, de um nó"""
+        partes = []
+        inicio = None
+        colunas = {'timeStamp': 'int64', 'elapsed': 'int64'}
+        for chunk in self._chunks_no(indice, colunas, TAMANHO_CHUNK_PADRAO):
+            if chunk.empty:
+                continue
+            timestamps = chunk['timeStamp'].to_numpy(dtype=np.int64)
+            inicio = int(timestamps.min()) if inicio is None else min(inicio, int(timestamps.min()))
+            tempos = pd.Series(chunk['elapsed'].to_numpy(dtype=np.int64), index=timestamps // JANELA_SKEW_MS)
+            partes.append(tempos.groupby(level=0).agg(['size', 'sum']))
+        if not partes:
+            return pd.DataFrame(columns=['size', 'sum']), None
+        return pd.concat(partes).groupby(level=0).sum(), inicio
+    
+    @staticmethod
+    def _filtrar_latencias(latencias, janelas):
+        """Latência média por janela sem a tendência (mediana móvel), padronizada; vazias = 0"""
+        media = (latencias['sum'] / latencias['size']).reindex(janelas)
+        tendencia = media.rolling(JANELAS_FILTRO_SKEW, center=True, min_periods=1).median()
+        desvio = (media - tendencia).fillna(0).to_numpy()
+        escala = desvio.std()
+        return desvio / escala if escala > 0 else desvio
+    
+    def estimar_deslocamentos(self):
+        """Deslocamento de relógio de cada nó em relação ao primeiro (também guardado em self.nos)"""
+        medidas = [self._latencias_no(i) for i in range(len(self.arquivos))]
+        referencia, inicio_referencia = medidas[0]
+        if inicio_referencia is None:
+            raise ValueError(f"JTL sem amostras: {self.arquivos[0]}")
+        
+        self.nos = []
+        for arquivo, (latencias, inicio) in zip(self.arquivos, medidas):
+            no = {'arquivo': str(arquivo), 'amostras': int(latencias['size'].sum()),
+                  'deslocamento_ms': 0, 'metodo': 'referencia', 'correlacao': None}
+            self.nos.append(no)
+            if latencias is referencia or inicio is None:
+                continue
+            
+            # Grosso: diferença entre os inícios; fino: pico da correlação das latências em volta dela
+            inicial = (inicio - inicio_referencia) // JANELA_SKEW_MS
+            busca = MAXIMO_SKEW_MS // JANELA_SKEW_MS
+            janelas = np.arange(min(referencia.index.min(), latencias.index.min() - inicial) - busca,
+                                max(referencia.index.max(), latencias.index.max() - inicial) + busca + 1)
+            atrasos, correlacoes = _correlacao_cruzada(
+                self._filtrar_latencias(referencia, janelas),
+                self._filtrar_latencias(latencias, janelas + inicial),
+                -busca, busca,
+            )
+            melhor = int(np.argmax(correlacoes))
+            no['correlacao'] = round(float(correlacoes[melhor]), 3)
+            if correlacoes[melhor] < CORRELACAO_MINIMA_SKEW:
+                no['deslocamento_ms'] = int(inicio - inicio_referencia)
+                no['metodo'] = 'inicio'
+                continue
+            
+            # Interpolação parabólica do pico: resolução melhor que uma janela
+            ajuste = 0.0
+            if 0 < melhor < len(correlacoes) - 1:
+                anterior, pico, seguinte = correlacoes[melhor - 1:melhor + 2]
+                curvatura = anterior - 2 * pico + seguinte
+                ajuste = 0.5 * (anterior - seguinte) / curvatura if curvatura < 0 else 0.0
+            no['deslocamento_ms'] = int(round((inicial + atrasos[melhor] + ajuste) * JANELA_SKEW_MS))
+            no['metodo'] = 'correlacao'
+        return self.nos
+    
+    @staticmethod
+    def _juntar(partes, colunas):
+        """Concatena e ordena por timeStamp, mantendo as categorias (que diferem entre chunks)"""
+        juntos = pd.concat(partes, ignore_index=True)
+        categorias = {c: 'category' for c in juntos.columns
+                      if (colunas or TIPOS_COMPACTOS).get(c) == 'category' and not isinstance(juntos[c].dtype, pd.CategoricalDtype)}
+        if categorias:
+            juntos = juntos.astype(categorias)
+        return juntos.sort_values('timeStamp', kind='stable', ignore_index=True)
+    
+    def iterar_chunks(self, colunas=None, tamanho_chunk=TAMANHO_CHUNK_PADRAO):
+        """Gera DataFrames de todos os nós em ordem de timeStamp corrigido (mescla k-way)"""
+        if self.nos is None:
+            self.estimar_deslocamentos()
+        if colunas is not None:
+            colunas = {**colunas, 'timeStamp': 'int64'}
+        leitores = [iter(self._chunks_no(i, colunas, tamanho_chunk)) for i in range(len(self.arquivos))]
+        deslocamentos = [no['deslocamento_ms'] for no in self.nos]
+        pendentes = [[] for _ in leitores]
+        lidos = [-np.inf] * len(leitores)
+        ativos = set(range(len(leitores)))
+        prontos, linhas_prontas = [], 0
+        
+        while ativos:
+            # Avança o nó mais atrasado: os demais ficam no máximo um chunk à frente
+            indice = min(ativos, key=lambda i: lidos[i])
+            chunk = next(leitores[indice], None)
+            if chunk is None:
+                ativos.discard(indice)
+            elif not chunk.empty:
+                chunk['timeStamp'] = chunk['timeStamp'].to_numpy(dtype=np.int64) - deslocamentos[indice]
+                pendentes[indice].append(chunk)
+                lidos[indice] = max(lidos[indice], int(chunk['timeStamp'].max()))
+            
+            # Nenhum nó ativo ainda vai ler amostras antes do limite
+            limite = min((lidos[i] - self.tolerancia_ms for i in ativos), default=np.inf)
+            for i, partes in enumerate(pendentes):
+                restantes = []
+                for parte in partes:
+                    antes = parte['timeStamp'].to_numpy() < limite
+                    if antes.all():
+                        prontos.append(parte)
+                        linhas_prontas += len(parte)
+                    elif antes.any():
+                        prontos.append(parte[antes])
+                        restantes.append(parte[~antes])
+                        linhas_prontas += int(antes.sum())
+                    else:
+                        restantes.append(parte)
+                pendentes[i] = restantes
+            
+            if prontos and (linhas_prontas >= tamanho_chunk or not ativos):
+                yield self._juntar(prontos, colunas)
+                prontos, linhas_prontas = [], 0
+    
+    def carregar(self):
+        """DataFrame com as amostras de todos os nós, ordenadas, na representação compacta"""
+        chunks = list(self.iterar_chunks())
+        if not chunks:
+            return pd.DataFrame()
+        return compactar_jtl(pd.concat(chunks, ignore_index=True))
 
 class AnalisadorJMeter:
     """Classe para análise de resultados JMeter"""
     
-    def __init__(self, arquivo_jtl):
-        """Inicializa o analisador com arquivo JTL"""
+    def __init__(self, arquivo_jtl, streaming=False, tamanho_chunk=TAMANHO_CHUNK_PADRAO, por_cenario=False, usar_cache=False, janela_ms=None):
+        """Inicializa o analisador com um arquivo JTL (ou um JTLDistribuido)"""
         self.arquivo = arquivo_jtl
+        self.streaming = streaming
+        self.tamanho_chunk = tamanho_chunk
+        self.por_cenario = por_cenario
+        self.janela_ms = janela_ms
+        self.distribuido = isinstance(arquivo_jtl, JTLDistribuido)
+        self.cache = CacheColunar(arquivo_jtl) if usar_cache and not self.distribuido else None
         self.df = None
-        self.carregar_dados()
+        self.acumulador = None
+        self.cenarios = None
+        if streaming:
+            self.carregar_dados_streaming()
+        else:
+            self.carregar_dados()
+    
+    def carregar_dados_streaming(self):
+        """Carrega o JTL em chunks, acumulando apenas as métricas"""
+        self.df = pd.DataFrame()
+        destino = self._novo_destino()
+        colunas = {**COLUNAS_STREAMING, **COLUNAS_CENARIO} if self.por_cenario else COLUNAS_STREAMING
+        try:
+            if self.cache is not None and self.cache.valido():
+                for chunk in _iterar_medindo(self.cache.iterar_chunks(self.tamanho_chunk, colunas), 'leitura_cache'):
+                    with etapa_perfil('agregacao'):
+                        destino.adicionar_chunk(chunk)
+            else:
+                gravar_cache = self.cache is not None
+                if gravar_cache:
+                    # O cache guarda todas as colunas, para servir a qualquer modo
+                    colunas = COLUNAS_CACHE
+                    self.cache.iniciar_escrita()
+                if self.distribuido:
+                    chunks = self.arquivo.iterar_chunks(colunas, self.tamanho_chunk)
+                else:
+                    chunks = ler_jtl(self.arquivo, colunas, self.tamanho_chunk)
+                for chunk in _iterar_medindo(chunks, 'leitura_jtl'):
+                    with etapa_perfil('agregacao'):
+                        destino.adicionar_chunk(chunk)
+                    if gravar_cache:
+                        with etapa_perfil('gravacao_cache'):
+                            self.cache.adicionar_chunk(chunk)
+                if gravar_cache:
+                    with etapa_perfil('gravacao_cache'):
+                        self.cache.finalizar()
+        except ERROS_LEITURA_JTL as erro:
+            if self.cache is not None:
+                self.cache.descartar()
+            raise ErroLeituraJTL(f"Erro ao carregar {self.arquivo}: {erro}") from erro
+        
+        if self.por_cenario:
+            self.cenarios = destino
+            self.acumulador = destino.combinado()
+        else:
+            self.acumulador = destino
+    
+    def _novo_destino(self):
+        """Acumulador da leitura em streaming"""
+        if self.por_cenario:
+            return AcumuladorCenarios(self.janela_ms)
+        return AcumuladorMetricas(self.janela_ms)
     
     def carregar_dados(self):
         """Carrega dados do arquivo JTL"""
         try:
-            # JTL pode ser CSV ou XML, tentamos CSV primeiro
-            self.df = pd.read_csv(self.arquivo)
-            # Renomear colunas para padrão
-            if 'timeStamp' in self.df.columns:
-                self.df['timestamp'] = pd.to_datetime(self.df['timeStamp'], unit='ms')
-            if 'elapsed' in self.df.columns:
-                self.df['response_time'] = self.df['elapsed']
-            if 'label' in self.df.columns:
-                self.df['endpoint'] = self.df['label']
-            if 'success' in self.df.columns:
-                self.df['is_success'] = self.df['success']
-        except:
-            print(f"Erro ao carregar {self.arquivo}")
-            self.df = pd.DataFrame()
-    
-    def calcular_metricas(self):
-        """Calcula métricas principais"""
+            if self.cache is not None and self.cache.valido():
+                with etapa_perfil('leitura_cache'):
+                    self.df = self.cache.carregar()
+            else:
+                # JTL pode ser CSV ou XML (detectado pelo conteúdo)
+                with etapa_perfil('leitura_jtl'):
+                    self.df = self.arquivo.carregar() if self.distribuido else ler_jtl(self.arquivo)
+                for nome in ('timeStamp', 'elapsed'):
+                    # O streaming falha na conversão de tipos; a carga completa deixaria o texto passar
+                    if nome in self.df.columns and not pd.api.types.is_numeric_dtype(self.df[nome]):
+                        raise ValueError(f"coluna {nome} com valores não numéricos")
+                if self.cache is not None:
+                    try:
+                        with etapa_perfil('gravacao_cache'):
+                            self.cache.gravar(self.df)
+                    except OSError:
+                        print(f"⚠️  Não foi possível gravar o cache de {self.arquivo}", file=sys.stderr)
+                        self.cache.descartar()
+        except ERROS_LEITURA_JTL as erro:
+            raise ErroLeituraJTL(f"Erro ao carregar {self.arquivo}: {erro}") from erro
+    
+    def calcular_metricas(self, omissao_coordenada=False, intervalo_ms=None):
+        """Calcula métricas principais (omissão coordenada só se pedida, com o intervalo do plano se informado)"""
+        if self.streaming:
+            return self.acumulador.metricas(omissao_coordenada, intervalo_ms)
+        
         if self.df.empty:
             return {}
         
         total_requests = len(self.df)
-        success_requests = self.df['is_success'].sum() if 'is_success' in self.df.columns else 0
+        success_requests = int(self.df['success'].sum()) if 'success' in self.df.columns else 0
         failed_requests = total_requests - success_requests
         error_rate = (failed_requests / total_requests * 100) if total_requests > 0 else 0
         
+        agregados = self._agregar_endpoints()
+        
+        # Percentis via histograma: uma passada vetorizada, sem ordenar a coluna
+        tem_tempo = 'elapsed' in self.df.columns
+        if tem_tempo:
+            histograma = HistogramaLatencia.de_valores(self.df['elapsed'])
+            p50, p90, p95, p99 = histograma.quantis([0.50, 0.90, 0.95, 0.99])
+        
         metricas = {
             'total_requests': total_requests,
             'success_requests': success_requests,
             'failed_requests': failed_requests,
             'error_rate': error_rate,
-            'avg_response_time': self.df['response_time'].mean() if 'response_time' in self.df.columns else 0,
-            'min_response_time': self.df['response_time'].min() if 'response_time' in self.df.columns else 0,
-            'max_response_time': self.df['response_time'].max() if 'response_time' in self.df.columns else 0,
-            'p50': self.df['response_time'].quantile(0.50) if 'response_time' in self.df.columns else 0,
-            'p90': self.df['response_time'].quantile(0.90) if 'response_time' in self.df.columns else 0,
-            'p95': self.df['response_time'].quantile(0.95) if 'response_time' in self.df.columns else 0,
-            'p99': self.df['response_time'].quantile(0.99) if 'response_time' in self.df.columns else 0,
+            'avg_response_time': histograma.media() if tem_tempo else 0,
+            'min_response_time': histograma.minimo if tem_tempo else 0,
+            'max_response_time': histograma.maximo if tem_tempo else 0,
+            'p50': float(p50) if tem_tempo else 0,
+            'p90': float(p90) if tem_tempo else 0,
+            'p95': float(p95) if tem_tempo else 0,
+            'p99': float(p99) if tem_tempo else 0,
             'throughput': self._calcular_throughput(),
-            'endpoints': self._analisar_endpoints()
+            'omissao_coordenada': metricas_omissao_coordenada(histograma, intervalo_ms) if omissao_coordenada and tem_tempo else {},
+            'decomposicao': decomposicao_total(agregados.values()),
+            'erros': self._agregar_erros().resumo(),
+            'anomalias': self._detectar_anomalias(),
+            'endpoints': {endpoint: agregado.metricas() for endpoint, agregado in agregados.items()}
         }
         
         return metricas
     
+    def calcular_metricas_por_cenario(self, omissao_coordenada=False):
+        """Calcula métricas por cenário (prefixo do threadName); sem threadName a chave é None"""
+        return self._acumulador_cenarios().metricas(omissao_coordenada)
+    
+    def calcular_serie_temporal(self, janela_ms=None):
+        """Métricas por janela de tempo (ver AcumuladorJanelas.serie)"""
+        if self.streaming:
+            if self.acumulador.janelas is None:
+                raise ValueError("Informe janela_ms para calcular séries no modo streaming")
+            return self.acumulador.serie()
+        
+        janelas = AcumuladorJanelas(janela_ms or self.janela_ms or JANELA_PADRAO_MS)
+        janelas.adicionar_chunk(self.df)
+        return juntar_serie_erros(janelas.serie(), self._agregar_erros(janelas.janela_ms))
+    
+    def calcular_decomposicao_por_endpoint(self, janela_ms=None):
+        """Conexão, servidor, transferência e bytes/s por endpoint e janela"""
+        if self.streaming:
+            if self.acumulador.janelas is None:
+                raise ValueError("Informe janela_ms para calcular séries no modo streaming")
+            return self.acumulador.janelas.decomposicao_por_endpoint()
+        
+        janelas = AcumuladorJanelas(janela_ms or self.janela_ms or JANELA_PADRAO_MS)
+        janelas.adicionar_chunk(self.df)
+        return janelas.decomposicao_por_endpoint()
+    
+    def calcular_heatmap(self, janela_ms=None):
+        """Contagens (janela, endpoint, faixa de latência) do heatmap"""
+        if self.streaming:
+            if self.acumulador.janelas is None:
+                raise ValueError("Informe janela_ms para calcular séries no modo streaming")
+            return self.acumulador.heatmap()
+        
+        janelas = AcumuladorJanelas(janela_ms or self.janela_ms or JANELA_PADRAO_MS)
+        janelas.adicionar_chunk(self.df)
+        return janelas.heatmap()
+    
+    def calcular_series_por_cenario(self):
+        """Série temporal de cada cenário (prefixo do threadName)"""
+        return self._acumulador_cenarios_janelas().series()
+    
+    def calcular_heatmaps_por_cenario(self):
+        """Contagens do heatmap de latência de cada cenário (prefixo do threadName)"""
+        return self._acumulador_cenarios_janelas().heatmaps()
+    
+    def _acumulador_cenarios_janelas(self):
+        """AcumuladorCenarios com métricas por janela (JANELA_PADRAO_MS se não informada)"""
+        if self.streaming and self.janela_ms is None:
+            raise ValueError("Informe janela_ms para calcular séries no modo streaming")
+        if self.janela_ms is None:
+            self.janela_ms = JANELA_PADRAO_MS
+            self.cenarios = None
+        return self._acumulador_cenarios()
+    
+    def acumuladores_por_cenario(self):
+        """AcumuladorMetricas de cada cenário, em ordem de execução"""
+        cenarios = self._acumulador_cenarios()
+        return {nome: cenarios.cenarios[nome] for nome in cenarios.nomes()}
+    
+    def acumulador_total(self):
+        """AcumuladorMetricas com todas as amostras do arquivo"""
+        if self.streaming and self.acumulador is not None:
+            return self.acumulador
+        return self._acumulador_cenarios().combinado()
+    
+    def _acumulador_cenarios(self):
+        """AcumuladorCenarios da leitura (streaming) ou do DataFrame (uma vez)"""
+        if self.cenarios is None:
+            if self.streaming:
+                raise ValueError("Use por_cenario=True para separar cenários no modo streaming")
+            self.cenarios = AcumuladorCenarios(self.janela_ms)
+            with etapa_perfil('agregacao'):
+                self.cenarios.adicionar_chunk(self.df)
+        return self.cenarios
+    
+    def uso_memoria(self):
+        """Memória ocupada pelas amostras carregadas (bytes totais e por linha)"""
+        linhas = len(self.df)
+        total = int(self.df.memory_usage(deep=True).sum())
+        return {
+            'linhas': linhas,
+            'bytes': total,
+            'bytes_por_linha': total / linhas if linhas else 0,
+            'bytes_arquivo': self.arquivo.tamanho_bytes() if self.distribuido else Path(self.arquivo).stat().st_size,
+        }
+    
     def _calcular_throughput(self):
         """Calcula throughput (req/s)"""
-        if 'timestamp' not in self.df.columns or self.df.empty:
+        if 'timeStamp' not in self.df.columns or self.df.empty:
             return 0
         
-        duracao = (self.df['timestamp'].max() - self.df['timestamp'].min()).total_seconds()
+        duracao = (int(self.df['timeStamp'].max()) - int(self.df['timeStamp'].min())) / 1000
         return len(self.df) / duracao if duracao > 0 else 0
     
-    def _analisar_endpoints(self):
-        """Analisa métricas por endpoint"""
-        if 'endpoint' not in self.df.columns:
-            return {}
+    def _agregar_endpoints(self):
+        """Agregados por endpoint (agregação em uma passada)"""
+        return agregar_endpoints(self.df)
+    
+    def _detectar_anomalias(self):
+        """Anomalias das janelas do DataFrame (None sem janela_ms)"""
+        if not self.janela_ms:
+            return None
+        janelas = AcumuladorJanelas(self.janela_ms)
+        janelas.adicionar_chunk(self.df)
+        return janelas.anomalias()
+    
+    def _agregar_erros(self, janela_ms=None):
+        """Falhas do DataFrame agrupadas (ver AcumuladorErros)"""
+        erros = AcumuladorErros(janela_ms or self.janela_ms or JANELA_PADRAO_MS)
+        erros.adicionar_chunk(self.df)
+        return erros
+
+class MonitorJTL:
+    """Acompanha um JTL ainda em escrita, processando só os bytes acrescentados a cada leitura"""
+    
+    def __init__(self, arquivo_jtl, intervalo=5, janela_ms=JANELA_PADRAO_MS, janelas_mantidas=300,
+                 limite_erro=20.0, limite_p99=None, parar_apos_inatividade=None):
+        """Inicializa o monitor (limites definem quando emitir alertas)"""
+        self.arquivo = Path(arquivo_jtl)
+        self.intervalo = intervalo
+        self.janela_ms = janela_ms
+        self.janelas_mantidas = janelas_mantidas
+        self.limite_erro = limite_erro
+        self.limite_p99 = limite_p99
+        self.parar_apos_inatividade = parar_apos_inatividade
+        self._reiniciar()
+    
+    def _reiniciar(self):
+        """Volta ao início do arquivo com agregados vazios"""
+        self.posicao = 0
+        self.cabecalho = None
+        self.resto = b''
+        self.acumulador = AcumuladorMetricas(self.janela_ms)
+    
+    def ler_novos_dados(self):
+        """Processa os bytes acrescentados desde a última leitura e retorna as amostras novas"""
+        if not self.arquivo.exists():
+            return 0
+        tamanho = self.arquivo.stat().st_size
+        if tamanho < self.posicao:
+            print("⚠️  Arquivo truncado ou recriado: reiniciando a leitura")
+            self._reiniciar()
         
-        endpoints = {}
-        for endpoint in self.df['endpoint'].unique():
-            df_endpoint = self.df[self.df['endpoint'] == endpoint]
-            endpoints[endpoint] = {
-                'count': len(df_endpoint),
-                'avg_time': df_endpoint['response_time'].mean() if 'response_time' in df_endpoint.columns else 0,
-                'max_time': df_endpoint['response_time'].max() if 'response_time' in df_endpoint.columns else 0,
-                'error_rate': ((~df_endpoint['is_success']).sum() / len(df_endpoint) * 100) if 'is_success' in df_endpoint.columns else 0
-            }
+        novas = 0
+        with open(self.arquivo, 'rb') as f:
+            while self.posicao < tamanho:
+                f.seek(self.posicao)
+                dados = f.read(min(tamanho - self.posicao, TAMANHO_BLOCO_TAIL))
+                if not dados:
+                    break
+                self.posicao += len(dados)
+                novas += self._processar_bytes(dados)
+        return novas
+    
+    @staticmethod
+    def _fim_ultimo_registro(dados):
+        """Posição da última quebra de linha fora de aspas (-1 se nenhuma); campos entre aspas podem ter quebras"""
+        corte = dados.rfind(b'\n')
+        aspas = dados.count(b'"', 0, corte) if corte >= 0 else 0
+        while corte >= 0 and aspas % 2:
+            anterior = dados.rfind(b'\n', 0, corte)
+            aspas -= dados.count(b'"', anterior + 1, corte)
+            corte = anterior
+        return corte
+    
+    def _processar_bytes(self, dados):
+        """Converte as linhas completas de um bloco e alimenta os agregados"""
+        dados = self.resto + dados
+        corte = self._fim_ultimo_registro(dados)
+        if corte < 0:
+            self.resto = dados
+            return 0
+        completos, self.resto = dados[:corte + 1], dados[corte + 1:]
         
-        return endpoints
+        if self.cabecalho is None:
+            inicio = completos[3:] if completos.startswith(b'\xef\xbb\xbf') else completos
+            if inicio.lstrip().startswith(b'<'):
+                raise ValueError("O modo acompanhar suporta apenas JTL CSV")
+            fim_cabecalho = completos.find(b'\n')
+            self.cabecalho = completos[:fim_cabecalho + 1]
+            completos = completos[fim_cabecalho + 1:]
+            if not completos:
+                return 0
+        
+        chunk = pd.read_csv(
+            io.BytesIO(self.cabecalho + completos),
+            usecols=lambda coluna: coluna in COLUNAS_STREAMING,
+            dtype=COLUNAS_STREAMING,
+            **_ausentes_csv(COLUNAS_STREAMING),
+        )
+        self.acumulador.adicionar_chunk(chunk)
+        self.acumulador.janelas.podar(self.janelas_mantidas)
+        self.acumulador.erros.podar(self.janelas_mantidas)
+        return len(chunk)
+    
+    def resumo(self):
+        """Texto com as métricas acumuladas e as da última janela completa"""
+        metricas = self.acumulador.metricas()
+        if not metricas:
+            return f"[{datetime.now():%H:%M:%S}] ⏳ Aguardando amostras em {self.arquivo}..."
+        
+        linhas = [
+            f"[{datetime.now():%H:%M:%S}] {metricas['total_requests']:,} req | "
+            f"erro {metricas['error_rate']:.2f}% | {metricas['throughput']:.1f} req/s | "
+            f"P95 {metricas['p95']:.0f} ms | P99 {metricas['p99']:.0f} ms"
+        ]
+        
+        serie = self.acumulador.janelas.serie()
+        # A última janela ainda pode estar recebendo amostras
+        if len(serie) >= 2:
+            inicio, janela = serie.index[-2], serie.iloc[-2]
+            texto = f"   Última janela ({inicio:%H:%M:%S}): {janela['throughput']:.1f} req/s"
+            if 'taxa_erro' in serie.columns:
+                texto += f" | erro {janela['taxa_erro']:.2f}%"
+            if 'p99' in serie.columns:
+                texto += f" | P99 {janela['p99']:.0f} ms"
+            if 'threads' in serie.columns:
+                texto += f" | {janela['threads']:.0f} threads"
+            linhas.append(texto)
+            
+            if 'taxa_erro' in serie.columns and janela['taxa_erro'] > self.limite_erro:
+                linhas.append(f"   🚨 ALERTA: taxa de erro acima de {self.limite_erro:.0f}%")
+            if self.limite_p99 is not None and 'p99' in serie.columns and janela['p99'] > self.limite_p99:
+                linhas.append(f"   🚨 ALERTA: P99 acima de {self.limite_p99:.0f} ms")
+        
+        erros = metricas['erros'].get('por_classe', {})
+        if erros:
+            linhas.append("   Erros: " + ' | '.join(f"{classe} {dados['contagem']:,}" for classe, dados in erros.items()))
+        return '\n'.join(linhas)
+    
+    def executar(self):
+        """Acompanha o arquivo até Ctrl+C (ou inatividade) e retorna as métricas"""
+        print(f"👀 Acompanhando {self.arquivo} (resumo a cada {self.intervalo}s, Ctrl+C para encerrar)\n")
+        ultimo_resumo = 0
+        ultima_atividade = time.monotonic()
+        try:
+            while True:
+                if self.ler_novos_dados():
+                    ultima_atividade = time.monotonic()
+                agora = time.monotonic()
+                if agora - ultimo_resumo >= self.intervalo:
+                    print(self.resumo())
+                    ultimo_resumo = agora
+                if self.parar_apos_inatividade and agora - ultima_atividade > self.parar_apos_inatividade:
+                    print("\n⏹️  Arquivo sem novas amostras: encerrando")
+                    break
+                time.sleep(min(1, self.intervalo))
+        except KeyboardInterrupt:
+            print("\n⏹️  Acompanhamento interrompido")
+        
+        self.ler_novos_dados()
+        print(self.resumo())
+        return self.acumulador.metricas()
+
+def perfil_baseline(acumulador):
+    """Resumo serializável de um teste: métricas, histogramas e throughput por janela"""
+    metricas = acumulador.metricas()
+    perfil = {
+        'metricas': {k: v for k, v in metricas.items() if k != 'endpoints'},
+        'histograma': acumulador.histograma.para_dict(),
+        'throughput_janelas': [],
+        'endpoints': {},
+    }
+    if acumulador.janelas is not None:
+        serie = acumulador.janelas.serie()
+        if not serie.empty:
+            perfil['throughput_janelas'] = serie['throughput'].tolist()
+    for endpoint, agregado in acumulador.endpoints.items():
+        perfil['endpoints'][endpoint] = {
+            'metricas': agregado.metricas(),
+            'histograma': agregado.histograma.para_dict(),
+        }
+    return perfil
+
+def salvar_baseline(caminho, perfis, origem=None):
+    """Grava os perfis {teste: perfil_baseline(...)} como baseline em JSON"""
+    dados = {
+        'criado_em': datetime.now().isoformat(timespec='seconds'),
+        'origem': origem,
+        'testes': perfis,
+    }
+    Path(caminho).write_text(json.dumps(dados, ensure_ascii=False, default=_valor_json), encoding='utf-8')
+
+def carregar_baseline(caminho):
+    """Lê um baseline gravado por salvar_baseline (ValueError se o JSON não for um baseline)"""
+    baseline = json.loads(Path(caminho).read_text(encoding='utf-8'))
+    if not isinstance(baseline, dict) or not isinstance(baseline.get('testes'), dict):
+        raise ValueError("o arquivo não contém os testes de um baseline")
+    return baseline
+
+class ComparadorBaseline:
+    """Compara uma execução com o baseline por intervalos bootstrap da diferença"""
+    
+    AMOSTRAS_MINIMAS = 30
+    
+    def __init__(self, baseline, confianca=0.95, tolerancia=5.0, reamostragens=1000, semente=42):
+        """Inicializa com o baseline carregado (dicionário de carregar_baseline)"""
+        self.baseline = baseline
+        self.confianca = confianca
+        self.tolerancia = tolerancia
+        self.reamostragens = reamostragens
+        self.rng = np.random.default_rng(semente)
+    
+    def comparar(self, perfis):
+        """Compara {teste: perfil_baseline(...)} e retorna uma linha por métrica"""
+        linhas = []
+        for teste, atual in perfis.items():
+            base = self.baseline['testes'].get(teste)
+            if base is None:
+                continue
+            linhas += self._comparar_latencia(teste, None, base, atual)
+            linhas += self._comparar_throughput(teste, base, atual)
+            for endpoint, dados_atual in atual['endpoints'].items():
+                if endpoint in base['endpoints']:
+                    linhas += self._comparar_latencia(teste, endpoint, base['endpoints'][endpoint], dados_atual)
+        return linhas
+    
+    def testes_ausentes(self, perfis):
+        """Testes do baseline que não aparecem na execução comparada"""
+        return [teste for teste in self.baseline['testes'] if teste not in perfis]
+    
+    def _intervalo(self, diferencas):
+        """Intervalo percentil das diferenças bootstrap"""
+        alfa = (1 - self.confianca) / 2 * 100
+        return np.percentile(diferencas, [alfa, 100 - alfa], axis=-1)
+    
+    def _comparar_latencia(self, teste, endpoint, base, atual):
+        """P95 e P99: maior é pior"""
+        h_base = HistogramaLatencia.de_dict(base['histograma'])
+        h_atual = HistogramaLatencia.de_dict(atual['histograma'])
+        if min(h_base.total, h_atual.total) < self.AMOSTRAS_MINIMAS:
+            return []
+        
+        qs = [0.95, 0.99]
+        diferencas = h_atual.bootstrap_quantis(qs, self.reamostragens, self.rng) - h_base.bootstrap_quantis(qs, self.reamostragens, self.rng)
+        inferiores, superiores = self._intervalo(diferencas)
+        
+        linhas = []
+        for i, nome in enumerate(['p95', 'p99']):
+            valor_base, valor_atual = h_base.quantil(qs[i]), h_atual.quantil(qs[i])
+            variacao = (valor_atual - valor_base) / valor_base * 100 if valor_base > 0 else 0
+            linhas.append(self._linha(teste, endpoint, nome, valor_base, valor_atual, variacao,
+                                      inferiores[i], superiores[i], inferiores[i] > 0 and variacao > self.tolerancia))
+        return linhas
+    
+    def _comparar_throughput(self, teste, base, atual):
+        """Throughput: menor é pior; bootstrap da média das janelas"""
+        janelas_base = np.asarray(base['throughput_janelas'], dtype=float)
+        janelas_atual = np.asarray(atual['throughput_janelas'], dtype=float)
+        if min(len(janelas_base), len(janelas_atual)) < self.AMOSTRAS_MINIMAS:
+            return []
+        
+        def medias(janelas):
+            indices = self.rng.integers(0, len(janelas), size=(self.reamostragens, len(janelas)))
+            return janelas[indices].mean(axis=1)
+        
+        inferior, superior = self._intervalo(medias(janelas_atual) - medias(janelas_base))
+        valor_base = base['metricas']['throughput']
+        valor_atual = atual['metricas']['throughput']
+        variacao = (valor_atual - valor_base) / valor_base * 100 if valor_base > 0 else 0
+        return [self._linha(teste, None, 'throughput', valor_base, valor_atual, variacao,
+                            inferior, superior, superior < 0 and variacao < -self.tolerancia)]
+    
+    @staticmethod
+    def _linha(teste, endpoint, metrica, base, atual, variacao, inferior, superior, regressao):
+        """Linha de resultado da comparação"""
+        return {
+            'teste': teste,
+            'endpoint': endpoint,
+            'metrica': metrica,
+            'baseline': float(base),
+            'atual': float(atual),
+            'variacao_pct': float(variacao),
+            'ic_inferior': float(inferior),
+            'ic_superior': float(superior),
+            'regressao': bool(regressao),
+        }
+    
+    def relatorio(self, linhas):
+        """Tabela textual da comparação"""
+        texto = [f"{'Teste / Endpoint':<60} {'Métrica':<11} {'Baseline':>10} {'Atual':>10} {'Var.':>8}  IC {self.confianca:.0%} (atual - base)"]
+        texto.append("-" * 130)
+        for linha in linhas:
+            nome = linha['teste'] if linha['endpoint'] is None else f"  {linha['endpoint']}"
+            marca = "🔴" if linha['regressao'] else "  "
+            texto.append(
+                f"{nome[:60]:<60} {linha['metrica']:<11} {linha['baseline']:>10.2f} {linha['atual']:>10.2f} "
+                f"{linha['variacao_pct']:>+7.1f}%  [{linha['ic_inferior']:+.2f}, {linha['ic_superior']:+.2f}] {marca}"
+            )
+        return '\n'.join(texto)
+
+class HistoricoExecucoes:
+    """Histórico de execuções em SQLite (métricas, histogramas e janelas), consultado sem reler os JTLs"""
+    
+    ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS execucoes (
+            id INTEGER PRIMARY KEY,
+            inicio INTEGER NOT NULL,
+            fim INTEGER NOT NULL,
+            amostras INTEGER NOT NULL,
+            registrada_em TEXT NOT NULL,
+            rotulo TEXT,
+            origem TEXT,
+            janela_ms INTEGER,
+            UNIQUE (inicio, fim, amostras)
+        );
+        CREATE INDEX IF NOT EXISTS idx_execucoes_inicio ON execucoes (inicio);
+        CREATE TABLE IF NOT EXISTS metricas (
+            execucao INTEGER NOT NULL REFERENCES execucoes (id) ON DELETE CASCADE,
+            cenario TEXT NOT NULL,
+            endpoint TEXT NOT NULL,
+            amostras INTEGER, falhas INTEGER, taxa_erro REAL, media REAL, maximo REAL,
+            p50 REAL, p90 REAL, p95 REAL, p99 REAL, throughput REAL,
+            histograma BLOB,
+            PRIMARY KEY (execucao, cenario, endpoint)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_metricas_endpoint ON metricas (endpoint, cenario, execucao);
+        CREATE TABLE IF NOT EXISTS janelas (
+            execucao INTEGER NOT NULL REFERENCES execucoes (id) ON DELETE CASCADE,
+            cenario TEXT NOT NULL,
+            inicio INTEGER NOT NULL,
+            requisicoes INTEGER, taxa_erro REAL, tempo_medio REAL,
+            p50 REAL, p90 REAL, p95 REAL, p99 REAL, max_tempo REAL, threads INTEGER,
+            PRIMARY KEY (execucao, cenario, inicio)
+        ) WITHOUT ROWID;
+    """
+    
+    def __init__(self, caminho):
+        """Abre (ou cria) o banco de histórico"""
+        self.caminho = Path(caminho)
+        self.conexao = sqlite3.connect(self.caminho)
+        self.conexao.execute('PRAGMA foreign_keys = ON')
+        self.conexao.executescript(self.ESQUEMA)
+    
+    def fechar(self):
+        """Fecha a conexão com o banco"""
+        self.conexao.close()
+    
+    def registrar(self, acumuladores, origem=None, rotulo=None):
+        """Grava uma execução ({teste: AcumuladorMetricas}) e retorna seu id; o mesmo JTL substitui o registro"""
+        acumuladores = {nome: a for nome, a in acumuladores.items() if a.total > 0}
+        todos = AcumuladorMetricas()
+        for acumulador in acumuladores.values():
+            todos.mesclar(acumulador)
+        if not todos.tem_timestamp:
+            raise ValueError("Execuções sem timeStamp não podem ser registradas no histórico")
+        
+        with self.conexao:
+            chave = (todos.ts_inicio, todos.ts_fim, todos.total)
+            self.conexao.execute('DELETE FROM execucoes WHERE inicio = ? AND fim = ? AND amostras = ?', chave)
+            execucao = self.conexao.execute(
+                'INSERT INTO execucoes (inicio, fim, amostras, registrada_em, rotulo, origem, janela_ms) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (*chave, datetime.now().isoformat(timespec='seconds'), rotulo,
+                 json.dumps([str(o) for o in origem], ensure_ascii=False) if origem else None, todos.janela_ms),
+            ).lastrowid
+            for cenario, acumulador in [('', todos), *acumuladores.items()]:
+                self.conexao.executemany(
+                    f'INSERT INTO metricas VALUES ({", ".join("?" * (len(METRICAS_HISTORICO) + 4))})',
+                    self._linhas_metricas(execucao, cenario, acumulador),
+                )
+                if acumulador.janelas is not None:
+                    self.conexao.executemany(
+                        f'INSERT INTO janelas VALUES ({", ".join("?" * (len(COLUNAS_JANELAS_HISTORICO) + 3))})',
+                        self._linhas_janelas(execucao, cenario, acumulador.janelas.serie()),
+                    )
+        return execucao
+    
+    @staticmethod
+    def _linha_metricas(execucao, cenario, endpoint, histograma, amostras, falhas, duracao):
+        """Linha da tabela metricas (histograma comprimido em zlib)"""
+        tem_tempo = histograma.total > 0
+        quantis = histograma.quantis([0.50, 0.90, 0.95, 0.99]) if tem_tempo else [None] * 4
+        return (
+            execucao, cenario, endpoint, amostras, falhas, falhas / amostras * 100 if amostras else 0,
+            histograma.media() if tem_tempo else None, histograma.maximo,
+            *(float(q) if q is not None else None for q in quantis),
+            amostras / duracao if duracao > 0 else 0,
+            zlib.compress(json.dumps(histograma.para_dict()).encode()),
+        )
+    
+    def _linhas_metricas(self, execucao, cenario, acumulador):
+        """Linhas do teste (endpoint '') e de cada endpoint"""
+        falhas = acumulador.total - acumulador.sucessos if acumulador.tem_sucesso else 0
+        duracao = (acumulador.ts_fim - acumulador.ts_inicio) / 1000 if acumulador.tem_timestamp else 0
+        yield self._linha_metricas(execucao, cenario, '', acumulador.histograma, acumulador.total, falhas, duracao)
+        for endpoint, agregado in acumulador.endpoints.items():
+            falhas = agregado.count - agregado.sucessos if agregado.tem_sucesso else 0
+            duracao = (agregado.ts_fim - agregado.ts_inicio) / 1000 if agregado.ts_inicio is not None else 0
+            yield self._linha_metricas(execucao, cenario, str(endpoint), agregado.histograma, agregado.count, falhas, duracao)
+    
+    @staticmethod
+    def _linhas_janelas(execucao, cenario, serie):
+        """Linhas da tabela janelas a partir de AcumuladorJanelas.serie"""
+        if serie.empty:
+            return []
+        valores = serie.reindex(columns=COLUNAS_JANELAS_HISTORICO).astype(object)
+        valores = valores.where(valores.notna(), None)
+        inicios = serie.index.as_unit('ms').asi8
+        return [(execucao, cenario, int(inicio), *linha) for inicio, linha in zip(inicios, valores.itertuples(index=False))]
+    
+    def execucoes(self, ultimas=None):
+        """Execuções registradas, da mais antiga para a mais recente"""
+        consulta = 'SELECT id, inicio, fim, amostras, registrada_em, rotulo, origem, janela_ms FROM execucoes ORDER BY inicio DESC'
+        parametros = ()
+        if ultimas:
+            consulta += ' LIMIT ?'
+            parametros = (ultimas,)
+        tabela = pd.read_sql_query(consulta, self.conexao, params=parametros, index_col='id').iloc[::-1]
+        tabela['inicio'] = pd.to_datetime(tabela['inicio'], unit='ms')
+        tabela['fim'] = pd.to_datetime(tabela['fim'], unit='ms')
+        return tabela
+    
+    def tendencia(self, metrica='p95', endpoint='', cenario='', ultimas=60):
+        """Valor de uma métrica nas últimas execuções, da mais antiga para a mais recente"""
+        if metrica not in METRICAS_HISTORICO:
+            raise ValueError(f"Métrica desconhecida: {metrica} (use {', '.join(METRICAS_HISTORICO)})")
+        tabela = pd.read_sql_query(
+            f'SELECT e.id, e.inicio, e.rotulo, m.{metrica} FROM execucoes e '
+            'JOIN metricas m ON m.execucao = e.id AND m.cenario = ? AND m.endpoint = ? '
+            'ORDER BY e.inicio DESC LIMIT ?',
+            self.conexao, params=(cenario, endpoint, ultimas), index_col='id',
+        ).iloc[::-1]
+        tabela['inicio'] = pd.to_datetime(tabela['inicio'], unit='ms')
+        return tabela
+    
+    def histograma(self, endpoint='', cenario='', ultimas=60):
+        """Histogramas das últimas execuções mesclados (percentis do período todo)"""
+        linhas = self.conexao.execute(
+            'SELECT m.histograma FROM execucoes e '
+            'JOIN metricas m ON m.execucao = e.id AND m.cenario = ? AND m.endpoint = ? '
+            'ORDER BY e.inicio DESC LIMIT ?',
+            (cenario, endpoint, ultimas),
+        )
+        total = HistogramaLatencia()
+        for (dados,) in linhas:
+            total.mesclar(HistogramaLatencia.de_dict(json.loads(zlib.decompress(dados))))
+        return total
+    
+    def janelas(self, execucao, cenario=''):
+        """Série por janela gravada de uma execução (mesmas colunas de AcumuladorJanelas.serie)"""
+        tabela = pd.read_sql_query(
+            f'SELECT inicio, {", ".join(COLUNAS_JANELAS_HISTORICO)} FROM janelas '
+            'WHERE execucao = ? AND cenario = ? ORDER BY inicio',
+            self.conexao, params=(execucao, cenario),
+        )
+        tabela.index = pd.to_datetime(tabela.pop('inicio'), unit='ms')
+        janela_ms = self.conexao.execute('SELECT janela_ms FROM execucoes WHERE id = ?', (execucao,)).fetchone()
+        if janela_ms and janela_ms[0]:
+            tabela['throughput'] = tabela['requisicoes'] / (janela_ms[0] / 1000)
+            tabela.attrs['janela_ms'] = janela_ms[0]
+        return tabela
+
+def associar_plano_jmx(nomes, arquivo_jmx):
+    """{teste: Thread Group do JMX} para os testes com nome de cenário no plano"""
+    plano = {normalizar_nome_cenario(nome): grupo for nome, grupo in plano_jmx.ler_plano_jmx(arquivo_jmx).items()}
+    return {nome: plano[normalizar_nome_cenario(nome)] for nome in nomes if normalizar_nome_cenario(nome) in plano}
+
+def verificar_lei_little(metricas, grupo):
+    """Confere a Lei de Little (N = X * R) de um cenário contra as threads do seu Thread Group"""
+    threads = grupo.get('threads')
+    if not threads or not metricas or metricas['throughput'] <= 0:
+        return {}
+    
+    duracao = metricas['total_requests'] / metricas['throughput']
+    ramp_up = grupo.get('ramp_up') or 0
+    # Rampa linear: em média metade das threads ausentes durante o ramp-up
+    threads_medias = threads * (1 - min(ramp_up, duracao) / (2 * duracao)) if duracao > 0 else threads
+    concorrencia = metricas['throughput'] * metricas['avg_response_time'] / 1000
+    razao = concorrencia / threads_medias
+    
+    loops = grupo.get('loops')
+    amostras_esperadas = threads * loops * len(metricas['endpoints']) if loops and loops > 0 and metricas['endpoints'] else None
+    
+    if razao < LIMITES_LEI_LITTLE[0]:
+        diagnostico = 'threads ociosas: o servidor ou o gerador limitou o envio'
+    elif razao > LIMITES_LEI_LITTLE[1]:
+        diagnostico = 'concorrência acima da configurada: amostras de outros Thread Groups?'
+    else:
+        diagnostico = 'consistente com o modelo fechado'
+    
+    return {
+        'threads': threads,
+        'ramp_up': ramp_up,
+        'loops': loops,
+        'threads_medias': threads_medias,
+        'concorrencia_medida': concorrencia,
+        'razao': razao,
+        'amostras_esperadas': amostras_esperadas,
+        'amostras_medidas': metricas['total_requests'],
+        'diagnostico': diagnostico,
+    }
+
+class ModeloUSL:
+    """Lei Universal de Escalabilidade: X(N) = λN / (1 + σ(N-1) + κN(N-1))"""
+    
+    def __init__(self, lambda_, sigma, kappa, r2=None):
+        """Modelo com coeficientes conhecidos (use ajustar para estimá-los)"""
+        self.lambda_ = lambda_
+        self.sigma = sigma
+        self.kappa = kappa
+        self.r2 = r2
+        self.niveis = None  # Níveis de concorrência distintos do ajuste
+        self.parametros = None  # Coeficientes ajustados (σ ou κ negativos são descartados)
+    
+    @classmethod
+    def ajustar(cls, concorrencias, throughputs):
+        """Mínimos quadrados sobre N/X = (1 + σ(N-1) + κN(N-1)) / λ, sem coeficientes negativos"""
+        n = np.asarray(concorrencias, dtype=float)
+        x = np.asarray(throughputs, dtype=float)
+        validos = (n > 0) & (x > 0)
+        n, x = n[validos], x[validos]
+        if len(np.unique(n)) < 2:
+            raise ValueError("São necessários ao menos 2 níveis de concorrência")
+        
+        termos = [np.ones_like(n), n - 1, n * (n - 1)]
+        ativos = [0, 1, 2][:len(np.unique(n))]
+        while True:
+            coeficientes, *_ = np.linalg.lstsq(np.column_stack([termos[i] for i in ativos]), n / x, rcond=None)
+            negativos = [i for i, c in zip(ativos, coeficientes) if i > 0 and c < 0]
+            if not negativos:
+                break
+            ativos.remove(negativos[-1])
+        
+        valores = dict(zip(ativos, coeficientes))
+        if valores[0] <= 0:
+            raise ValueError("Os pontos não se ajustam à USL")
+        lambda_ = 1 / valores[0]
+        modelo = cls(lambda_, valores.get(1, 0.0) * lambda_, valores.get(2, 0.0) * lambda_)
+        modelo.niveis = len(np.unique(n))
+        modelo.parametros = len(ativos)
+        
+        residuos = ((x - modelo.prever(n)) ** 2).sum()
+        variacao = ((x - x.mean()) ** 2).sum()
+        modelo.r2 = 1 - residuos / variacao if variacao > 0 else None
+        return modelo
+    
+    def prever(self, concorrencias):
+        """Throughput previsto para N usuários"""
+        n = np.asarray(concorrencias, dtype=float)
+        return self.lambda_ * n / (1 + self.sigma * (n - 1) + self.kappa * n * (n - 1))
+    
+    def concorrencia_pico(self):
+        """N com o maior throughput previsto (None se o throughput só cresce)"""
+        if self.kappa <= 0 or self.sigma >= 1:
+            return None
+        return float(np.sqrt((1 - self.sigma) / self.kappa))
+    
+    def para_dict(self):
+        """Coeficientes e pico previsto, serializáveis em JSON"""
+        pico = self.concorrencia_pico()
+        return {
+            'lambda': float(self.lambda_),
+            'sigma': float(self.sigma),
+            'kappa': float(self.kappa),
+            'r2': float(self.r2) if self.r2 is not None else None,
+            'niveis': self.niveis,
+            'parametros': self.parametros,
+            'concorrencia_pico': pico,
+            'throughput_pico': float(self.prever(pico)) if pico is not None else None,
+        }
+
+def ajustar_escalabilidade(resultados, concorrencias, padrao=PADRAO_CENARIOS_ESCALABILIDADE):
+    """Ajusta a USL aos testes de escalabilidade; retorna (modelo ou None, testes usados)"""
+    nomes = [n for n in resultados if concorrencias.get(n) and padrao.search(n)]
+    try:
+        modelo = ModeloUSL.ajustar(
+            [concorrencias[n] for n in nomes],
+            [resultados[n]['throughput'] for n in nomes],
+        )
+    except ValueError:
+        return None, nomes
+    return modelo, nomes
+
+# Gráficos disponíveis: número -> método de GeradorGraficos
+GRAFICOS = {
+    '01': 'grafico_01_visao_geral',
+    '02': 'grafico_02_comparativo_performance',
+    '03': 'grafico_03_distribuicao_percentis',
+    '04': 'grafico_04_taxa_erro_throughput',
+    '05': 'grafico_05_heatmap_endpoints',
+    '06': 'grafico_06_analise_escalabilidade',
+    '07': 'grafico_07_comparativo_tempos',
+    '08': 'grafico_08_radar_performance',
+    '09': 'grafico_09_serie_temporal',
+    '10': 'grafico_10_saturacao',
+    '11': 'grafico_11_decomposicao_latencia',
+    '12': 'grafico_12_taxonomia_erros',
+    '13': 'grafico_13_heatmap_latencia',
+    '14': 'grafico_14_heatmap_latencia_endpoints',
+}
+# Atributos do GeradorGraficos que cada gráfico lê (os demais usam só resultados);
+# no pool, cada worker recebe apenas esses dados
+DADOS_GRAFICOS = {
+    'grafico_06_analise_escalabilidade': ('resultados', 'concorrencias'),
+    'grafico_09_serie_temporal': ('resultados', 'series'),
+    'grafico_10_saturacao': ('series',),
+    'grafico_11_decomposicao_latencia': ('resultados', 'series'),
+    'grafico_12_taxonomia_erros': ('resultados', 'series'),
+    'grafico_13_heatmap_latencia': ('heatmaps', 'series'),
+    'grafico_14_heatmap_latencia_endpoints': ('heatmaps',),
+}
+
+def _renderizar_grafico(metodo, dados, output_dir, dpi, formato, perfilar=False):
+    """Worker do pool de renderização: backend Agg, um gráfico por tarefa"""
+    global _perfil
+    gerador = GeradorGraficos(output_dir, dpi, formato)
+    for atributo, valor in dados.items():
+        setattr(gerador, atributo, valor)
+    if not perfilar:
+        plt.switch_backend('Agg')
+        getattr(gerador, metodo)()
+        return None
+    
+    # Perfil próprio do worker (o import do matplotlib também é medido aqui)
+    _perfil = PerfilEtapas().iniciar()
+    try:
+        with etapa_perfil(metodo):
+            plt.switch_backend('Agg')
+            getattr(gerador, metodo)()
+    finally:
+        perfil, _perfil = _perfil, None
+        perfil.finalizar()
+    return perfil.etapas
+
+def _analisar_arquivo(arquivo_jtl, streaming, usar_cache, janela_ms=None, acumulador=False):
+    """Worker do pool: devolve (métricas, série, heatmap) ou o AcumuladorMetricas (sem DataFrame)"""
+    if streaming is None:
+        streaming = Path(arquivo_jtl).stat().st_size > LIMIAR_STREAMING_BYTES
+    analisador = AnalisadorJMeter(arquivo_jtl, streaming=streaming, usar_cache=usar_cache, janela_ms=janela_ms)
+    if acumulador:
+        return analisador.acumulador_total()
+    if not janela_ms:
+        return analisador.calcular_metricas(omissao_coordenada=True), None, None
+    return analisador.calcular_metricas(omissao_coordenada=True), analisador.calcular_serie_temporal(), analisador.calcular_heatmap()
+
+def analisar_arquivos(arquivos, processos=None, streaming=None, usar_cache=False, janela_ms=None, acumuladores=False):
+    """Analisa vários JTLs em paralelo, um arquivo por processo"""
+    if not isinstance(arquivos, dict):
+        arquivos = {Path(arquivo).stem: arquivo for arquivo in arquivos}
+    nomes = list(arquivos)
+    caminhos = [arquivos[nome] for nome in nomes]
+    
+    if processos == 1 or len(caminhos) <= 1:
+        metricas = [_analisar_arquivo(c, streaming, usar_cache, janela_ms, acumuladores) for c in caminhos]
+    else:
+        processos = min(processos or os.cpu_count() or 1, len(caminhos))
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            metricas = list(pool.map(
+                _analisar_arquivo,
+                caminhos,
+                [streaming] * len(caminhos),
+                [usar_cache] * len(caminhos),
+                [janela_ms] * len(caminhos),
+                [acumuladores] * len(caminhos),
+            ))
+    
+    if acumuladores:
+        return dict(zip(nomes, metricas))
+    resultados = {nome: analise[0] for nome, analise in zip(nomes, metricas)}
+    series = {nome: analise[1] for nome, analise in zip(nomes, metricas) if analise[1] is not None}
+    heatmaps = {nome: analise[2] for nome, analise in zip(nomes, metricas) if analise[2] is not None}
+    return resultados, series, heatmaps
+
+def analisar_cenarios(arquivo_jtl, streaming=None, usar_cache=False, janela_ms=None):
+    """Métricas (e séries e heatmaps, se janela_ms) de cada Thread Group, em uma única leitura"""
+    if streaming is None:
+        streaming = Path(arquivo_jtl).stat().st_size > LIMIAR_STREAMING_BYTES
+    analisador = AnalisadorJMeter(arquivo_jtl, streaming=streaming, por_cenario=True, usar_cache=usar_cache, janela_ms=janela_ms)
+    series = analisador.calcular_series_por_cenario() if janela_ms else {}
+    heatmaps = analisador.calcular_heatmaps_por_cenario() if janela_ms else {}
+    return analisador.calcular_metricas_por_cenario(omissao_coordenada=True), series, heatmaps
 
 class GeradorGraficos:
     """Classe para geração de gráficos avançados"""
     
-    def __init__(self, output_dir='analise-graficos'):
+    def __init__(self, output_dir='analise-graficos', dpi=300, formato='png'):
         """Inicializa gerador de gráficos"""
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        self.dpi = dpi
+        self.formato = formato
         self.resultados = {}
+        self.series = {}
+        self.heatmaps = {}
+        self.concorrencias = {}
+        self.grupos_jmx = {}
+    
+    def adicionar_teste(self, nome, arquivo_jtl, streaming=None, usar_cache=False, janela_ms=None):
+        """Adiciona resultado de um teste (com janela_ms também a série e o heatmap)"""
+        if streaming is None:
+            streaming = Path(arquivo_jtl).stat().st_size > LIMIAR_STREAMING_BYTES
+        analisador = AnalisadorJMeter(arquivo_jtl, streaming=streaming, usar_cache=usar_cache, janela_ms=janela_ms)
+        self.resultados[nome] = analisador.calcular_metricas(omissao_coordenada=True)
+        if janela_ms:
+            self.series[nome] = analisador.calcular_serie_temporal()
+            self.heatmaps[nome] = analisador.calcular_heatmap()
+    
+    def adicionar_testes(self, arquivos, processos=None, streaming=None, usar_cache=False, janela_ms=None):
+        """Adiciona vários testes analisados em paralelo (ver analisar_arquivos); com janela_ms também séries e heatmaps"""
+        resultados, series, heatmaps = analisar_arquivos(arquivos, processos, streaming, usar_cache, janela_ms)
+        self.resultados.update(resultados)
+        self.series.update(series)
+        self.heatmaps.update(heatmaps)
+    
+    def adicionar_testes_por_cenario(self, arquivo_jtl, streaming=None, nome_padrao='Todos os Testes Combinados', usar_cache=False, janela_ms=None):
+        """Adiciona cada Thread Group do JTL como um teste separado e retorna seus nomes"""
+        resultados, series, heatmaps = analisar_cenarios(arquivo_jtl, streaming, usar_cache, janela_ms)
+        
+        adicionados = []
+        for cenario, metricas in resultados.items():
+            nome = cenario if cenario is not None else nome_padrao
+            self.resultados[nome] = metricas
+            if cenario in series:
+                self.series[nome] = series[cenario]
+            if cenario in heatmaps:
+                self.heatmaps[nome] = heatmaps[cenario]
+            adicionados.append(nome)
+        return adicionados
     
-    def adicionar_teste(self, nome, arquivo_jtl):
-        """Adiciona resultado de um teste"""
-        analisador = AnalisadorJMeter(arquivo_jtl)
-        self.resultados[nome] = analisador.calcular_metricas()
+    def definir_concorrencias_jmx(self, arquivo_jmx):
+        """Associa a cada teste as threads do Thread Group de mesmo nome no JMX"""
+        grupos = associar_plano_jmx(self.resultados, arquivo_jmx)
+        self.grupos_jmx.update(grupos)
+        for nome, grupo in grupos.items():
+            if grupo['threads']:
+                self.concorrencias[nome] = grupo['threads']
+        return list(grupos)
     
-    def gerar_todos_graficos(self):
-        """Gera todos os gráficos de análise"""
+    def gerar_todos_graficos(self, graficos=None, processos=1, dpi=None, formato=None):
+        """Gera os gráficos de análise"""
         print("📊 Gerando gráficos de análise...\n")
         
-        self.grafico_01_visao_geral()
-        self.grafico_02_comparativo_performance()
-        self.grafico_03_distribuicao_percentis()
-        self.grafico_04_taxa_erro_throughput()
-        self.grafico_05_heatmap_endpoints()
-        self.grafico_06_analise_escalabilidade()
-        self.grafico_07_comparativo_tempos()
-        self.grafico_08_radar_performance()
+        metodos = self._selecionar_graficos(graficos)
+        configuracao_original = (self.dpi, self.formato)
+        self.dpi = dpi if dpi is not None else self.dpi
+        self.formato = formato if formato is not None else self.formato
+        try:
+            if processos == 1 or len(metodos) <= 1:
+                for metodo in metodos:
+                    with etapa_perfil(metodo):
+                        getattr(self, metodo)()
+            else:
+                perfilar = _perfil is not None
+                with ProcessPoolExecutor(max_workers=min(processos or os.cpu_count() or 1, len(metodos))) as pool:
+                    tarefas = [
+                        pool.submit(_renderizar_grafico, metodo, self._dados_grafico(metodo), self.output_dir, self.dpi, self.formato, perfilar)
+                        for metodo in metodos
+                    ]
+                    medidas = [tarefa.result() for tarefa in tarefas]
+                if perfilar:
+                    for etapas in medidas:
+                        _perfil.incorporar(etapas)
+        finally:
+            self.dpi, self.formato = configuracao_original
         
         print("\n✅ Todos os gráficos foram gerados com sucesso!")
         print(f"📁 Salvos em: {self.output_dir}/")
     
+    def _dados_grafico(self, metodo):
+        """{atributo: valor} que o gráfico precisa, enviado ao worker no lugar do gerador inteiro"""
+        return {atributo: getattr(self, atributo) for atributo in DADOS_GRAFICOS.get(metodo, ('resultados',))}
+    
+    def _selecionar_graficos(self, graficos):
+        """Converte a seleção de gráficos em nomes de método, na ordem do registro"""
+        if graficos is None:
+            return list(GRAFICOS.values())
+        
+        metodos = []
+        for grafico in graficos:
+            chave = f'{int(grafico):02d}' if str(grafico).isdigit() else str(grafico)
+            if chave in GRAFICOS:
+                metodos.append(GRAFICOS[chave])
+            elif chave in GRAFICOS.values():
+                metodos.append(chave)
+            else:
+                raise ValueError(f"Gráfico desconhecido: {grafico}")
+        return [m for m in GRAFICOS.values() if m in metodos]
+    
+    def _salvar(self, fig, nome_base):
+        """Salva a figura no formato/DPI configurados e libera sua memória"""
+        fig.savefig(self.output_dir / f'{nome_base}.{self.formato}', dpi=self.dpi, bbox_inches='tight')
+        plt.close(fig)
+    
     def grafico_01_visao_geral(self):
         """Dashboard com visão geral de todos os testes"""
         fig = plt.figure(figsize=(16, 10))
@@ -224,7 +2943,7 @@ class GeradorGraficos:
         ax6.set_xticklabels(nomes, rotation=15, ha='right')
         ax6.legend()
         
-        plt.savefig(self.output_dir / '01-dashboard-completo.png', bbox_inches='tight')
+        self._salvar(fig, '01-dashboard-completo')
         print("✅ Gráfico 1: Dashboard Completo")
     
     def grafico_02_comparativo_performance(self):
@@ -268,7 +2987,7 @@ class GeradorGraficos:
             axes[1, 1].text(v, i, f' {v}', va='center', fontweight='bold')
         
         plt.tight_layout()
-        plt.savefig(self.output_dir / '02-comparativo-performance.png', bbox_inches='tight')
+        self._salvar(fig, '02-comparativo-performance')
         print("✅ Gráfico 2: Comparativo de Performance")
     
     def grafico_03_distribuicao_percentis(self):
@@ -295,7 +3014,7 @@ class GeradorGraficos:
         ax.grid(axis='y', alpha=0.3)
         
         plt.tight_layout()
-        plt.savefig(self.output_dir / '03-distribuicao-percentis.png', bbox_inches='tight')
+        self._salvar(fig, '03-distribuicao-percentis')
         print("✅ Gráfico 3: Distribuição de Percentis")
     
     def grafico_04_taxa_erro_throughput(self):
@@ -330,7 +3049,7 @@ class GeradorGraficos:
         ax2.grid(alpha=0.3)
         
         plt.tight_layout()
-        plt.savefig(self.output_dir / '04-erro-throughput.png', bbox_inches='tight')
+        self._salvar(fig, '04-erro-throughput')
         print("✅ Gráfico 4: Taxa de Erro e Throughput")
     
     def grafico_05_heatmap_endpoints(self):
@@ -374,7 +3093,7 @@ class GeradorGraficos:
         fig.colorbar(im, ax=ax, label='Tempo (ms)')
         
         plt.tight_layout()
-        plt.savefig(self.output_dir / '05-heatmap-endpoints.png', bbox_inches='tight')
+        self._salvar(fig, '05-heatmap-endpoints')
         print("✅ Gráfico 5: Heatmap de Endpoints")
     
     def grafico_06_analise_escalabilidade(self):
@@ -385,15 +3104,33 @@ class GeradorGraficos:
         nomes = list(self.resultados.keys())
         indices = range(len(nomes))
         
-        # 1. Throughput vs Índice do teste
+        # 1. Throughput vs usuários (modelo USL) ou vs índice do teste
         throughputs = [self.resultados[n]['throughput'] for n in nomes]
-        axes[0, 0].plot(indices, throughputs, marker='o', linewidth=2, markersize=10, color='green')
-        axes[0, 0].fill_between(indices, throughputs, alpha=0.2, color='green')
-        axes[0, 0].set_title('Escalabilidade de Throughput')
+        modelo, usados = ajustar_escalabilidade(self.resultados, self.concorrencias)
+        if modelo is not None:
+            usuarios = [self.concorrencias[n] for n in usados]
+            pico = modelo.concorrencia_pico()
+            limite = max(max(usuarios) * 1.5, pico * 1.3 if pico else 0)
+            curva = np.linspace(1, limite, 200)
+            axes[0, 0].plot(curva, modelo.prever(curva), linewidth=2, color='green', label='USL ajustada')
+            axes[0, 0].scatter(usuarios, [self.resultados[n]['throughput'] for n in usados],
+                               s=80, color='darkgreen', zorder=3, label='Medido')
+            if pico:
+                axes[0, 0].axvline(x=pico, color='orange', linestyle='--', alpha=0.7, label=f'Pico: {pico:.0f} usuários')
+            axes[0, 0].text(0.02, 0.97, f"σ = {modelo.sigma:.4f}\nκ = {modelo.kappa:.5f}",
+                            transform=axes[0, 0].transAxes, va='top', fontsize=9,
+                            bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
+            axes[0, 0].set_title('Escalabilidade de Throughput (USL)')
+            axes[0, 0].set_xlabel('Usuários Simultâneos (threads)')
+            axes[0, 0].legend(fontsize=8, loc='lower right')
+        else:
+            axes[0, 0].plot(indices, throughputs, marker='o', linewidth=2, markersize=10, color='green')
+            axes[0, 0].fill_between(indices, throughputs, alpha=0.2, color='green')
+            axes[0, 0].set_title('Escalabilidade de Throughput')
+            axes[0, 0].set_xlabel('Complexidade do Teste →')
+            axes[0, 0].set_xticks(indices)
+            axes[0, 0].set_xticklabels([n.split()[0] for n in nomes], fontsize=9)
         axes[0, 0].set_ylabel('Throughput (req/s)')
-        axes[0, 0].set_xlabel('Complexidade do Teste →')
-        axes[0, 0].set_xticks(indices)
-        axes[0, 0].set_xticklabels([n.split()[0] for n in nomes], fontsize=9)
         axes[0, 0].grid(alpha=0.3)
         
         # 2. Taxa de Erro vs Complexidade
@@ -429,7 +3166,7 @@ class GeradorGraficos:
         axes[1, 1].set_xticklabels([n.split()[0] for n in nomes], fontsize=9)
         
         plt.tight_layout()
-        plt.savefig(self.output_dir / '06-analise-escalabilidade.png', bbox_inches='tight')
+        self._salvar(fig, '06-analise-escalabilidade')
         print("✅ Gráfico 6: Análise de Escalabilidade")
     
     def grafico_07_comparativo_tempos(self):
@@ -457,7 +3194,7 @@ class GeradorGraficos:
         ax.grid(axis='y', alpha=0.3)
         
         plt.tight_layout()
-        plt.savefig(self.output_dir / '07-comparativo-tempos.png', bbox_inches='tight')
+        self._salvar(fig, '07-comparativo-tempos')
         print("✅ Gráfico 7: Comparativo de Tempos")
     
     def grafico_08_radar_performance(self):
@@ -507,9 +3244,351 @@ class GeradorGraficos:
         
         fig.suptitle('Análise Multidimensional de Performance (Radar Chart)', fontsize=14, y=0.98)
         plt.tight_layout()
-        plt.savefig(self.output_dir / '08-radar-performance.png', bbox_inches='tight')
+        self._salvar(fig, '08-radar-performance')
         print("✅ Gráfico 8: Gráfico Radar de Performance")
     
+    def grafico_09_serie_temporal(self):
+        """Throughput, erro, percentis e threads ativas ao longo do tempo"""
+        if not self.series:
+            print("⚠️  Gráfico 9 ignorado: nenhuma série temporal calculada")
+            return
+        
+        fig, axes = plt.subplots(4, 1, figsize=(16, 14), sharex=True)
+        janela = next(iter(self.series.values())).attrs.get('janela_ms', JANELA_PADRAO_MS)
+        fig.suptitle(f'Métricas ao Longo do Tempo (janelas de {janela / 1000:g} s)', fontsize=14)
+        cores = plt.cm.tab10(np.linspace(0, 1, max(len(self.series), 2)))
+        
+        for cor, (nome, serie) in zip(cores, self.series.items()):
+            if serie.empty:
+                continue
+            axes[0].plot(serie.index, serie['throughput'], color=cor, linewidth=1, label=nome)
+            if 'taxa_erro' in serie.columns:
+                axes[1].plot(serie.index, serie['taxa_erro'], color=cor, linewidth=1)
+            if 'p95' in serie.columns:
+                axes[2].plot(serie.index, serie['p95'], color=cor, linewidth=1)
+                axes[2].plot(serie.index, serie['p99'], color=cor, linewidth=1, linestyle=':')
+            if 'threads' in serie.columns:
+                axes[3].plot(serie.index, serie['threads'], color=cor, linewidth=1)
+            for anomalia in self.resultados.get(nome, {}).get('anomalias') or []:
+                for ax in axes:
+                    ax.axvspan(pd.Timestamp(anomalia['inicio']), pd.Timestamp(anomalia['fim']), color=cor, alpha=0.2)
+        
+        axes[0].set_title('Throughput por Janela (faixas: anomalias detectadas)')
+        axes[0].set_ylabel('Requisições/segundo')
+        axes[0].legend(fontsize=7, loc='upper right')
+        axes[1].set_title('Taxa de Erro por Janela')
+        axes[1].set_ylabel('Erro (%)')
+        axes[1].axhline(y=5, color='orange', linestyle='--', alpha=0.5)
+        axes[2].set_title('P95 (contínuo) e P99 (pontilhado) por Janela')
+        axes[2].set_ylabel('Tempo (ms)')
+        axes[2].set_yscale('log')
+        axes[3].set_title('Threads Ativas (allThreads)')
+        axes[3].set_ylabel('Threads')
+        axes[3].set_xlabel('Horário')
+        for ax in axes:
+            ax.grid(alpha=0.3)
+        
+        plt.tight_layout()
+        self._salvar(fig, '09-serie-temporal')
+        print("✅ Gráfico 9: Série Temporal")
+    
+    def grafico_10_saturacao(self):
+        """Throughput e P95 por janela em função das threads ativas"""
+        series = [s for s in self.series.values() if not s.empty and 'threads' in s.columns]
+        if not series:
+            print("⚠️  Gráfico 10 ignorado: séries sem a coluna allThreads")
+            return
+        
+        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+        fig.suptitle('Ponto de Saturação', fontsize=14)
+        janelas = pd.concat(series).dropna(subset=['threads'])
+        janelas = janelas[janelas['requisicoes'] > 0]
+        
+        ax1.scatter(janelas['threads'], janelas['throughput'], s=6, alpha=0.3, color='teal')
+        ax2.scatter(janelas['threads'], janelas['p95'], s=6, alpha=0.3, color='coral')
+        
+        # Mediana por nível de concorrência: o pico indica a saturação
+        curva = janelas.groupby('threads')['throughput'].median()
+        ax1.plot(curva.index, curva.values, color='black', linewidth=2, label='Mediana')
+        if len(curva) > 1:
+            saturacao = curva.idxmax()
+            ax1.axvline(x=saturacao, color='red', linestyle='--', label=f'Saturação (~{saturacao:.0f} threads)')
+            ax2.axvline(x=saturacao, color='red', linestyle='--')
+        ax1.legend()
+        
+        ax1.set_title('Throughput x Threads Ativas')
+        ax1.set_xlabel('Threads ativas')
+        ax1.set_ylabel('Requisições/segundo')
+        ax1.grid(alpha=0.3)
+        ax2.set_title('P95 x Threads Ativas')
+        ax2.set_xlabel('Threads ativas')
+        ax2.set_ylabel('Tempo (ms)')
+        ax2.set_yscale('log')
+        ax2.grid(alpha=0.3)
+        
+        plt.tight_layout()
+        self._salvar(fig, '10-saturacao')
+        print("✅ Gráfico 10: Ponto de Saturação")
+    
+    def grafico_11_decomposicao_latencia(self):
+        """Conexão, servidor e transferência por endpoint e ao longo do tempo"""
+        # Médias por endpoint ponderadas pelo número de requisições de cada teste
+        somas = {}
+        for resultado in self.resultados.values():
+            for endpoint, dados in resultado.get('endpoints', {}).items():
+                decomposicao = dados.get('decomposicao', {})
+                if 'server_time' not in decomposicao:
+                    continue
+                acumulado = somas.setdefault(endpoint, dict.fromkeys(['count', 'conexao', 'servidor', 'transferencia', 'bytes'], 0.0))
+                acumulado['count'] += dados['count']
+                acumulado['conexao'] += decomposicao['connect_time'] * dados['count']
+                acumulado['servidor'] += decomposicao['server_time'] * dados['count']
+                acumulado['transferencia'] += decomposicao['transfer_time'] * dados['count']
+                acumulado['bytes'] += decomposicao.get('avg_bytes', 0) * dados['count']
+        if not somas:
+            print("⚠️  Gráfico 11 ignorado: JTL sem as colunas Latency/Connect")
+            return
+        
+        tabela = pd.DataFrame(somas).T
+        medias = tabela[['conexao', 'servidor', 'transferencia']].div(tabela['count'], axis=0)
+        medias = medias.loc[medias.sum(axis=1).sort_values().index]
+        segundos = tabela['transferencia'] / 1000
+        taxa = (tabela['bytes'] / segundos.where(segundos > 0)).fillna(0).reindex(medias.index)
+        
+        fig = plt.figure(figsize=(16, 11))
+        fig.suptitle('Decomposição do Tempo de Resposta', fontsize=14)
+        gs = fig.add_gridspec(2, 2, hspace=0.35, wspace=0.45)
+        cores = {'conexao': '#95a5a6', 'servidor': '#3498db', 'transferencia': '#e67e22'}
+        rotulos = {'conexao': 'Conexão', 'servidor': 'Servidor (até o 1º byte)', 'transferencia': 'Transferência'}
+        
+        # 1. Barras empilhadas por endpoint
+        ax1 = fig.add_subplot(gs[0, 0])
+        esquerda = np.zeros(len(medias))
+        for componente in ['conexao', 'servidor', 'transferencia']:
+            ax1.barh(medias.index, medias[componente], left=esquerda, color=cores[componente], label=rotulos[componente])
+            esquerda += medias[componente].to_numpy()
+        ax1.set_title('Tempo Médio por Componente')
+        ax1.set_xlabel('Tempo (ms)')
+        ax1.tick_params(axis='y', labelsize=8)
+        ax1.legend(fontsize=8, loc='lower right')
+        ax1.grid(axis='x', alpha=0.3)
+        
+        # 2. Taxa de transferência por endpoint
+        ax2 = fig.add_subplot(gs[0, 1])
+        ax2.barh(taxa.index, taxa / 1024, color='#16a085')
+        ax2.set_title('Taxa de Transferência')
+        ax2.set_xlabel('KB/s')
+        ax2.tick_params(axis='y', labelsize=8)
+        ax2.grid(axis='x', alpha=0.3)
+        
+        # 3. Componentes ao longo do tempo (todas as séries, em ordem de execução)
+        ax3 = fig.add_subplot(gs[1, :])
+        colunas = ['conexao_medio', 'servidor_medio', 'transferencia_medio']
+        series = [s[colunas] for s in self.series.values() if not s.empty and set(colunas) <= set(s.columns)]
+        if series:
+            janelas = pd.concat(series).sort_index().fillna(0)
+            ax3.stackplot(janelas.index, *[janelas[c] for c in colunas],
+                          colors=[cores[c] for c in cores], labels=list(rotulos.values()), alpha=0.85)
+            ax3.legend(fontsize=8, loc='upper right')
+        else:
+            ax3.text(0.5, 0.5, 'Sem séries temporais', ha='center', va='center', transform=ax3.transAxes)
+        ax3.set_title('Componentes por Janela')
+        ax3.set_ylabel('Tempo médio (ms)')
+        ax3.set_xlabel('Horário')
+        ax3.grid(alpha=0.3)
+        
+        self._salvar(fig, '11-decomposicao-latencia')
+        print("✅ Gráfico 11: Decomposição do Tempo de Resposta")
+    
+    def grafico_12_taxonomia_erros(self):
+        """Erros por classe ao longo do tempo, por teste e principais grupos"""
+        erros = {nome: r['erros'] for nome, r in self.resultados.items() if r.get('erros')}
+        if not erros:
+            print("⚠️  Gráfico 12 ignorado: nenhuma falha nos testes")
+            return
+        
+        classes = list(NATUREZA_ERRO)
+        paleta = plt.cm.tab10(np.linspace(0, 1, 10))
+        cores = {classe: paleta[i] for i, classe in enumerate(classes)}
+        
+        fig = plt.figure(figsize=(16, 11))
+        fig.suptitle('Taxonomia de Erros', fontsize=14)
+        gs = fig.add_gridspec(2, 2, hspace=0.35, wspace=0.7)
+        
+        # 1. Erros por janela, empilhados por classe, com as rajadas destacadas
+        ax1 = fig.add_subplot(gs[0, :])
+        series = [s.filter(like='erros_') for s in self.series.values() if not s.empty]
+        series = [s for s in series if not s.empty]
+        if series:
+            janelas = pd.concat(series).sort_index().fillna(0)
+            presentes = [c for c in classes if f'erros_{c}' in janelas.columns]
+            ax1.stackplot(janelas.index, *[janelas[f'erros_{c}'] for c in presentes],
+                          colors=[cores[c] for c in presentes], labels=presentes, alpha=0.85)
+            for resumo in erros.values():
+                for rajada in resumo['rajadas']:
+                    ax1.axvspan(pd.Timestamp(rajada['inicio']), pd.Timestamp(rajada['fim']),
+                                color=cores[rajada['classe']], alpha=0.15)
+            ax1.legend(fontsize=8, loc='upper right')
+        else:
+            ax1.text(0.5, 0.5, 'Sem séries temporais', ha='center', va='center', transform=ax1.transAxes)
+        ax1.set_title('Erros por Janela (faixas: rajadas)')
+        ax1.set_ylabel('Erros')
+        ax1.set_xlabel('Horário')
+        ax1.grid(alpha=0.3)
+        
+        # 2. Composição dos erros de cada teste
+        ax2 = fig.add_subplot(gs[1, 0])
+        nomes = list(erros)
+        esquerda = np.zeros(len(nomes))
+        for classe in classes:
+            valores = np.array([erros[n]['por_classe'].get(classe, {}).get('contagem', 0) for n in nomes])
+            if valores.any():
+                ax2.barh(nomes, valores, left=esquerda, color=cores[classe], label=classe)
+                esquerda += valores
+        ax2.set_title('Erros por Teste e Classe')
+        ax2.set_xlabel('Erros')
+        ax2.tick_params(axis='y', labelsize=8)
+        ax2.invert_yaxis()
+        ax2.legend(fontsize=8, loc='lower right')
+        ax2.grid(axis='x', alpha=0.3)
+        
+        # 3. Grupos mais frequentes (código, mensagem, endpoint) somando todos os testes
+        ax3 = fig.add_subplot(gs[1, 1])
+        grupos = pd.DataFrame([g for resumo in erros.values() for g in resumo['grupos']])
+        grupos = grupos.groupby(['codigo', 'mensagem', 'endpoint', 'classe'], as_index=False)['contagem'].sum()
+        grupos = grupos.nlargest(10, 'contagem').iloc[::-1]
+        rotulos = [f"[{g.codigo.rsplit('.', 1)[-1]}] {g.mensagem[:30]}\n{g.endpoint[:40]}" for g in grupos.itertuples()]
+        ax3.barh(rotulos, grupos['contagem'], color=[cores[c] for c in grupos['classe']])
+        ax3.set_title('Principais Grupos de Erro')
+        ax3.set_xlabel('Ocorrências')
+        ax3.tick_params(axis='y', labelsize=7)
+        ax3.grid(axis='x', alpha=0.3)
+        
+        self._salvar(fig, '12-taxonomia-erros')
+        print("✅ Gráfico 12: Taxonomia de Erros")
+    
+    def _tabela_heatmap(self):
+        """Contagens de todos os testes juntas (janela, endpoint, faixa) e a largura da janela"""
+        tabelas = [t for t in self.heatmaps.values() if not t.empty]
+        if not tabelas:
+            return None, None
+        janela_ms = tabelas[0].attrs.get('janela_ms', JANELA_PADRAO_MS)
+        tabela = pd.concat(tabelas, ignore_index=True)
+        return tabela.groupby(['janela', 'endpoint', 'faixa'], as_index=False, sort=False)['contagem'].sum(), janela_ms
+    
+    @staticmethod
+    def _grade_heatmap(tabela, janela_ms, janelas, faixas):
+        """Matriz faixa x coluna de tempo e as bordas x (horário) e y (ms) para pcolormesh"""
+        fator = max(1, -(-(janelas[1] - janelas[0] + 1) // COLUNAS_MAXIMAS_HEATMAP))
+        colunas = (janelas[1] - janelas[0]) // fator + 1
+        grade = np.zeros((faixas[1] - faixas[0] + 1, colunas))
+        np.add.at(grade, (tabela['faixa'].to_numpy(dtype=np.int64) - faixas[0],
+                          (tabela['janela'].to_numpy(dtype=np.int64) - janelas[0]) // fator),
+                  tabela['contagem'].to_numpy(dtype=float))
+        bordas_x = pd.to_datetime((janelas[0] + np.arange(colunas + 1) * fator) * janela_ms, unit='ms')
+        bordas_y = limites_faixas(np.arange(faixas[0], faixas[1] + 2))
+        return bordas_x, bordas_y, np.ma.masked_equal(grade, 0)
+    
+    def grafico_13_heatmap_latencia(self):
+        """Distribuição da latência ao longo do tempo (janelas x faixas logarítmicas)"""
+        tabela, janela_ms = self._tabela_heatmap()
+        if tabela is None:
+            print("⚠️  Gráfico 13 ignorado: nenhum heatmap de latência calculado")
+            return
+        
+        total = tabela.groupby(['janela', 'faixa'], as_index=False)['contagem'].sum()
+        janelas = (int(total['janela'].min()), int(total['janela'].max()))
+        faixas = (int(total['faixa'].min()), int(total['faixa'].max()))
+        bordas_x, bordas_y, grade = self._grade_heatmap(total, janela_ms, janelas, faixas)
+        
+        fig, ax = plt.subplots(figsize=(16, 7))
+        fig.suptitle('Distribuição da Latência ao Longo do Tempo', fontsize=14)
+        malha = ax.pcolormesh(bordas_x, bordas_y, grade, cmap='magma_r', norm='log', shading='flat')
+        fig.colorbar(malha, ax=ax, label='Amostras por célula')
+        
+        # P50/P99 das séries por cima do heatmap, para ler a distribuição contra os percentis
+        rotulados = False
+        for serie in self.series.values():
+            if serie.empty or 'p99' not in serie.columns:
+                continue
+            ax.plot(serie.index, serie['p50'], color='#2980b9', linewidth=0.8, label=None if rotulados else 'P50')
+            ax.plot(serie.index, serie['p99'], color='black', linewidth=0.8, linestyle=':', label=None if rotulados else 'P99')
+            rotulados = True
+        if rotulados:
+            ax.legend(fontsize=8, loc='upper right')
+        
+        largura = (bordas_x[1] - bordas_x[0]).total_seconds()
+        ax.set_title(f'Todos os testes (colunas de {largura:g} s, {FAIXAS_POR_DECADA} faixas por década)')
+        ax.set_yscale('log')
+        ax.set_ylabel('Tempo de resposta (ms)')
+        ax.set_xlabel('Horário')
+        ax.grid(False)
+        
+        plt.tight_layout()
+        self._salvar(fig, '13-heatmap-latencia')
+        print("✅ Gráfico 13: Heatmap de Latência")
+    
+    def grafico_14_heatmap_latencia_endpoints(self):
+        """Heatmap de latência de cada endpoint, na mesma escala de tempo, latência e cor"""
+        tabela, janela_ms = self._tabela_heatmap()
+        if tabela is None or (tabela['endpoint'] == '').all():
+            print("⚠️  Gráfico 14 ignorado: nenhum heatmap de latência por endpoint calculado")
+            return
+        
+        totais = tabela.groupby('endpoint')['contagem'].sum().sort_values(ascending=False)
+        endpoints = list(totais.index[:ENDPOINTS_HEATMAP])
+        janelas = (int(tabela['janela'].min()), int(tabela['janela'].max()))
+        faixas = (int(tabela['faixa'].min()), int(tabela['faixa'].max()))
+        grades = {e: self._grade_heatmap(tabela[tabela['endpoint'] == e], janela_ms, janelas, faixas) for e in endpoints}
+        maximo = max(grade.max() for _, _, grade in grades.values())
+        
+        colunas = min(3, len(endpoints))
+        linhas = -(-len(endpoints) // colunas)
+        fig, axes = plt.subplots(linhas, colunas, figsize=(6 * colunas, 4 * linhas), sharex=True, sharey=True, squeeze=False)
+        fig.suptitle('Distribuição da Latência por Endpoint', fontsize=14)
+        
+        for ax, endpoint in zip(axes.flat, endpoints):
+            bordas_x, bordas_y, grade = grades[endpoint]
+            malha = ax.pcolormesh(bordas_x, bordas_y, grade, cmap='magma_r', norm='log', vmin=1, vmax=maximo, shading='flat')
+            ax.set_title(f'{endpoint[:45]} ({totais[endpoint]:,} amostras)', fontsize=10)
+            ax.set_yscale('log')
+            ax.tick_params(axis='x', labelrotation=30, labelsize=8)
+            ax.grid(False)
+        for ax in axes.flat[len(endpoints):]:
+            ax.set_visible(False)
+        for ax in axes[:, 0]:
+            ax.set_ylabel('Tempo (ms)')
+        
+        plt.tight_layout()
+        fig.colorbar(malha, ax=axes.ravel().tolist(), label='Amostras por célula', shrink=0.8)
+        self._salvar(fig, '14-heatmap-latencia-endpoints')
+        print("✅ Gráfico 14: Heatmap de Latência por Endpoint")
+    
+    def grafico_historico(self, tendencias, cenario=''):
+        """Tendência de métricas ao longo das execuções registradas no histórico"""
+        fig, axes = plt.subplots(len(tendencias), 1, figsize=(14, 4 * len(tendencias)), sharex=True, squeeze=False)
+        fig.suptitle(f"Histórico de Execuções - {cenario or 'Todos os Cenários'}", fontsize=14)
+        
+        for ax, (metrica, por_endpoint) in zip(axes[:, 0], tendencias.items()):
+            for endpoint, tabela in por_endpoint.items():
+                if tabela.empty:
+                    continue
+                ax.plot(tabela['inicio'], tabela[metrica], marker='o', markersize=3, linewidth=1.2,
+                        label=endpoint or 'Teste inteiro')
+                mediana = tabela[metrica].median()
+                ax.axhline(y=mediana, color=ax.lines[-1].get_color(), linestyle=':', alpha=0.5)
+            ax.set_title(f'{metrica} por Execução (pontilhado: mediana do período)')
+            rotulos = {'throughput': 'Requisições/segundo', 'taxa_erro': 'Erro (%)', 'amostras': 'Amostras', 'falhas': 'Falhas'}
+            ax.set_ylabel(rotulos.get(metrica, 'Tempo (ms)'))
+            ax.grid(alpha=0.3)
+            ax.legend(fontsize=8, loc='upper left')
+        axes[-1, 0].set_xlabel('Início da Execução')
+        fig.autofmt_xdate()
+        
+        plt.tight_layout()
+        self._salvar(fig, 'historico-tendencias')
+        print(f"✅ Gráfico de tendências salvo em {self.output_dir}/historico-tendencias.{self.formato}")
+    
     def gerar_relatorio_textual(self):
         """Gera relatório textual detalhado"""
         relatorio = []
@@ -539,6 +3618,76 @@ class GeradorGraficos:
             relatorio.append(f"  P95: {resultado['p95']:>20.2f}")
             relatorio.append(f"  P99: {resultado['p99']:>20.2f}")
             
+            decomposicao = resultado.get('decomposicao')
+            if decomposicao and 'server_time' in decomposicao:
+                relatorio.append(f"\n{'DECOMPOSIÇÃO DO TEMPO (ms)':<50}")
+                relatorio.append(f"  Conexão: {decomposicao['connect_time']:>20.2f}")
+                relatorio.append(f"  Servidor (até o 1º byte): {decomposicao['server_time']:>20.2f}")
+                relatorio.append(f"  Transferência: {decomposicao['transfer_time']:>20.2f}")
+                if 'bytes_per_second' in decomposicao:
+                    relatorio.append(f"  Bytes Médios por Resposta: {decomposicao['avg_bytes']:>20,.0f}")
+                    relatorio.append(f"  Taxa de Transferência: {decomposicao['bytes_per_second'] / 1024:>20,.1f} KB/s")
+            
+            omissao = resultado.get('omissao_coordenada')
+            if omissao:
+                relatorio.append(f"\n{'OMISSÃO COORDENADA (ms, bruto -> corrigido)':<50}")
+                relatorio.append(f"  Intervalo Esperado ({omissao['origem_intervalo']}): {omissao['intervalo_ms']:>20.2f}")
+                relatorio.append(f"  Amostras Sintéticas: {omissao['amostras_sinteticas']:>20,}")
+                for chave, rotulo in [('avg_response_time', 'Tempo Médio'), ('p50', 'P50'), ('p90', 'P90'), ('p95', 'P95'), ('p99', 'P99')]:
+                    relatorio.append(f"  {rotulo}: {resultado[chave]:>20.2f} -> {omissao[chave]:.2f}")
+            
+            grupo = self.grupos_jmx.get(nome)
+            little = verificar_lei_little(resultado, grupo) if grupo else {}
+            if little:
+                relatorio.append(f"\n{'LEI DE LITTLE (JMX)':<50}")
+                relatorio.append(f"  Threads / Ramp-up / Loops: {little['threads']:>14} / {little['ramp_up']}s / {little['loops']}")
+                relatorio.append(f"  Threads Ativas (média): {little['threads_medias']:>20.1f}")
+                relatorio.append(f"  Throughput x Tempo Médio: {little['concorrencia_medida']:>20.1f}")
+                relatorio.append(f"  Razão: {little['razao']:>20.2f} ({little['diagnostico']})")
+                if little['amostras_esperadas']:
+                    relatorio.append(f"  Amostras (medidas / esperadas): {little['amostras_medidas']:>14,} / {little['amostras_esperadas']:,}")
+            
+            erros = resultado.get('erros')
+            if erros:
+                relatorio.append(f"\n{'TAXONOMIA DE ERROS':<50}")
+                for classe, dados in erros['por_classe'].items():
+                    rotulo = f"{classe} ({dados['natureza']}):"
+                    relatorio.append(f"  {rotulo:<32}{dados['contagem']:>10,} ({dados['percentual']:.1f}%) "
+                                     f"de {_horario(dados['primeira_ocorrencia'])} a {_horario(dados['ultima_ocorrencia'])}")
+                capacidade = sum(d['percentual'] for d in erros['por_classe'].values() if d['natureza'] == 'capacidade')
+                defeito = sum(d['percentual'] for d in erros['por_classe'].values() if d['natureza'] == 'defeito')
+                relatorio.append(f"  Capacidade / Defeito: {capacidade:.1f}% / {defeito:.1f}%")
+                relatorio.append("  Principais Grupos:")
+                for grupo in erros['grupos'][:10]:
+                    relatorio.append(f"    [{grupo['codigo']}] {grupo['mensagem'] or '(sem mensagem)'} @ {grupo['endpoint']}: "
+                                     f"{grupo['contagem']:,}x ({_horario(grupo['primeira_ocorrencia'])} - {_horario(grupo['ultima_ocorrencia'])})")
+                if erros['rajadas']:
+                    relatorio.append(f"  Rajadas (janela de {erros['janela_ms'] / 1000:g} s):")
+                    for rajada in erros['rajadas']:
+                        relatorio.append(f"    {_horario(rajada['inicio'])} - {_horario(rajada['fim'])} {rajada['classe']}: "
+                                         f"{rajada['erros']:,} erros em {rajada['janelas']} janela(s), pico {rajada['pico_por_janela']}/janela "
+                                         f"(média {rajada['media_por_janela']:.2f})")
+                else:
+                    relatorio.append("  Rajadas: nenhuma")
+            
+            anomalias = resultado.get('anomalias')
+            if anomalias is not None:
+                relatorio.append(f"\n{'ANOMALIAS (MEDIANA/MAD MÓVEL POR JANELA)':<50}")
+                for anomalia in anomalias:
+                    threads = f", {anomalia['threads']} threads" if anomalia['threads'] is not None else ''
+                    relatorio.append(f"  {_horario(anomalia['inicio'])} - {_horario(anomalia['fim'])} "
+                                     f"({anomalia['janelas']} janela(s){threads})")
+                    if 'p99' in anomalia['tipos']:
+                        relatorio.append(f"    Pico de P99: {anomalia['p99_pico']:.2f} ms (referência {anomalia['p99_referencia']:.2f} ms)")
+                    if 'throughput' in anomalia['tipos']:
+                        relatorio.append(f"    Queda de Throughput: {anomalia['throughput_minimo']:.2f} req/s "
+                                         f"(referência {anomalia['throughput_referencia']:.2f} req/s)")
+                    for endpoint in anomalia['endpoints'][:5]:
+                        relatorio.append(f"    {endpoint['endpoint']}: {endpoint['tempo_medio']:.2f} ms "
+                                         f"(fora do intervalo {endpoint['tempo_medio_fora']:.2f} ms, {endpoint['fator']:.1f}x)")
+                if not anomalias:
+                    relatorio.append("  Nenhuma anomalia detectada")
+            
             if resultado['endpoints']:
                 relatorio.append(f"\n{'ANÁLISE POR ENDPOINT':<50}")
                 for endpoint, dados in resultado['endpoints'].items():
@@ -546,10 +3695,67 @@ class GeradorGraficos:
                     relatorio.append(f"    Requisições: {dados['count']:>10}")
                     relatorio.append(f"    Tempo Médio: {dados['avg_time']:>10.2f} ms")
                     relatorio.append(f"    Tempo Máximo: {dados['max_time']:>10.2f} ms")
+                    relatorio.append(f"    P90: {dados['p90']:>10.2f} ms")
+                    relatorio.append(f"    P95: {dados['p95']:>10.2f} ms")
+                    relatorio.append(f"    P99: {dados['p99']:>10.2f} ms")
                     relatorio.append(f"    Taxa de Erro: {dados['error_rate']:>10.2f}%")
+                    relatorio.append(f"    Throughput: {dados['throughput']:>10.2f} req/s")
+                    decomposicao = dados.get('decomposicao', {})
+                    if 'server_time' in decomposicao:
+                        relatorio.append(f"    Conexão / Servidor / Transferência: {decomposicao['connect_time']:.2f} / "
+                                         f"{decomposicao['server_time']:.2f} / {decomposicao['transfer_time']:.2f} ms")
+                    if 'bytes_per_second' in decomposicao:
+                        relatorio.append(f"    Bytes Médios: {decomposicao['avg_bytes']:>10,.0f} ({decomposicao['bytes_per_second'] / 1024:,.1f} KB/s)")
+            
+            serie = self.series.get(nome)
+            if serie is not None and not serie.empty:
+                relatorio.append(f"\n{'SÉRIE TEMPORAL':<50}")
+                relatorio.append(f"  Janela: {serie.attrs.get('janela_ms', JANELA_PADRAO_MS) / 1000:>20g} s")
+                relatorio.append(f"  Janelas Analisadas: {len(serie):>20,}")
+                pico = serie['throughput'].idxmax()
+                relatorio.append(f"  Pico de Throughput: {serie['throughput'].max():>20.2f} req/s ({pico:%H:%M:%S})")
+                relatorio.append(f"  Janelas sem Requisições: {(serie['requisicoes'] == 0).sum():>20,}")
+                if 'p99' in serie.columns and serie['p99'].notna().any():
+                    pior = serie['p99'].idxmax()
+                    relatorio.append(f"  Pior P99 por Janela: {serie['p99'].max():>20.2f} ms ({pior:%H:%M:%S})")
+                if 'taxa_erro' in serie.columns:
+                    relatorio.append(f"  Janelas com Erro > 5%: {(serie['taxa_erro'] > 5).sum():>20,}")
+                if 'threads' in serie.columns and serie['threads'].notna().any():
+                    relatorio.append(f"  Máximo de Threads Ativas: {serie['threads'].max():>20.0f}")
+                if 'servidor_medio' in serie.columns and serie['servidor_medio'].notna().any():
+                    pior = serie['servidor_medio'].idxmax()
+                    relatorio.append(f"  Pior Tempo de Servidor por Janela: {serie['servidor_medio'].max():>20.2f} ms ({pior:%H:%M:%S})")
+                    pior = serie['transferencia_medio'].idxmax()
+                    relatorio.append(f"  Pior Transferência por Janela: {serie['transferencia_medio'].max():>20.2f} ms ({pior:%H:%M:%S})")
             
             relatorio.append("")
         
+        modelo, usados = ajustar_escalabilidade(self.resultados, self.concorrencias)
+        if modelo is not None:
+            relatorio.append("-"*100)
+            relatorio.append("\nMODELO DE ESCALABILIDADE (USL)")
+            relatorio.append("-"*100)
+            for nome in usados:
+                relatorio.append(f"  {nome}: {self.concorrencias[nome]} usuários, {self.resultados[nome]['throughput']:.2f} req/s")
+            relatorio.append(f"\n  Throughput de 1 Usuário (λ): {modelo.lambda_:>20.2f} req/s")
+            relatorio.append(f"  Contenção (σ): {modelo.sigma:>20.4f}")
+            relatorio.append(f"  Coerência (κ): {modelo.kappa:>20.6f}")
+            if modelo.r2 is not None:
+                relatorio.append(f"  R² do Ajuste: {modelo.r2:>20.4f}")
+            pico = modelo.concorrencia_pico()
+            if pico is not None:
+                relatorio.append(f"  Concorrência de Pico (N*): {pico:>20.0f} usuários")
+                relatorio.append(f"  Throughput Máximo Previsto: {float(modelo.prever(pico)):>20.2f} req/s")
+            elif modelo.sigma > 0:
+                relatorio.append("  Concorrência de Pico (N*): sem pico (κ = 0), o throughput se aproxima de λ/σ")
+                relatorio.append(f"  Throughput Máximo Previsto: {modelo.lambda_ / modelo.sigma:>20.2f} req/s")
+            if modelo.niveis <= modelo.parametros:
+                relatorio.append(f"  ⚠️  {modelo.niveis} níveis de concorrência para {modelo.parametros} parâmetros: "
+                                 "o ajuste é exato e a extrapolação, frágil")
+            elif modelo.niveis <= 3:
+                relatorio.append(f"  ⚠️  Apenas {modelo.niveis} níveis de concorrência: a extrapolação é frágil")
+            relatorio.append("")
+        
         relatorio.append("="*100)
         relatorio.append("FIM DO RELATÓRIO".center(100))
         relatorio.append("="*100)
@@ -562,42 +3768,335 @@ class GeradorGraficos:
         
         return '\n'.join(relatorio)
 
-def main():
-    """Função principal"""
+def criar_parser():
+    """Argumentos de linha de comando"""
+    parser = argparse.ArgumentParser(
+        description='Análise automatizada de resultados JMeter (arquivos JTL)',
+    )
+    parser.add_argument('arquivos', nargs='*', default=[str(ARQUIVO_PADRAO)],
+                        help='arquivos JTL (padrão: ../jmeter/resultados.jtl)')
+    parser.add_argument('-m', '--modo', choices=['completo', 'metricas', 'acompanhar', 'baseline', 'comparar', 'historico'],
+                        default='completo',
+                        help='completo: gráficos + relatório; metricas: apenas JSON, sem matplotlib; '
+                             'acompanhar: acompanha um JTL em execução; baseline: grava o baseline; '
+                             'comparar: compara com o baseline e retorna 1 se houver regressão, 2 se o baseline não '
+                             'puder ser lido e 3 se nada for comparado; '
+                             'historico: tendências das execuções registradas (não lê JTLs)')
+    parser.add_argument('-o', '--saida', default='analise-graficos', help='diretório de saída dos gráficos')
+    parser.add_argument('--jmx', default=str(ARQUIVO_JMX_PADRAO),
+                        help='plano de teste com as threads e os timers de cada Thread Group')
+    parser.add_argument('--sem-cenarios', action='store_true', help='não separar o JTL por Thread Group')
+    parser.add_argument('--nos', action='store_true',
+                        help='os arquivos são nós de um mesmo teste distribuído: mescla por timeStamp '
+                             'com o relógio de cada nó corrigido')
+    parser.add_argument('--deslocamentos', type=int, nargs='+', metavar='MS',
+                        help='com --nos: ms a subtrair do timeStamp de cada arquivo, em vez de estimar')
+    parser.add_argument('--streaming', action='store_true', help='forçar leitura em chunks')
+    parser.add_argument('--sem-cache', action='store_true', help='não ler nem gravar o cache colunar')
+    parser.add_argument('--cache', action='store_true', help='usar o cache colunar também no modo metricas')
+    parser.add_argument('--janela-ms', type=int, default=JANELA_PADRAO_MS, help='janela das séries temporais')
+    parser.add_argument('--processos', type=int, default=1, help='processos para análise e renderização')
+    parser.add_argument('--graficos', nargs='+', help='gráficos a gerar (ex.: 01 05); padrão: todos')
+    parser.add_argument('--dpi', type=int, default=300, help='resolução dos gráficos')
+    parser.add_argument('--formato', default='png', help='formato dos gráficos (png, svg, pdf...)')
+    parser.add_argument('--intervalo', type=int, default=5, help='segundos entre resumos no modo acompanhar')
+    parser.add_argument('--json', help='arquivo de saída dos modos metricas/comparar')
+    parser.add_argument('--baseline', default='baseline-desempenho.json', help='arquivo de baseline')
+    parser.add_argument('--tolerancia', type=float, default=5.0,
+                        help='variação mínima (%%) para considerar regressão')
+    parser.add_argument('--confianca', type=float, default=0.95, help='nível de confiança do bootstrap')
+    parser.add_argument('--reamostragens', type=int, default=1000, help='reamostragens bootstrap')
+    parser.add_argument('--historico', metavar='DB',
+                        help=f'banco SQLite onde registrar a execução (modos completo/metricas; '
+                             f'sem ele nada é gravado) ou consultado no modo historico (padrão: {HISTORICO_PADRAO})')
+    parser.add_argument('--rotulo', help='rótulo da execução no histórico (ex.: versão ou commit)')
+    parser.add_argument('--metrica', nargs='+', default=['p95'], choices=METRICAS_HISTORICO,
+                        help='métricas do modo historico')
+    parser.add_argument('--endpoint', nargs='+', default=[''],
+                        help="endpoints do modo historico ('' = teste inteiro)")
+    parser.add_argument('--cenario', default='', help="cenário do modo historico ('' = todos)")
+    parser.add_argument('--ultimas', type=int, default=60, help='execuções consultadas no modo historico')
+    parser.add_argument('--perfil', action='store_true',
+                        help='modos completo/metricas: mede tempo de parede, CPU e pico de memória de cada etapa e gráfico')
+    parser.add_argument('--perfil-json', default='perfil-execucao.json', help='arquivo JSON do --perfil')
+    parser.add_argument('--perfil-cprofile', metavar='ARQUIVO',
+                        help='também grava o cProfile (pstats) da etapa mais lenta em ARQUIVO (implica --perfil)')
+    return parser
+
+def coletar_acumuladores(args, janela_ms=None):
+    """AcumuladorMetricas de cada teste dos arquivos pedidos na linha de comando"""
+    streaming = True if args.streaming else None
+    usar_cache = args.cache if args.modo == 'metricas' else not args.sem_cache
+    
+    if args.nos or args.deslocamentos:
+        distribuido = JTLDistribuido(args.arquivos, args.deslocamentos, usar_cache=usar_cache)
+        if streaming is None:
+            streaming = distribuido.tamanho_bytes() > LIMIAR_STREAMING_BYTES
+        analisador = AnalisadorJMeter(distribuido, streaming=streaming, por_cenario=not args.sem_cenarios, janela_ms=janela_ms)
+        imprimir_nos(distribuido, _saida_mensagens(args))
+        if args.sem_cenarios:
+            return {'Todos os Nós': analisador.acumulador_total()}
+        acumuladores = analisador.acumuladores_por_cenario()
+        return {(c if c is not None else 'Todos os Testes Combinados'): a for c, a in acumuladores.items()}
+    
+    if len(args.arquivos) == 1 and not args.sem_cenarios:
+        arquivo = args.arquivos[0]
+        if streaming is None:
+            streaming = Path(arquivo).stat().st_size > LIMIAR_STREAMING_BYTES
+        analisador = AnalisadorJMeter(arquivo, streaming=streaming, por_cenario=True, usar_cache=usar_cache, janela_ms=janela_ms)
+        acumuladores = analisador.acumuladores_por_cenario()
+        return {(c if c is not None else 'Todos os Testes Combinados'): a for c, a in acumuladores.items()}
+    
+    with etapa_perfil('analisar_arquivos'):
+        return analisar_arquivos(args.arquivos, args.processos, streaming, usar_cache, janela_ms, acumuladores=True)
+
+def coletar_resultados(args, janela_ms=None):
+    """Métricas, séries (se janela_ms) e acumuladores dos arquivos da linha de comando"""
+    acumuladores = coletar_acumuladores(args, janela_ms)
+    # Intervalo esperado da omissão coordenada: o dos timers do JMX; sem eles, a mediana de cada teste
+    grupos = associar_plano_jmx(acumuladores, args.jmx) if Path(args.jmx).exists() else {}
+    with etapa_perfil('calcular_metricas'):
+        resultados = {
+            nome: a.metricas(omissao_coordenada=True, intervalo_ms=grupos.get(nome, {}).get('intervalo_ms'))
+            for nome, a in acumuladores.items()
+        }
+    with etapa_perfil('calcular_series'):
+        series = {nome: a.serie() for nome, a in acumuladores.items()} if janela_ms else {}
+    return resultados, series, acumuladores
+
+def coletar_perfis(args):
+    """Perfis de baseline (perfil_baseline) dos arquivos da linha de comando"""
+    return {nome: perfil_baseline(a) for nome, a in coletar_acumuladores(args, args.janela_ms).items()}
+
+def imprimir_nos(distribuido, saida=sys.stdout):
+    """Deslocamento de relógio aplicado a cada nó de um JTLDistribuido"""
+    print(f"🕒 {len(distribuido.arquivos)} nó(s) mesclados por timeStamp; relógios corrigidos:", file=saida)
+    for no in distribuido.nos or []:
+        correlacao = f", correlação {no['correlacao']:.2f}" if no['correlacao'] is not None else ''
+        print(f"   {Path(no['arquivo']).name:<40}{no['deslocamento_ms']:>+10} ms  ({no['metodo']}{correlacao})", file=saida)
+
+def _saida_mensagens(args):
+    """stdout, exceto no modo metricas sem --json, em que o stdout é o próprio JSON"""
+    return sys.stderr if args.modo == 'metricas' and not args.json else sys.stdout
+
+def registrar_historico(args, acumuladores):
+    """Grava a execução no histórico (--historico), sem interromper a análise se falhar"""
+    saida = _saida_mensagens(args)
+    historico = None
+    try:
+        historico = HistoricoExecucoes(args.historico)
+        with etapa_perfil('registrar_historico'):
+            execucao = historico.registrar(acumuladores, origem=args.arquivos, rotulo=args.rotulo)
+        print(f"🗃️  Execução {execucao} registrada no histórico {args.historico}", file=saida)
+    except (sqlite3.Error, ValueError) as erro:
+        print(f"⚠️  Não foi possível registrar a execução no histórico: {erro}", file=saida)
+    finally:
+        if historico is not None:
+            historico.fechar()
+
+def consultar_historico(args):
+    """Modo historico: tabela e gráfico de tendência das últimas execuções"""
+    caminho = args.historico or HISTORICO_PADRAO
+    if not Path(caminho).exists():
+        print(f"Histórico não encontrado: {caminho}", file=sys.stderr)
+        return 1
+    historico = HistoricoExecucoes(caminho)
+    try:
+        tendencias = {
+            metrica: {endpoint: historico.tendencia(metrica, endpoint, args.cenario, args.ultimas) for endpoint in args.endpoint}
+            for metrica in args.metrica
+        }
+    finally:
+        historico.fechar()
+    
+    for metrica, por_endpoint in tendencias.items():
+        for endpoint, tabela in por_endpoint.items():
+            print(f"\n📈 {metrica} - {endpoint or 'teste inteiro'} ({args.cenario or 'todos os cenários'}): {len(tabela)} execução(ões)")
+            for execucao, linha in tabela.iterrows():
+                rotulo = f"  {linha['rotulo']}" if pd.notna(linha['rotulo']) else ''
+                print(f"   #{execucao:<5} {linha['inicio']:%Y-%m-%d %H:%M}  {linha[metrica]:>12.2f}{rotulo}")
+    
+    if not any(len(t) for por_endpoint in tendencias.values() for t in por_endpoint.values()):
+        print("\n⚠️  Nenhuma execução registrada para a seleção")
+        return 1
+    gerador = GeradorGraficos(args.saida, dpi=args.dpi, formato=args.formato)
+    gerador.grafico_historico(tendencias, args.cenario)
+    return 0
+
+def _valor_json(valor):
+    """Converte escalares numpy para tipos nativos na serialização JSON"""
+    if isinstance(valor, np.integer):
+        return int(valor)
+    if isinstance(valor, np.floating):
+        return float(valor)
+    if isinstance(valor, np.bool_):
+        return bool(valor)
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+def publicar_perfil(args, perfil):
+    """Imprime a tabela do perfil, grava o JSON e, com --perfil-cprofile, o cProfile da etapa mais lenta"""
+    saida = _saida_mensagens(args)
+    print('\n' + perfil.relatorio(), file=saida)
+    
+    dados = {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'modo': args.modo,
+        'arquivos': args.arquivos,
+        'processos': args.processos,
+        'dpi': args.dpi,
+        **perfil.para_dict(),
+        'cprofile': None,
+    }
+    mais_lento = perfil.perfil_mais_lento()
+    if mais_lento is not None:
+        nome, perfil_cprofile = mais_lento
+        perfil_cprofile.dump_stats(args.perfil_cprofile)
+        dados['cprofile'] = {'etapa': nome, 'arquivo': args.perfil_cprofile}
+        print(f"\n🔬 cProfile da etapa mais lenta ({nome}) gravado em {args.perfil_cprofile}", file=saida)
+        pstats.Stats(perfil_cprofile, stream=saida).sort_stats('cumulative').print_stats(FUNCOES_CPROFILE)
+    
+    Path(args.perfil_json).write_text(json.dumps(dados, ensure_ascii=False, indent=2), encoding='utf-8')
+    print(f"⏱️  Perfil gravado em {args.perfil_json}", file=saida)
+
+def main(argv=None):
+    """Função principal (com --perfil, mede as etapas da execução)"""
+    global _perfil
+    args = criar_parser().parse_args(argv)
+    if not (args.perfil or args.perfil_cprofile) or args.modo not in ('completo', 'metricas'):
+        return executar(args)
+    
+    _perfil = PerfilEtapas(cprofile=bool(args.perfil_cprofile)).iniciar()
+    try:
+        codigo = executar(args)
+    finally:
+        perfil, _perfil = _perfil, None
+        perfil.finalizar()
+    publicar_perfil(args, perfil)
+    return codigo
+
+def executar(args):
+    """Executa o modo pedido na linha de comando (código 2 se um JTL não puder ser lido)"""
+    try:
+        return executar_modo(args)
+    except ErroLeituraJTL as erro:
+        print(f"❌ {erro}", file=sys.stderr)
+        return 2
+
+def executar_modo(args):
+    """Executa o modo pedido, propagando ErroLeituraJTL"""
+    ausentes = [a for a in args.arquivos if not Path(a).exists()]
+    
+    if args.modo == 'metricas':
+        if ausentes:
+            print(f"Arquivo(s) não encontrado(s): {', '.join(ausentes)}", file=sys.stderr)
+            return 1
+        resultados, _, acumuladores = coletar_resultados(args, args.janela_ms)
+        if args.historico:
+            registrar_historico(args, acumuladores)
+        if Path(args.jmx).exists():
+            for nome, grupo in associar_plano_jmx(resultados, args.jmx).items():
+                resultados[nome]['lei_little'] = verificar_lei_little(resultados[nome], grupo)
+        with etapa_perfil('serializar_json'):
+            texto = json.dumps(resultados, ensure_ascii=False, indent=2, default=_valor_json)
+        if args.json:
+            Path(args.json).write_text(texto, encoding='utf-8')
+        else:
+            print(texto)
+        return 0
+    
+    if args.modo in ('baseline', 'comparar'):
+        if ausentes:
+            print(f"Arquivo(s) não encontrado(s): {', '.join(ausentes)}", file=sys.stderr)
+            return 1
+        if args.modo == 'baseline':
+            perfis = coletar_perfis(args)
+            salvar_baseline(args.baseline, perfis, origem=args.arquivos)
+            print(f"✅ Baseline com {len(perfis)} teste(s) gravado em {args.baseline}")
+            return 0
+        
+        # O baseline é lido antes dos JTLs: um arquivo inválido falha sem processá-los
+        try:
+            baseline = carregar_baseline(args.baseline)
+        except (OSError, ValueError) as erro:
+            print(f"❌ Não foi possível ler o baseline {args.baseline}: {erro}", file=sys.stderr)
+            return 2
+        perfis = coletar_perfis(args)
+        comparador = ComparadorBaseline(baseline, confianca=args.confianca,
+                                        tolerancia=args.tolerancia, reamostragens=args.reamostragens)
+        linhas = comparador.comparar(perfis)
+        for teste in comparador.testes_ausentes(perfis):
+            print(f"⚠️  Teste do baseline ausente nesta execução: {teste}", file=sys.stderr)
+        print(comparador.relatorio(linhas))
+        if args.json:
+            Path(args.json).write_text(json.dumps(linhas, ensure_ascii=False, indent=2), encoding='utf-8')
+        if not linhas:
+            print("❌ Nenhuma métrica comparada: nenhum teste desta execução tem amostras suficientes no baseline",
+                  file=sys.stderr)
+            return 3
+        regressoes = [l for l in linhas if l['regressao']]
+        if regressoes:
+            print(f"\n🔴 {len(regressoes)} regressão(ões) significativa(s) em relação ao baseline")
+            return 1
+        print("\n✅ Nenhuma regressão significativa em relação ao baseline")
+        return 0
+    
+    if args.modo == 'historico':
+        return consultar_historico(args)
+    
     print("="*80)
     print("SISTEMA DE ANÁLISE AUTOMATIZADA DE TESTES DE CARGA".center(80))
     print("Projeto: Catálogo de Livros".center(80))
     print("="*80)
     print()
     
-    # Criar gerador de gráficos
-    gerador = GeradorGraficos('analise-graficos')
+    if args.modo == 'acompanhar':
+        try:
+            MonitorJTL(args.arquivos[0], intervalo=args.intervalo, janela_ms=args.janela_ms).executar()
+        except ValueError as erro:
+            print(f"❌ {erro}")
+            return 1
+        return 0
     
-    # Verificar se existe o arquivo resultados.jtl
-    if Path('../jmeter/resultados.jtl').exists():
-        print("📂 Arquivo resultados.jtl encontrado")
-        print("⚠️  Nota: Este arquivo contém todos os testes combinados")
-        print("   Para análise individual por teste, execute testes separados\n")
+    # Verificar se existem os arquivos JTL
+    if not ausentes:
+        print(f"📂 {len(args.arquivos)} arquivo(s) JTL encontrado(s)")
+        
+        gerador = GeradorGraficos(args.saida, dpi=args.dpi, formato=args.formato)
+        resultados, series, acumuladores = coletar_resultados(args, janela_ms=args.janela_ms)
+        if args.historico:
+            registrar_historico(args, acumuladores)
+        gerador.resultados.update(resultados)
+        gerador.series.update(series)
+        with etapa_perfil('calcular_heatmaps'):
+            gerador.heatmaps.update({nome: a.heatmap() for nome, a in acumuladores.items() if a.janelas is not None})
+        if Path(args.jmx).exists():
+            gerador.definir_concorrencias_jmx(args.jmx)
+        print(f"🔀 {len(resultados)} teste(s)/cenário(s) identificado(s):")
+        for nome in resultados:
+            print(f"   - {nome}")
+        print()
         
-        gerador.adicionar_teste('Todos os Testes Combinados', '../jmeter/resultados.jtl')
-        gerador.gerar_todos_graficos()
+        gerador.gerar_todos_graficos(graficos=args.graficos, processos=args.processos)
         print()
-        relatorio = gerador.gerar_relatorio_textual()
+        with etapa_perfil('gerar_relatorio_textual'):
+            relatorio = gerador.gerar_relatorio_textual()
         print("\n" + "="*80)
         print("RESUMO DOS RESULTADOS")
         print("="*80)
         for linha in relatorio.split('\n')[:30]:  # Mostrar primeiras 30 linhas
             print(linha)
     else:
-        print("❌ Arquivo resultados.jtl não encontrado!")
+        print(f"❌ Arquivo(s) não encontrado(s): {', '.join(ausentes)}")
         print("\n📝 Instruções:")
         print("   1. Execute os testes com: powershell -ExecutionPolicy Bypass -File tests/jmeter/executar-teste.ps1")
         print("   2. Aguarde a conclusão dos testes")
         print("   3. Execute este script novamente")
+        return 1
     
     print("\n" + "="*80)
     print("Análise concluída!".center(80))
     print("="*80)
+    return 0
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
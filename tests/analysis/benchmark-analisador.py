@@ -0,0 +1,219 @@
+"""
+Benchmark do Analisador de Resultados
+Projeto: Catálogo de Livros
+Mede tempo e pico de memória de cada etapa de analisar-resultados.py sobre
+JTLs sintéticos e guarda o histórico para comparar versões
+"""
+
+import importlib.util
+from pathlib import Path
+from contextlib import redirect_stdout
+from datetime import datetime
+import argparse
+import io
+import json
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+DIRETORIO = Path(__file__).resolve().parent
+HISTORICO_PADRAO = DIRETORIO / 'benchmarks' / 'historico.jsonl'
+DADOS_PADRAO = DIRETORIO / 'benchmarks' / 'dados'
+LIMITE_CARGA_COMPLETA = 10_000_000  # Acima disso apenas o modo streaming é medido
+
+def _importar_script(nome_arquivo, nome_modulo):
+    """Importa um script do diretório (os nomes com hífen não são importáveis)"""
+    spec = importlib.util.spec_from_file_location(nome_modulo, DIRETORIO / nome_arquivo)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+analisador = _importar_script('analisar-resultados.py', 'analisar_resultados')
+gerador_jtl = _importar_script('gerar-jtl-sintetico.py', 'gerar_jtl_sintetico')
+
+class Cronometro:
+    """Tempo de parede e pico de memória de cada etapa (o pico numa segunda execução, com tracemalloc)"""
+
+    def __init__(self, medir_memoria=True):
+        """Inicializa a lista de etapas medidas"""
+        self.etapas = {}
+        self.medir_memoria = medir_memoria
+
+    def medir(self, nome, funcao, *args, **kwargs):
+        """Executa funcao, registra a etapa e devolve o resultado"""
+        with redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            resultado = funcao(*args, **kwargs)
+            duracao = time.perf_counter() - inicio
+
+            pico = None
+            if self.medir_memoria:
+                del resultado
+                tracemalloc.start()
+                try:
+                    resultado = funcao(*args, **kwargs)
+                    _, pico = tracemalloc.get_traced_memory()
+                finally:
+                    tracemalloc.stop()
+
+        self.etapas[nome] = {
+            'segundos': round(duracao, 4),
+            'pico_mb': round(pico / 1024 / 1024, 2) if pico is not None else None,
+        }
+        return resultado
+
+def preparar_jtl(linhas, diretorio, semente):
+    """Gera (ou reaproveita) o JTL sintético com o número de linhas pedido"""
+    diretorio.mkdir(parents=True, exist_ok=True)
+    caminho = diretorio / f'sintetico-{linhas}-s{semente}.jtl'
+    if not caminho.exists():
+        print(f"🧪 Gerando {caminho.name}...")
+        gerador_jtl.gerar_jtl(caminho, linhas, semente)
+    return caminho
+
+def _carregar_com_cache(arquivo_jtl, gravar):
+    """Leitura em streaming via CacheColunar (gravar=True parte de um cache vazio)"""
+    if gravar:
+        analisador.CacheColunar(arquivo_jtl).descartar()
+    return analisador.AnalisadorJMeter(arquivo_jtl, streaming=True, por_cenario=True, usar_cache=True)
+
+def executar_benchmark(arquivo_jtl, linhas, dpi=100, graficos=None, medir_memoria=True):
+    """Mede carga, métricas, gráficos e relatório de um JTL; retorna (etapas, memória da carga completa)"""
+    cronometro = Cronometro(medir_memoria)
+    nome_padrao = 'Todos os Testes Combinados'
+    janela_ms = analisador.JANELA_PADRAO_MS
+
+    memoria = None
+    if linhas <= LIMITE_CARGA_COMPLETA:
+        completo = cronometro.medir('carregar_dados', analisador.AnalisadorJMeter, arquivo_jtl)
+        cronometro.medir('calcular_metricas', completo.calcular_metricas, omissao_coordenada=True)
+        memoria = completo.uso_memoria()
+        del completo
+
+    streaming = cronometro.medir(
+        'carregar_streaming', analisador.AnalisadorJMeter, arquivo_jtl,
+        streaming=True, por_cenario=True, janela_ms=janela_ms,
+    )
+    resultados = cronometro.medir('calcular_metricas_por_cenario', streaming.calcular_metricas_por_cenario, omissao_coordenada=True)
+    series = cronometro.medir('calcular_series_por_cenario', streaming.calcular_series_por_cenario)
+    heatmaps = cronometro.medir('calcular_heatmaps_por_cenario', streaming.calcular_heatmaps_por_cenario)
+    del streaming
+
+    # Cache colunar: primeira leitura grava, a segunda lê as colunas prontas
+    cronometro.medir('cache_gravacao', _carregar_com_cache, arquivo_jtl, gravar=True)
+    cronometro.medir('cache_leitura', _carregar_com_cache, arquivo_jtl, gravar=False)
+    analisador.CacheColunar(arquivo_jtl).descartar()
+
+    with tempfile.TemporaryDirectory() as saida:
+        gerador = analisador.GeradorGraficos(saida, dpi=dpi)
+        gerador.resultados = {(c if c is not None else nome_padrao): m for c, m in resultados.items()}
+        gerador.series = {(c if c is not None else nome_padrao): s for c, s in series.items()}
+        gerador.heatmaps = {(c if c is not None else nome_padrao): h for c, h in heatmaps.items()}
+
+        analisador.plt.switch_backend('Agg')
+        for metodo in gerador._selecionar_graficos(graficos):
+            cronometro.medir(metodo, getattr(gerador, metodo))
+        cronometro.medir('gerar_relatorio_textual', gerador.gerar_relatorio_textual)
+
+    return cronometro.etapas, memoria
+
+def _commit_atual():
+    """Hash curto do commit em uso (None fora de um repositório git)"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=DIRETORIO,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def carregar_historico(caminho):
+    """Execuções anteriores gravadas em JSON Lines"""
+    caminho = Path(caminho)
+    if not caminho.exists():
+        return []
+    with open(caminho, encoding='utf-8') as f:
+        return [json.loads(linha) for linha in f if linha.strip()]
+
+def registrar_execucao(caminho, registro):
+    """Acrescenta uma execução ao histórico"""
+    caminho = Path(caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    with open(caminho, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(registro, ensure_ascii=False) + '\n')
+
+def imprimir_comparacao(registro, anterior):
+    """Tabela de etapas com a variação em relação à execução anterior"""
+    print(f"\n📊 {registro['linhas']:,} linhas ({registro['tamanho_mb']:.1f} MB) - commit {registro['commit'] or '?'}")
+    if anterior:
+        print(f"   Comparando com {anterior['data']} (commit {anterior['commit'] or '?'})")
+    print(f"   {'Etapa':<40}{'Tempo (s)':>12}{'Δ tempo':>10}{'Pico (MB)':>12}{'Δ pico':>10}")
+
+    etapas_anteriores = anterior['etapas'] if anterior else {}
+    for nome, medida in registro['etapas'].items():
+        base = etapas_anteriores.get(nome)
+
+        def variacao(chave):
+            if not base or not base.get(chave) or medida[chave] is None:
+                return '-'
+            return f"{(medida[chave] / base[chave] - 1) * 100:+.0f}%"
+
+        pico = f"{medida['pico_mb']:.1f}" if medida['pico_mb'] is not None else '-'
+        print(f"   {nome:<40}{medida['segundos']:>12.3f}{variacao('segundos'):>10}{pico:>12}{variacao('pico_mb'):>10}")
+
+    memoria = registro.get('memoria')
+    if memoria:
+        anterior_linha = (anterior or {}).get('memoria') or {}
+        variacao = f" ({(memoria['bytes_por_linha'] / anterior_linha['bytes_por_linha'] - 1) * 100:+.0f}%)" if anterior_linha else ''
+        print(f"   DataFrame da carga completa: {memoria['bytes'] / 1024 / 1024:.1f} MB, "
+              f"{memoria['bytes_por_linha']:.1f} bytes/linha{variacao}")
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Benchmark de analisar-resultados.py com JTLs sintéticos')
+    parser.add_argument('-n', '--linhas', type=float, nargs='+', default=[1e5, 1e6],
+                        help='tamanhos dos JTLs sintéticos (ex.: 1e5 1e6 1e7)')
+    parser.add_argument('--semente', type=int, default=42, help='semente do gerador de JTL')
+    parser.add_argument('--dados', default=str(DADOS_PADRAO), help='diretório dos JTLs sintéticos')
+    parser.add_argument('--historico', default=str(HISTORICO_PADRAO), help='arquivo de histórico (JSON Lines)')
+    parser.add_argument('--dpi', type=int, default=100, help='resolução dos gráficos medidos')
+    parser.add_argument('--graficos', nargs='+', help='gráficos medidos (ex.: 01 05); padrão: todos')
+    parser.add_argument('--sem-memoria', action='store_true',
+                        help='não medir pico de memória (cada etapa roda uma vez só)')
+    parser.add_argument('--nao-registrar', action='store_true', help='não gravar a execução no histórico')
+    args = parser.parse_args()
+
+    historico = carregar_historico(args.historico)
+
+    for linhas in (int(n) for n in args.linhas):
+        arquivo_jtl = preparar_jtl(linhas, Path(args.dados), args.semente)
+        print(f"⏱️  Medindo {arquivo_jtl.name}...")
+        etapas, memoria = executar_benchmark(arquivo_jtl, linhas, args.dpi, args.graficos, not args.sem_memoria)
+
+        registro = {
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'commit': _commit_atual(),
+            'linhas': linhas,
+            'semente': args.semente,
+            'tamanho_mb': round(arquivo_jtl.stat().st_size / 1024 / 1024, 2),
+            'dpi': args.dpi,
+            'python': platform.python_version(),
+            'pandas': analisador.pd.__version__,
+            'numpy': analisador.np.__version__,
+            'etapas': etapas,
+            'memoria': memoria,
+        }
+        anteriores = [r for r in historico if r['linhas'] == linhas and r.get('semente') == args.semente]
+        imprimir_comparacao(registro, anteriores[-1] if anteriores else None)
+
+        if not args.nao_registrar:
+            registrar_execucao(args.historico, registro)
+            historico.append(registro)
+
+    if not args.nao_registrar:
+        print(f"\n✅ Histórico atualizado: {args.historico}")
+
+if __name__ == '__main__':
+    main()
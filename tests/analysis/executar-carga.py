@@ -0,0 +1,386 @@
+"""
+Gerador de Carga em Python (asyncio)
+Projeto: Catálogo de Livros
+Reproduz os Thread Groups de teste-carga.jmx contra o servidor local e grava
+um JTL CSV com as mesmas colunas do JMeter, sem precisar de JMeter ou JDK
+"""
+
+from pathlib import Path
+from urllib.parse import quote
+import argparse
+import asyncio
+import csv
+import importlib.util
+import json
+import random
+import re
+import sys
+import time
+
+DIRETORIO = Path(__file__).resolve().parent
+ARQUIVO_PADRAO = DIRETORIO.parent / 'jmeter' / 'resultados.jtl'
+ARQUIVO_JMX_PADRAO = DIRETORIO.parent / 'jmeter' / 'teste-carga.jmx'
+TIMEOUT_PADRAO = 30.0  # Segundos até a requisição virar SocketTimeout
+INTERVALO_GRAVACAO = 1.0  # Segundos entre flushes do JTL (o modo acompanhar lê o arquivo em execução)
+# ${__Random(min,max)}, ${__P(nome,padrão)} e ${VARIAVEL}
+PADRAO_EXPRESSAO_JMX = re.compile(r'\$\{([^}]*)\}')
+PADRAO_RANDOM_JMX = re.compile(r'__Random\(\s*(-?\d+)\s*,\s*(-?\d+)\s*(?:,[^)]*)?\)')
+PADRAO_PROPRIEDADE_JMX = re.compile(r'__P\(\s*([^,)]*?)\s*(?:,\s*([^)]*?)\s*)?\)')
+# Colunas na ordem em que o JMeter grava com o saveConfig de teste-carga.jmx (as mesmas de gerar-jtl-sintetico.py)
+COLUNAS_JTL = [
+    'timeStamp', 'elapsed', 'label', 'responseCode', 'responseMessage', 'threadName',
+    'dataType', 'success', 'failureMessage', 'bytes', 'sentBytes', 'grpThreads',
+    'allThreads', 'URL', 'Latency', 'IdleTime', 'Connect',
+]
+
+def _importar_script(nome_arquivo, nome_modulo):
+    """Importa um script do diretório (os nomes com hífen não são importáveis)"""
+    spec = importlib.util.spec_from_file_location(nome_modulo, DIRETORIO / nome_arquivo)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+plano_jmx = _importar_script('plano-jmx.py', 'plano_jmx')
+
+def expandir_jmx(texto, variaveis, rng):
+    """Substitui ${__Random(a,b)}, ${__P(nome,padrão)} e ${VARIAVEL} como o JMeter"""
+    def valor(correspondencia):
+        expressao = correspondencia.group(1).strip()
+        aleatorio = PADRAO_RANDOM_JMX.fullmatch(expressao)
+        if aleatorio:
+            return str(rng.randint(int(aleatorio.group(1)), int(aleatorio.group(2))))
+        propriedade = PADRAO_PROPRIEDADE_JMX.fullmatch(expressao)
+        if propriedade:
+            return variaveis.get(propriedade.group(1), propriedade.group(2) or '')
+        return variaveis.get(expressao, correspondencia.group(0))
+    return PADRAO_EXPRESSAO_JMX.sub(valor, texto)
+
+class ModeloRequisicao:
+    """Requisição HTTP/1.1 de um sampler do JMX; partes sem ${...} são montadas uma única vez"""
+
+    def __init__(self, sampler, variaveis, host=None, porta=None):
+        """Resolve domínio e porta e pré-monta a requisição se ela for fixa"""
+        self.label = sampler['nome']
+        self.metodo = sampler['metodo']
+        self.sampler = sampler
+        self.variaveis = variaveis
+        self.host = host or expandir_jmx(sampler['dominio'], variaveis, random) or 'localhost'
+        self.porta = int(porta or expandir_jmx(sampler['porta'], variaveis, random) or 80)
+        self.keep_alive = sampler['keep_alive']
+        if sampler['protocolo'].lower() != 'http':
+            raise ValueError(f"Protocolo não suportado em '{self.label}': {sampler['protocolo']}")
+
+        dinamico = '${' in sampler['caminho'] or any('${' in n + v for n, v in sampler['parametros'])
+        self._fixa = None if dinamico else self._montar(random)
+
+    def _montar(self, rng):
+        """(bytes da requisição, URL) com as expressões expandidas"""
+        caminho = expandir_jmx(self.sampler['caminho'], self.variaveis, rng)
+        parametros = [(expandir_jmx(n, self.variaveis, rng), expandir_jmx(v, self.variaveis, rng))
+                      for n, v in self.sampler['parametros']]
+        consulta = '&'.join(f"{quote(n, safe='')}={quote(v, safe='')}" for n, v in parametros)
+
+        corpo = b''
+        if self.sampler['corpo_bruto']:
+            corpo = ''.join(v for _, v in parametros).encode('utf-8')
+        elif self.metodo in ('POST', 'PUT', 'PATCH') and consulta:
+            corpo = consulta.encode('utf-8')
+        elif consulta:
+            caminho += ('&' if '?' in caminho else '?') + consulta
+
+        cabecalhos = [
+            f"{self.metodo} {quote(caminho, safe='/?&=%:+,;@')} HTTP/1.1",
+            f"Host: {self.host}:{self.porta}",
+            f"Connection: {'keep-alive' if self.keep_alive else 'close'}",
+            "User-Agent: catalogo-livros-carga/1.0",
+            "Accept: */*",
+        ]
+        if corpo:
+            tipo = 'application/json' if self.sampler['corpo_bruto'] else 'application/x-www-form-urlencoded'
+            cabecalhos += [f"Content-Type: {tipo}", f"Content-Length: {len(corpo)}"]
+        requisicao = ('\r\n'.join(cabecalhos) + '\r\n\r\n').encode('utf-8') + corpo
+        return requisicao, f"http://{self.host}:{self.porta}{caminho}"
+
+    def montar(self, rng):
+        """(bytes da requisição, URL) para um envio"""
+        return self._fixa or self._montar(rng)
+
+class PoolConexoes:
+    """Conexões keep-alive ociosas por destino (host, porta); nunca passa dos usuários virtuais ativos"""
+
+    def __init__(self):
+        """Inicializa sem conexões"""
+        self.ociosas = {}
+        self.abertas = 0
+
+    async def adquirir(self, host, porta):
+        """(leitor, escritor, ms gastos para conectar; None se reaproveitada)"""
+        ociosas = self.ociosas.get((host, porta))
+        while ociosas:
+            leitor, escritor = ociosas.pop()
+            if not escritor.is_closing() and not leitor.at_eof():
+                return leitor, escritor, None
+            self.descartar(escritor)
+        inicio = time.perf_counter()
+        leitor, escritor = await asyncio.open_connection(host, porta)
+        self.abertas += 1
+        return leitor, escritor, round((time.perf_counter() - inicio) * 1000)
+
+    def devolver(self, host, porta, leitor, escritor):
+        """Devolve uma conexão ainda utilizável ao pool"""
+        self.ociosas.setdefault((host, porta), []).append((leitor, escritor))
+
+    def descartar(self, escritor):
+        """Fecha uma conexão que não pode ser reaproveitada"""
+        escritor.close()
+        self.abertas -= 1
+
+    def fechar(self):
+        """Fecha todas as conexões ociosas"""
+        for conexoes in self.ociosas.values():
+            for _, escritor in conexoes:
+                self.descartar(escritor)
+        self.ociosas = {}
+
+async def _ler_resposta(leitor):
+    """(código, mensagem, corpo, bytes recebidos, fechar conexão, instante do cabeçalho) de uma resposta HTTP/1.1"""
+    cabecalho = await leitor.readuntil(b'\r\n\r\n')
+    primeiro_byte = time.perf_counter()
+    linhas = cabecalho.decode('latin-1').split('\r\n')
+    partes = linhas[0].split(' ', 2)
+    codigo, mensagem = partes[1], partes[2] if len(partes) > 2 else ''
+    cabecalhos = {}
+    for linha in linhas[1:]:
+        nome, _, valor = linha.partition(':')
+        cabecalhos[nome.strip().lower()] = valor.strip()
+
+    corpo = b''
+    recebidos = len(cabecalho)
+    fechar = cabecalhos.get('connection', '').lower() == 'close' or partes[0] == 'HTTP/1.0'
+    if 'content-length' in cabecalhos:
+        corpo = await leitor.readexactly(int(cabecalhos['content-length']))
+        recebidos += len(corpo)
+    elif cabecalhos.get('transfer-encoding', '').lower() == 'chunked':
+        pedacos = []
+        while True:
+            linha = await leitor.readuntil(b'\r\n')
+            tamanho = int(linha.split(b';')[0], 16)
+            pedacos.append((await leitor.readexactly(tamanho + 2))[:-2])
+            recebidos += len(linha) + tamanho + 2
+            if tamanho == 0:
+                break
+        corpo = b''.join(pedacos)
+    elif codigo not in ('204', '304') and not codigo.startswith('1'):
+        corpo = await leitor.read()
+        recebidos += len(corpo)
+        fechar = True
+    return codigo, mensagem, corpo, recebidos, fechar, primeiro_byte
+
+def _mensagem_erro_corpo(corpo):
+    """Campo "error" do JSON de uma resposta de erro do server.js ('' se não houver)"""
+    try:
+        erro = json.loads(corpo).get('error', '')
+    except (ValueError, AttributeError):
+        return ''
+    return erro if isinstance(erro, str) else ''
+
+
+class ExecutorCarga:
+    """Executa os Thread Groups do JMX com usuários virtuais asyncio (modelo fechado, como o JMeter)"""
+
+    def __init__(self, arquivo_saida, variaveis, host=None, porta=None, timeout=TIMEOUT_PADRAO, semente=None, duracao=None):
+        """Inicializa o executor e abre o JTL de saída; duracao limita cada grupo em segundos"""
+        self.variaveis = variaveis
+        self.host = host
+        self.porta = porta
+        self.timeout = timeout
+        self.duracao = duracao
+        self.rng = random.Random(semente)
+        self.pool = PoolConexoes()
+        self.arquivo = open(arquivo_saida, 'w', encoding='utf-8', newline='')
+        self.escritor = csv.writer(self.arquivo, lineterminator='\n')
+        self.escritor.writerow(COLUNAS_JTL)
+        self.ativas_total = 0
+        self.amostras = 0
+        self.falhas = 0
+
+    async def executar_plano(self, plano, serializar=True):
+        """Executa os grupos em sequência (serialize_threadgroups) ou juntos"""
+        gravacao = asyncio.create_task(self._gravar_periodicamente())
+        inicio = time.perf_counter()
+        try:
+            grupos = [(indice, nome, grupo) for indice, (nome, grupo) in enumerate(plano.items(), start=1)]
+            if serializar:
+                for indice, nome, grupo in grupos:
+                    await self.executar_grupo(indice, nome, grupo)
+            else:
+                await asyncio.gather(*(self.executar_grupo(i, n, g) for i, n, g in grupos))
+        finally:
+            gravacao.cancel()
+            self.pool.fechar()
+            self.arquivo.close()
+        return time.perf_counter() - inicio
+
+    async def executar_grupo(self, indice, nome, grupo):
+        """Inicia as threads do grupo ao longo do ramp-up e espera todas terminarem"""
+        threads = grupo['threads'] or 1
+        ramp_up = grupo['ramp_up'] or 0
+        loops = grupo['loops'] if grupo['loops'] is not None else 1
+        modelos = [ModeloRequisicao(s, self.variaveis, self.host, self.porta) for s in grupo['samplers']]
+        if not modelos:
+            print(f"⚠️  {nome}: nenhum sampler HTTP, grupo ignorado")
+            return
+
+        print(f"▶️  {nome}: {threads} threads, ramp-up {ramp_up}s, {'∞' if loops < 0 else loops} loops")
+        amostras_antes, falhas_antes, inicio = self.amostras, self.falhas, time.perf_counter()
+        estado = {'ativas': 0}
+        limite = time.monotonic() + self.duracao if self.duracao else None
+        await asyncio.gather(*(
+            self._usuario(f'{nome} {indice}-{numero}', modelos, loops, ramp_up * (numero - 1) / threads, estado, limite)
+            for numero in range(1, threads + 1)
+        ))
+
+        segundos = time.perf_counter() - inicio
+        amostras = self.amostras - amostras_antes
+        print(f"   ✅ {amostras:,} amostras em {segundos:.1f}s ({amostras / segundos if segundos else 0:,.0f} req/s, "
+              f"{self.falhas - falhas_antes:,} falhas)")
+
+    async def _usuario(self, thread_name, modelos, loops, atraso, estado, limite):
+        """Uma thread do JMeter: espera o atraso do ramp-up e repete os samplers"""
+        await asyncio.sleep(atraso)
+        estado['ativas'] += 1
+        self.ativas_total += 1
+        try:
+            iteracao = 0
+            while loops < 0 or iteracao < loops:
+                for modelo in modelos:
+                    if limite is not None and time.monotonic() >= limite:
+                        return
+                    await self._amostrar(modelo, thread_name, estado)
+                iteracao += 1
+        finally:
+            estado['ativas'] -= 1
+            self.ativas_total -= 1
+
+    async def _amostrar(self, modelo, thread_name, estado):
+        """Envia uma requisição e grava a linha JTL correspondente"""
+        requisicao, url = modelo.montar(self.rng)
+        timestamp = time.time_ns() // 1_000_000
+        inicio = time.perf_counter()
+        conexao = latencia = recebidos = 0
+        falha = ''
+        escritor = None
+
+        async def trocar():
+            """Envia a requisição e lê a resposta, trocando conexões keep-alive fechadas"""
+            nonlocal conexao, escritor
+            while True:
+                leitor, escritor, tempo_conexao = await self.pool.adquirir(modelo.host, modelo.porta)
+                conexao = tempo_conexao or 0
+                try:
+                    escritor.write(requisicao)
+                    await escritor.drain()
+                    return leitor, await _ler_resposta(leitor)
+                except (asyncio.IncompleteReadError, ConnectionResetError, BrokenPipeError):
+                    self.pool.descartar(escritor)
+                    escritor = None
+                    if tempo_conexao is not None:
+                        raise
+                    # Conexão keep-alive fechada pelo servidor enquanto ociosa: tenta outra
+
+        try:
+            # wait_for em vez de asyncio.timeout (3.11+) para rodar no Python 3.8+
+            leitor, resposta = await asyncio.wait_for(trocar(), self.timeout)
+            codigo, mensagem, corpo, recebidos, fechar, primeiro_byte = resposta
+            latencia = (primeiro_byte - inicio) * 1000
+            if fechar or not modelo.keep_alive:
+                self.pool.descartar(escritor)
+            else:
+                self.pool.devolver(modelo.host, modelo.porta, leitor, escritor)
+            sucesso = codigo.startswith(('2', '3'))
+            if not sucesso:
+                # O JMeter só preencheria com uma asserção; aqui o erro do server.js (ex.: SQLITE_BUSY) já vai junto
+                falha = _mensagem_erro_corpo(corpo)
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ValueError) as erro:
+            if escritor is not None:
+                self.pool.descartar(escritor)
+            # Mesmo formato do JMeter para erros sem resposta HTTP
+            codigo = f"Non HTTP response code: {type(erro).__name__}"
+            mensagem = f"Non HTTP response message: {str(erro) or ('Read timed out' if isinstance(erro, (TimeoutError, asyncio.TimeoutError)) else type(erro).__name__)}"
+            sucesso = False
+
+        elapsed = round((time.perf_counter() - inicio) * 1000)
+        self.amostras += 1
+        self.falhas += not sucesso
+        self.escritor.writerow([
+            timestamp, elapsed, modelo.label, codigo, mensagem, thread_name, 'text',
+            'true' if sucesso else 'false', falha, recebidos, len(requisicao), estado['ativas'],
+            self.ativas_total, url, round(latencia), 0, conexao,
+        ])
+
+    async def _gravar_periodicamente(self):
+        """Descarrega o buffer do JTL a cada INTERVALO_GRAVACAO segundos"""
+        while True:
+            await asyncio.sleep(INTERVALO_GRAVACAO)
+            self.arquivo.flush()
+
+def selecionar_grupos(plano, cenarios=None):
+    """Grupos habilitados, filtrados pelo número ("3") ou trecho do nome"""
+    selecionados = {}
+    for numero, (nome, grupo) in enumerate(plano.items(), start=1):
+        if not grupo['habilitado']:
+            continue
+        if cenarios and not any(c == str(numero) if c.isdigit() else c.casefold() in nome.casefold() for c in map(str, cenarios)):
+            continue
+        selecionados[nome] = grupo
+    return selecionados
+
+def escalar_grupos(plano, escala_threads=1.0, escala_loops=1.0):
+    """Cópia do plano com threads e loops multiplicados (mínimo 1)"""
+    escalado = {}
+    for nome, grupo in plano.items():
+        grupo = dict(grupo)
+        grupo['threads'] = max(1, round((grupo['threads'] or 1) * escala_threads))
+        if grupo['loops'] is not None and grupo['loops'] >= 0:
+            grupo['loops'] = max(1, round(grupo['loops'] * escala_loops))
+        escalado[nome] = grupo
+    return escalado
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Executa os Thread Groups de teste-carga.jmx com asyncio e grava um JTL CSV')
+    parser.add_argument('--jmx', default=str(ARQUIVO_JMX_PADRAO), help='plano de teste JMeter')
+    parser.add_argument('-o', '--saida', default=str(ARQUIVO_PADRAO), help='JTL de saída (CSV)')
+    parser.add_argument('--host', help='servidor (padrão: variável SERVER do JMX)')
+    parser.add_argument('--porta', type=int, help='porta (padrão: variável PORT do JMX)')
+    parser.add_argument('--cenarios', nargs='+', help='Thread Groups a executar (número ou trecho do nome)')
+    parser.add_argument('--escala-threads', type=float, default=1.0, help='multiplica o número de threads')
+    parser.add_argument('--escala-loops', type=float, default=1.0, help='multiplica o número de loops')
+    parser.add_argument('--duracao', type=float, help='tempo máximo por grupo em segundos (loops infinitos)')
+    parser.add_argument('--timeout', type=float, default=TIMEOUT_PADRAO, help='timeout de cada requisição (s)')
+    parser.add_argument('--simultaneos', action='store_true', help='executa os grupos juntos (ignora serialize_threadgroups)')
+    parser.add_argument('--semente', type=int, help='semente das funções __Random')
+    args = parser.parse_args()
+
+    variaveis, serializar = plano_jmx.ler_variaveis_jmx(args.jmx)
+    plano = selecionar_grupos(plano_jmx.ler_plano_jmx(args.jmx), args.cenarios)
+    if not plano:
+        print("❌ Nenhum Thread Group selecionado", file=sys.stderr)
+        return 1
+    plano = escalar_grupos(plano, args.escala_threads, args.escala_loops)
+
+    executor = ExecutorCarga(args.saida, variaveis, args.host, args.porta, args.timeout, args.semente, args.duracao)
+
+    print(f"🚀 {len(plano)} Thread Group(s) de {args.jmx} -> {args.saida}\n")
+    try:
+        segundos = asyncio.run(executor.executar_plano(plano, serializar and not args.simultaneos))
+    except KeyboardInterrupt:
+        print("\n⏹️  Execução interrompida")
+        return 1
+    print(f"\n✅ {executor.amostras:,} amostras em {segundos:.1f}s ({executor.amostras / segundos:,.0f} req/s), "
+          f"{executor.falhas:,} falhas")
+    print(f"📁 JTL gravado em {args.saida}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
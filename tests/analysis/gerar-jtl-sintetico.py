@@ -0,0 +1,144 @@
+"""
+Gerador de Arquivos JTL Sintéticos
+Projeto: Catálogo de Livros
+Produz CSV no mesmo formato do saveConfig de teste-carga.jmx, com cenários,
+endpoints e distribuições de latência realistas, para medir o analisador
+"""
+
+import pandas as pd
+import numpy as np
+from pathlib import Path
+import argparse
+import time
+
+# Colunas na ordem em que o JMeter grava com o saveConfig de teste-carga.jmx
+COLUNAS_JTL = [
+    'timeStamp', 'elapsed', 'label', 'responseCode', 'responseMessage', 'threadName',
+    'dataType', 'success', 'failureMessage', 'bytes', 'sentBytes', 'grpThreads',
+    'allThreads', 'URL', 'Latency', 'IdleTime', 'Connect',
+]
+
+# Endpoints: (label, URL, mediana do tempo em ms, tamanho médio da resposta em bytes)
+ENDPOINTS = {
+    'listar': ('GET - Listar Livros', 'http://localhost:3000/api/livros', 18, 4200),
+    'estatisticas': ('GET - Estatísticas', 'http://localhost:3000/api/estatisticas', 35, 380),
+    'buscar_id': ('GET - Buscar Livro ID 1', 'http://localhost:3000/api/livros/1', 6, 260),
+    'paginacao': ('GET - Listar Livros com Paginação', 'http://localhost:3000/api/livros?page=1&limit=12', 14, 3100),
+    'filtro': ('GET - Buscar com Filtro', 'http://localhost:3000/api/livros?search=Tolkien', 22, 900),
+    'aleatorio': ('GET - Buscar Livro Aleatório', 'http://localhost:3000/api/livros/7', 6, 260),
+}
+
+# Cenários de teste-carga.jmx: (Thread Group, threads, ramp-up em s, loops, endpoints)
+CENARIOS = [
+    ('1. Carga Espersa (Steady Load)', 20, 10, 10, ['listar', 'estatisticas']),
+    ('2. Rajada (Spike Test)', 100, 2, 5, ['listar', 'buscar_id']),
+    ('3. Estresse (Stress Test)', 50, 30, 20, ['paginacao', 'filtro', 'estatisticas']),
+    ('4. Baseline Test (Linha Base)', 5, 5, 50, ['listar', 'buscar_id', 'estatisticas']),
+    ('5. Volume Test (Teste de Volume)', 10, 10, 100, ['paginacao', 'aleatorio']),
+    ('6. Scalability Test - Baixa Carga (10 users)', 10, 5, 20, ['listar', 'estatisticas']),
+    ('7. Scalability Test - Média Carga (30 users)', 30, 5, 20, ['listar', 'estatisticas']),
+    ('8. Scalability Test - Alta Carga (60 users)', 60, 5, 20, ['listar', 'estatisticas']),
+]
+
+TAMANHO_CHUNK_PADRAO = 1_000_000
+INICIO_PADRAO_MS = 1_760_000_000_000
+
+def _distribuir_linhas(total):
+    """Linhas por cenário, proporcionais a threads x loops x samplers"""
+    pesos = np.array([threads * loops * len(endpoints) for _, threads, _, loops, endpoints in CENARIOS], dtype=float)
+    linhas = np.floor(pesos / pesos.sum() * total).astype(np.int64)
+    linhas[np.argmax(pesos)] += total - linhas.sum()
+    return linhas
+
+def _gerar_chunk(rng, cenario, n, inicio_ms, inicio_cenario_ms):
+    """Gera n amostras consecutivas de um cenário a partir de inicio_ms"""
+    nome, threads, ramp_up, _, endpoints = cenario
+
+    # Mais concorrência -> mais fila no servidor -> tempos maiores
+    carga = 1 + threads / 40
+    escolha = rng.integers(0, len(endpoints), n)
+    medianas = np.array([ENDPOINTS[e][2] for e in endpoints], dtype=float)[escolha] * carga
+    elapsed = rng.lognormal(np.log(medianas), 0.55)
+    cauda = rng.random(n) < 0.01  # 1% de amostras lentas (GC, I/O do SQLite)
+    elapsed[cauda] *= rng.uniform(5, 20, cauda.sum())
+    elapsed = np.maximum(elapsed, 1).astype(np.int64)
+
+    taxa_falha = 0.002 * carga ** 2
+    falha = rng.random(n) < taxa_falha
+    timeout = falha & (rng.random(n) < 0.1)
+    elapsed[timeout] = rng.integers(5000, 30000, timeout.sum())
+
+    # Modelo fechado: cada thread espera a resposta, intervalo = tempo médio / threads
+    intervalo_medio = max(float(np.mean(elapsed)) / threads, 0.05)
+    timestamps = inicio_ms + np.cumsum(rng.exponential(intervalo_medio, n)).astype(np.int64)
+    decorrido = (timestamps - inicio_cenario_ms) / 1000
+    ativas = np.clip(np.ceil(threads * decorrido / max(ramp_up, 1)), 1, threads).astype(np.int64)
+
+    codigos = np.where(falha, '500', '200').astype(object)
+    codigos[timeout] = 'Non HTTP response code: java.net.SocketTimeoutException'
+    mensagens = np.where(falha, 'Internal Server Error', 'OK').astype(object)
+    mensagens[timeout] = 'Non HTTP response message: Read timed out'
+
+    tamanhos = np.array([ENDPOINTS[e][3] for e in endpoints], dtype=float)[escolha]
+    bytes_resposta = np.where(falha, 120, rng.normal(tamanhos, tamanhos * 0.05)).astype(np.int64)
+    latencia = (elapsed * rng.uniform(0.75, 0.98, n)).astype(np.int64)
+    conexao = np.where(rng.random(n) < 0.02, rng.integers(1, 4, n), 0)
+
+    labels = np.array([ENDPOINTS[e][0] for e in endpoints], dtype=object)[escolha]
+    urls = np.array([ENDPOINTS[e][1] for e in endpoints], dtype=object)[escolha]
+    numero_thread = rng.integers(1, threads + 1, n)
+
+    return pd.DataFrame({
+        'timeStamp': timestamps,
+        'elapsed': elapsed,
+        'label': labels,
+        'responseCode': codigos,
+        'responseMessage': mensagens,
+        'threadName': [f'{nome} 1-{t}' for t in numero_thread],
+        'dataType': 'text',
+        'success': np.where(falha, 'false', 'true'),
+        'failureMessage': '',
+        'bytes': bytes_resposta,
+        'sentBytes': rng.integers(120, 160, n),
+        'grpThreads': ativas,
+        'allThreads': ativas,
+        'URL': urls,
+        'Latency': latencia,
+        'IdleTime': 0,
+        'Connect': conexao,
+    }, columns=COLUNAS_JTL)
+
+def gerar_jtl(caminho, linhas, semente=42, tamanho_chunk=TAMANHO_CHUNK_PADRAO, inicio_ms=INICIO_PADRAO_MS):
+    """Grava um JTL sintético em chunks, com os cenários em sequência (memória limitada por tamanho_chunk)"""
+    rng = np.random.default_rng(semente)
+    relogio = inicio_ms
+    primeiro = True
+    with open(caminho, 'w', encoding='utf-8', newline='') as arquivo:
+        for cenario, total in zip(CENARIOS, _distribuir_linhas(linhas)):
+            inicio_cenario = relogio
+            for inicio in range(0, total, tamanho_chunk):
+                n = min(tamanho_chunk, total - inicio)
+                chunk = _gerar_chunk(rng, cenario, n, relogio, inicio_cenario)
+                chunk.to_csv(arquivo, header=primeiro, index=False, lineterminator='\n')
+                primeiro = False
+                relogio = int(chunk['timeStamp'].iloc[-1])
+            relogio += 2000  # Pausa entre Thread Groups
+    return Path(caminho)
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Gera arquivos JTL sintéticos no formato do teste-carga.jmx')
+    parser.add_argument('saida', help='arquivo JTL de saída')
+    parser.add_argument('-n', '--linhas', type=float, default=1e5, help='número de amostras (ex.: 1e6)')
+    parser.add_argument('--semente', type=int, default=42, help='semente do gerador aleatório')
+    parser.add_argument('--chunk', type=int, default=TAMANHO_CHUNK_PADRAO, help='linhas geradas por vez')
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    caminho = gerar_jtl(args.saida, int(args.linhas), args.semente, args.chunk)
+    duracao = time.perf_counter() - inicio
+    tamanho_mb = caminho.stat().st_size / 1024 / 1024
+    print(f"✅ {int(args.linhas):,} amostras gravadas em {caminho} ({tamanho_mb:.1f} MB, {duracao:.1f}s)")
+
+if __name__ == '__main__':
+    main()
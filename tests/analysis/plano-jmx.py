@@ -0,0 +1,168 @@
+"""
+Leitura do Plano de Teste JMeter (.jmx)
+Projeto: Catálogo de Livros
+Thread Groups, samplers HTTP e variáveis de teste-carga.jmx, lidos só com a
+biblioteca padrão por analisar-resultados.py e executar-carga.py
+"""
+
+import re
+import xml.etree.ElementTree as ET
+
+# Timers de pausa: média = ConstantTimer.delay + fator * RandomTimer.range
+FATOR_ALEATORIO_TIMERS = {
+    'ConstantTimer': 0, 'UniformRandomTimer': 0.5, 'GaussianRandomTimer': 0, 'PoissonRandomTimer': 1,
+}
+
+def corrigir_codificacao(texto):
+    """Desfaz UTF-8 lido como Latin-1 ("MÃ©dia" -> "Média"), comum em JMX editados no Windows"""
+    try:
+        return texto.encode('latin-1').decode('utf-8')
+    except (UnicodeEncodeError, UnicodeDecodeError):
+        return texto
+
+def _valor_jmx(texto):
+    """Inteiro de uma propriedade do JMX; ${__P(nome,padrão)} usa o padrão"""
+    if texto is None:
+        return None
+    texto = texto.strip()
+    propriedade = re.fullmatch(r'\$\{__P\([^,)]*,\s*(-?\d+)\s*\)\}', texto)
+    if propriedade:
+        texto = propriedade.group(1)
+    try:
+        return int(texto)
+    except ValueError:
+        return None
+
+def _decimal_jmx(texto):
+    """Número de uma propriedade do JMX (aceita decimais); ${__P(nome,padrão)} usa o padrão"""
+    if texto is None:
+        return None
+    texto = texto.strip()
+    propriedade = re.fullmatch(r'\$\{__P\([^,)]*,\s*([-\d.]+)\s*\)\}', texto)
+    if propriedade:
+        texto = propriedade.group(1)
+    try:
+        return float(texto)
+    except ValueError:
+        return None
+
+def _propriedade_jmx(elemento, nome):
+    """Texto da primeira propriedade name=nome dentro do elemento (None se ausente)"""
+    encontrado = elemento.find(f".//*[@name='{nome}']")
+    return encontrado.text if encontrado is not None else None
+
+def _ler_sampler_jmx(sampler):
+    """Requisição de um HTTPSamplerProxy (textos com ${...} ficam sem expandir)"""
+    parametros = []
+    for argumento in sampler.iterfind("elementProp[@name='HTTPsampler.Arguments']/collectionProp/elementProp"):
+        parametros.append((
+            corrigir_codificacao(_propriedade_jmx(argumento, 'Argument.name') or ''),
+            corrigir_codificacao(_propriedade_jmx(argumento, 'Argument.value') or ''),
+        ))
+    return {
+        'nome': corrigir_codificacao(sampler.get('testname', '')),
+        'metodo': (_propriedade_jmx(sampler, 'HTTPSampler.method') or 'GET').upper(),
+        'protocolo': _propriedade_jmx(sampler, 'HTTPSampler.protocol') or 'http',
+        'dominio': _propriedade_jmx(sampler, 'HTTPSampler.domain') or '',
+        'porta': _propriedade_jmx(sampler, 'HTTPSampler.port') or '',
+        'caminho': corrigir_codificacao(_propriedade_jmx(sampler, 'HTTPSampler.path') or '/'),
+        'parametros': parametros,
+        'corpo_bruto': _propriedade_jmx(sampler, 'HTTPSampler.postBodyRaw') == 'true',
+        'keep_alive': _propriedade_jmx(sampler, 'HTTPSampler.use_keepalive') != 'false',
+    }
+
+def _subarvore_jmx(filhos, posicao):
+    """hashTree com os filhos do elemento em filhos[posicao] (None se não houver)"""
+    if posicao + 1 < len(filhos) and filhos[posicao + 1].tag == 'hashTree':
+        return filhos[posicao + 1]
+    return None
+
+def _habilitado_jmx(elemento):
+    """Elemento não desabilitado no JMeter"""
+    return elemento.get('enabled', 'true') != 'false'
+
+def _pausa_timer(timer):
+    """Pausa média (ms) de um timer de pausa"""
+    atraso = _decimal_jmx(_propriedade_jmx(timer, 'ConstantTimer.delay')) or 0
+    variacao = _decimal_jmx(_propriedade_jmx(timer, 'RandomTimer.range')) or 0
+    return atraso + FATOR_ALEATORIO_TIMERS[timer.tag] * variacao
+
+def _pausa_timers(arvore):
+    """(pausa total por iteração em ms, samplers) de uma hashTree; um timer pausa antes de cada sampler do seu escopo"""
+    filhos = list(arvore)
+    pausa, pausa_escopo, samplers = 0.0, 0.0, 0
+    for posicao, elemento in enumerate(filhos):
+        if elemento.tag == 'hashTree' or not _habilitado_jmx(elemento):
+            continue
+        subarvore = _subarvore_jmx(filhos, posicao)
+        if elemento.tag in FATOR_ALEATORIO_TIMERS:
+            pausa_escopo += _pausa_timer(elemento)
+        elif elemento.tag == 'HTTPSamplerProxy':
+            samplers += 1
+            if subarvore is not None:
+                pausa += sum(_pausa_timer(t) for t in subarvore if t.tag in FATOR_ALEATORIO_TIMERS and _habilitado_jmx(t))
+        elif subarvore is not None:
+            pausa_filhos, samplers_filhos = _pausa_timers(subarvore)
+            pausa += pausa_filhos
+            samplers += samplers_filhos
+    return pausa + pausa_escopo * samplers, samplers
+
+def _vazao_timer(timer):
+    """Vazão alvo (amostras por minuto) de um ConstantThroughputTimer"""
+    for propriedade in timer.iter('doubleProp'):
+        if propriedade.findtext('name') == 'throughput':
+            return _decimal_jmx(propriedade.findtext('value'))
+    return _decimal_jmx(_propriedade_jmx(timer, 'throughput'))
+
+def _intervalo_planejado(subarvore, threads):
+    """(intervalo em ms entre as requisições de uma thread, timer de origem) previsto pelos timers do grupo"""
+    if subarvore is None:
+        return None, None
+    for timer in subarvore.iter('ConstantThroughputTimer'):
+        vazao = _vazao_timer(timer) if _habilitado_jmx(timer) else None
+        if vazao and vazao > 0:
+            # calcMode 0: vazão de cada thread; os demais dividem a vazão entre as threads (as do grupo)
+            por_thread = vazao if _valor_jmx(_propriedade_jmx(timer, 'calcMode')) == 0 else vazao / (threads or 1)
+            return 60_000 / por_thread, 'vazao'
+    pausa, samplers = _pausa_timers(subarvore)
+    if samplers and pausa > 0:
+        return pausa / samplers, 'pausa'
+    return None, None
+
+def ler_plano_jmx(arquivo_jmx):
+    """Threads, ramp-up, loops, habilitado, samplers HTTP habilitados e intervalo dos timers de cada Thread Group do .jmx"""
+    raiz = ET.parse(arquivo_jmx).getroot()
+    plano = {}
+    # No JMX os filhos de um elemento ficam no <hashTree> irmão logo depois dele
+    for arvore in raiz.iter('hashTree'):
+        filhos = list(arvore)
+        for posicao, grupo in enumerate(filhos):
+            if grupo.tag != 'ThreadGroup':
+                continue
+            subarvore = _subarvore_jmx(filhos, posicao)
+            samplers = [] if subarvore is None else [
+                _ler_sampler_jmx(s) for s in subarvore.iter('HTTPSamplerProxy') if _habilitado_jmx(s)
+            ]
+            threads = _valor_jmx(_propriedade_jmx(grupo, 'ThreadGroup.num_threads'))
+            intervalo_ms, timer = _intervalo_planejado(subarvore, threads)
+            nome = corrigir_codificacao(grupo.get('testname', ''))
+            plano[nome] = {
+                'threads': threads,
+                'ramp_up': _valor_jmx(_propriedade_jmx(grupo, 'ThreadGroup.ramp_time')),
+                'loops': _valor_jmx(_propriedade_jmx(grupo, 'LoopController.loops')),
+                'habilitado': _habilitado_jmx(grupo),
+                'samplers': samplers,
+                'intervalo_ms': intervalo_ms,  # None sem timers: o JMX não diz o intervalo esperado
+                'timer': timer,
+            }
+    return plano
+
+def ler_variaveis_jmx(arquivo_jmx):
+    """User Defined Variables do Test Plan ({nome: valor}) e serialize_threadgroups"""
+    plano = ET.parse(arquivo_jmx).getroot().find('.//TestPlan')
+    if plano is None:
+        return {}, False
+    variaveis = {}
+    for argumento in plano.iterfind(".//elementProp[@name='TestPlan.user_defined_variables']/collectionProp/elementProp"):
+        variaveis[_propriedade_jmx(argumento, 'Argument.name') or ''] = corrigir_codificacao(_propriedade_jmx(argumento, 'Argument.value') or '')
+    return variaveis, _propriedade_jmx(plano, 'TestPlan.serialize_threadgroups') == 'true'
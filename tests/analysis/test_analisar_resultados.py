@@ -0,0 +1,619 @@
+"""
+Testes do Analisador de Resultados JMeter
+Projeto: Catálogo de Livros
+Acumuladores mescláveis, comparação com baseline e mescla de JTLs distribuídos
+"""
+
+import importlib.util
+import os
+import random
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+DIRETORIO = Path(__file__).resolve().parent
+
+def _importar_script(nome_arquivo, nome_modulo):
+    """Importa um script do diretório (os nomes com hífen não são importáveis)"""
+    spec = importlib.util.spec_from_file_location(nome_modulo, DIRETORIO / nome_arquivo)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+analisador = _importar_script('analisar-resultados.py', 'analisar_resultados')
+gerador = _importar_script('gerar-jtl-sintetico.py', 'gerar_jtl_sintetico')
+carga = _importar_script('executar-carga.py', 'executar_carga')
+
+JANELA_MS = 1000
+METRICAS_COMPARADAS = [
+    'total_requests', 'success_requests', 'failed_requests', 'error_rate', 'avg_response_time',
+    'min_response_time', 'max_response_time', 'p50', 'p90', 'p95', 'p99', 'throughput',
+]
+
+@pytest.fixture(scope='module')
+def jtl(tmp_path_factory):
+    """JTL sintético pequeno com todos os cenários"""
+    return gerador.gerar_jtl(tmp_path_factory.mktemp('jtl') / 'resultados.jtl', 20_000)
+
+def _acumulador(arquivo, **opcoes):
+    """AcumuladorMetricas de um JTL lido em streaming"""
+    return analisador.AnalisadorJMeter(arquivo, streaming=True, janela_ms=JANELA_MS, **opcoes).acumulador_total()
+
+def _heatmap_ordenado(acumulador):
+    """Heatmap com as linhas em ordem, para comparar tabelas montadas em ordens diferentes"""
+    return acumulador.heatmap().sort_values(['janela', 'endpoint', 'faixa'], ignore_index=True)
+
+def _comparar_metricas(esperadas, obtidas):
+    """Métricas principais e contagens por endpoint iguais"""
+    for chave in METRICAS_COMPARADAS:
+        assert obtidas[chave] == pytest.approx(esperadas[chave]), chave
+    assert obtidas['endpoints'].keys() == esperadas['endpoints'].keys()
+    for endpoint, metricas in esperadas['endpoints'].items():
+        assert obtidas['endpoints'][endpoint]['count'] == metricas['count'], endpoint
+    assert obtidas['erros']['total'] == esperadas['erros']['total']
+
+# ==================== Acumuladores mescláveis ====================
+
+def test_streaming_igual_carga_completa(jtl):
+    completo = analisador.AnalisadorJMeter(jtl, janela_ms=JANELA_MS)
+    streaming = analisador.AnalisadorJMeter(jtl, streaming=True, tamanho_chunk=1_500, janela_ms=JANELA_MS)
+
+    _comparar_metricas(completo.calcular_metricas(), streaming.calcular_metricas())
+    pd.testing.assert_frame_equal(completo.calcular_serie_temporal(), streaming.calcular_serie_temporal())
+
+def test_tamanho_do_chunk_nao_altera_series(jtl):
+    inteiro = _acumulador(jtl)
+    picado = _acumulador(jtl, tamanho_chunk=700)
+
+    _comparar_metricas(inteiro.metricas(), picado.metricas())
+    pd.testing.assert_frame_equal(inteiro.serie(), picado.serie())
+    pd.testing.assert_frame_equal(_heatmap_ordenado(inteiro), _heatmap_ordenado(picado))
+
+def test_mesclar_metades_igual_arquivo_inteiro(jtl, tmp_path):
+    df = pd.read_csv(jtl)
+    # O corte cai no meio de uma janela: as duas metades somam a mesma janela
+    primeira, segunda = tmp_path / 'primeira.jtl', tmp_path / 'segunda.jtl'
+    df.iloc[:len(df) // 2].to_csv(primeira, index=False)
+    df.iloc[len(df) // 2:].to_csv(segunda, index=False)
+
+    inteiro = _acumulador(jtl)
+    mesclado = _acumulador(primeira).mesclar(_acumulador(segunda))
+
+    _comparar_metricas(inteiro.metricas(), mesclado.metricas())
+    pd.testing.assert_frame_equal(inteiro.serie(), mesclado.serie())
+    pd.testing.assert_frame_equal(_heatmap_ordenado(inteiro), _heatmap_ordenado(mesclado))
+    assert inteiro.histograma.quantis([0.5, 0.99]) == pytest.approx(mesclado.histograma.quantis([0.5, 0.99]))
+
+def test_podar_mantem_ultimas_janelas(jtl):
+    acumulador = _acumulador(jtl)
+    serie = acumulador.serie()
+
+    acumulador.janelas.podar(10)
+    podada = acumulador.janelas.serie()
+    # A série podada começa na primeira janela ocupada entre as 10 últimas
+    assert serie.index[-10] <= podada.index[0] and podada.index[-1] == serie.index[-1]
+    esperada = serie.loc[podada.index[0]:].drop(columns=[c for c in serie if c.startswith('erros_')])
+    pd.testing.assert_frame_equal(podada, esperada, check_dtype=False)
+
+# ==================== CacheColunar ====================
+
+def test_cache_colunar_recriado_quando_o_jtl_muda(jtl, tmp_path):
+    arquivo = tmp_path / 'cache.jtl'
+    arquivo.write_bytes(jtl.read_bytes())
+    cache = analisador.CacheColunar(arquivo)
+    assert not cache.valido()
+
+    original = _acumulador(arquivo, usar_cache=True).metricas()
+    assert cache.valido()
+    _comparar_metricas(original, _acumulador(arquivo, usar_cache=True).metricas())
+
+    # Mesmo conteúdo e tamanho, outra data de modificação: o cache deixa de valer
+    info = arquivo.stat()
+    os.utime(arquivo, ns=(info.st_atime_ns, info.st_mtime_ns + 10**9))
+    assert not cache.valido()
+    _acumulador(arquivo, usar_cache=True)
+    assert cache.valido()
+
+    # Outro tamanho: a leitura seguinte vem do JTL novo, não das colunas antigas
+    df = pd.read_csv(jtl)
+    df.iloc[:len(df) // 2].to_csv(arquivo, index=False)
+    assert not cache.valido()
+    metade = _acumulador(arquivo, usar_cache=True).metricas()
+    assert metade['total_requests'] == len(df) // 2
+    _comparar_metricas(_acumulador(arquivo).metricas(), metade)
+
+# ==================== MonitorJTL ====================
+
+def test_monitor_le_so_o_que_foi_acrescentado(jtl, tmp_path):
+    conteudo = jtl.read_bytes()
+    arquivo = tmp_path / 'crescendo.jtl'
+    arquivo.write_bytes(b'')
+    monitor = analisador.MonitorJTL(arquivo, janela_ms=JANELA_MS)
+
+    # Os cortes caem no meio de linhas: o pedaço incompleto espera a próxima leitura
+    lidas = 0
+    for inicio in range(0, len(conteudo), 100_003):
+        with open(arquivo, 'ab') as f:
+            f.write(conteudo[inicio:inicio + 100_003])
+        lidas += monitor.ler_novos_dados()
+        assert monitor.posicao == arquivo.stat().st_size
+    assert monitor.ler_novos_dados() == 0
+
+    esperadas = _acumulador(jtl).metricas()
+    assert lidas == esperadas['total_requests']
+    _comparar_metricas(esperadas, monitor.acumulador.metricas())
+
+def test_monitor_reinicia_quando_o_jtl_e_recriado(jtl, tmp_path):
+    linhas = jtl.read_bytes().splitlines(keepends=True)
+    arquivo = tmp_path / 'recriado.jtl'
+    arquivo.write_bytes(b''.join(linhas[:1001]))
+    monitor = analisador.MonitorJTL(arquivo, janela_ms=JANELA_MS)
+    assert monitor.ler_novos_dados() == 1000
+
+    arquivo.write_bytes(b''.join(linhas[:11]))
+    assert monitor.ler_novos_dados() == 10
+    assert monitor.acumulador.metricas()['total_requests'] == 10
+
+# ==================== ComparadorBaseline ====================
+
+def _perfil(arquivo, nome='Teste'):
+    """{nome: perfil_baseline} de um JTL"""
+    return {nome: analisador.perfil_baseline(_acumulador(arquivo))}
+
+@pytest.fixture(scope='module')
+def baseline(jtl, tmp_path_factory):
+    """Baseline gravado e relido do JTL sintético"""
+    caminho = tmp_path_factory.mktemp('baseline') / 'baseline.json'
+    analisador.salvar_baseline(caminho, _perfil(jtl), origem=str(jtl))
+    return analisador.carregar_baseline(caminho)
+
+def _regressoes(baseline, perfis):
+    """Métricas do teste inteiro (endpoint None) sinalizadas como regressão"""
+    linhas = analisador.ComparadorBaseline(baseline, reamostragens=300).comparar(perfis)
+    return {linha['metrica'] for linha in linhas if linha['endpoint'] is None and linha['regressao']}
+
+def test_baseline_sem_regressao_com_outra_amostra(baseline, tmp_path):
+    # Mesma distribuição, outra semente: as diferenças ficam dentro do intervalo
+    outra = gerador.gerar_jtl(tmp_path / 'outra.jtl', 20_000, semente=7)
+    assert _regressoes(baseline, _perfil(outra)) == set()
+
+def test_baseline_detecta_latencia_maior(jtl, baseline, tmp_path):
+    df = pd.read_csv(jtl)
+    df['elapsed'] = (df['elapsed'] * 1.4).astype(np.int64)
+    lento = tmp_path / 'lento.jtl'
+    df.to_csv(lento, index=False)
+
+    assert {'p95', 'p99'} <= _regressoes(baseline, _perfil(lento))
+
+def test_baseline_detecta_queda_de_throughput(jtl, baseline, tmp_path):
+    df = pd.read_csv(jtl)
+    inicio = df['timeStamp'].min()
+    df['timeStamp'] = inicio + (df['timeStamp'] - inicio) * 2
+    espacado = tmp_path / 'espacado.jtl'
+    df.to_csv(espacado, index=False)
+
+    assert 'throughput' in _regressoes(baseline, _perfil(espacado))
+
+def test_comparar_sem_testes_em_comum_nao_aprova(jtl, tmp_path, capsys):
+    caminho = tmp_path / 'outro.json'
+    analisador.salvar_baseline(caminho, _perfil(jtl, nome='Outro Teste'))
+
+    assert analisador.ComparadorBaseline(analisador.carregar_baseline(caminho)).testes_ausentes(_perfil(jtl)) == ['Outro Teste']
+    assert analisador.main(['-m', 'comparar', '--baseline', str(caminho), '--sem-cache', str(jtl)]) == 3
+    assert 'Outro Teste' in capsys.readouterr().err
+
+@pytest.mark.parametrize('conteudo', [None, '{"testes": ', '[]'])
+def test_comparar_baseline_ilegivel(jtl, tmp_path, capsys, conteudo):
+    caminho = tmp_path / 'baseline.json'
+    if conteudo is not None:
+        caminho.write_text(conteudo, encoding='utf-8')
+
+    assert analisador.main(['-m', 'comparar', '--baseline', str(caminho), '--sem-cache', str(jtl)]) == 2
+    assert 'baseline' in capsys.readouterr().err
+
+# ==================== Leitura do JTL ====================
+
+PLANO_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<testResults version="1.2">
+<httpSample t="120" ts="1700000000000" lb="Fluxo" rc="200" rm="OK" s="true" by="10" ng="1" na="1">
+  <httpSample t="70" ts="1700000000000" lb="Fluxo-0" rc="200" s="true" by="4"/>
+  <httpSample t="50" ts="1700000000070" lb="Fluxo-1" rc="200" s="true" by="6"/>
+  <java.net.URL>http://localhost/fluxo</java.net.URL>
+</httpSample>
+<httpSample t="30" ts="1700000000200" lb="Busca" rc="200" rm="OK" s="false" by="5" ng="1" na="1">
+  <assertionResult><name>Status</name><failure>false</failure><error>false</error></assertionResult>
+  <assertionResult><name>Corpo</name><failure>true</failure><error>false</error>
+    <failureMessage>Texto esperado ausente</failureMessage></assertionResult>
+</httpSample>
+<sample t="5" ts="1700000000300" lb="Pausa" s="true"/>
+</testResults>
+"""
+
+@pytest.mark.parametrize('tamanho_chunk', [1, 100])
+def test_jtl_xml_le_so_amostras_de_nivel_superior(tmp_path, tamanho_chunk):
+    arquivo = tmp_path / 'resultados.jtl'
+    arquivo.write_text(PLANO_XML, encoding='utf-8')
+
+    df = pd.concat(analisador.ler_jtl_xml(arquivo, tamanho_chunk=tamanho_chunk), ignore_index=True)
+    assert df['label'].tolist() == ['Fluxo', 'Busca', 'Pausa']
+    assert df['elapsed'].tolist() == [120, 30, 5]
+    assert df['success'].tolist() == [True, False, True]
+    assert df['URL'][0] == 'http://localhost/fluxo' and df['URL'][1:].isna().all()
+    # A mensagem vem da asserção que falhou, não da primeira da amostra
+    assert df['failureMessage'][1] == 'Texto esperado ausente'
+    assert df['failureMessage'].drop(index=1).isna().all()
+
+    for streaming in (False, True):
+        metricas = analisador.AnalisadorJMeter(arquivo, streaming=streaming).calcular_metricas()
+        assert metricas['total_requests'] == 3
+        assert metricas['endpoints'].keys() == {'Fluxo', 'Busca', 'Pausa'}
+
+@pytest.mark.parametrize('nome, conteudo', [
+    ('ecomercial.jtl', '<?xml version="1.0"?>\n<testResults><httpSample t="5" ts="1" lb="a & b" s="true"/></testResults>\n'),
+    ('texto.jtl', 'timeStamp,elapsed,label,success\n1,abc,GET,true\n'),
+])
+@pytest.mark.parametrize('streaming', [False, True])
+def test_jtl_malformado_falha(tmp_path, capsys, nome, conteudo, streaming):
+    arquivo = tmp_path / nome
+    arquivo.write_text(conteudo, encoding='utf-8')
+
+    with pytest.raises(analisador.ErroLeituraJTL):
+        analisador.AnalisadorJMeter(arquivo, streaming=streaming)
+    opcoes = ['--streaming'] if streaming else []
+    assert analisador.main(['-m', 'metricas', '--sem-cenarios', *opcoes, str(arquivo)]) == 2
+    saida = capsys.readouterr()
+    assert saida.out == '' and 'Erro ao carregar' in saida.err
+
+# ==================== ModeloUSL ====================
+
+def test_usl_recupera_coeficientes():
+    usuarios = [1, 5, 10, 20, 40, 80]
+    esperado = analisador.ModeloUSL(30.0, 0.05, 0.0004)
+    modelo = analisador.ModeloUSL.ajustar(usuarios, esperado.prever(usuarios))
+
+    assert (modelo.lambda_, modelo.sigma, modelo.kappa) == pytest.approx((30.0, 0.05, 0.0004), rel=1e-6)
+    assert modelo.concorrencia_pico() == pytest.approx(np.sqrt(0.95 / 0.0004))
+    assert (modelo.niveis, modelo.parametros) == (6, 3)
+
+def test_usl_descarta_coeficiente_negativo():
+    # O ajuste exato destes três pontos teria κ < 0: κ é descartado e o ajuste deixa de ser exato
+    modelo = analisador.ModeloUSL.ajustar([10, 30, 60], [100, 280, 520])
+
+    assert modelo.kappa == 0 and modelo.sigma > 0
+    assert (modelo.niveis, modelo.parametros) == (3, 2) and modelo.r2 < 1
+
+# ==================== Omissão coordenada ====================
+
+PLANO_TIMERS = """<?xml version="1.0" encoding="UTF-8"?>
+<jmeterTestPlan><hashTree><TestPlan testname="Plano"/><hashTree>
+  <ThreadGroup testname="Vazao" enabled="true"><stringProp name="ThreadGroup.num_threads">20</stringProp></ThreadGroup>
+  <hashTree>
+    <ConstantThroughputTimer testname="Alvo" enabled="true">
+      <intProp name="calcMode">2</intProp>
+      <doubleProp><name>throughput</name><value>600.0</value><savedValue>0.0</savedValue></doubleProp>
+    </ConstantThroughputTimer><hashTree/>
+    <HTTPSamplerProxy testname="GET - Listar Livros" enabled="true"/><hashTree/>
+  </hashTree>
+  <ThreadGroup testname="Pausa" enabled="true"><stringProp name="ThreadGroup.num_threads">5</stringProp></ThreadGroup>
+  <hashTree>
+    <UniformRandomTimer testname="Pensar" enabled="true">
+      <stringProp name="ConstantTimer.delay">100</stringProp><stringProp name="RandomTimer.range">200.0</stringProp>
+    </UniformRandomTimer><hashTree/>
+    <HTTPSamplerProxy testname="GET - Listar Livros" enabled="true"/><hashTree/>
+    <HTTPSamplerProxy testname="POST - Criar Livro" enabled="true"/>
+    <hashTree>
+      <ConstantTimer testname="Extra" enabled="true"><stringProp name="ConstantTimer.delay">400</stringProp></ConstantTimer><hashTree/>
+    </hashTree>
+  </hashTree>
+  <ThreadGroup testname="Sem Timers" enabled="true"><stringProp name="ThreadGroup.num_threads">5</stringProp></ThreadGroup>
+  <hashTree>
+    <HTTPSamplerProxy testname="GET - Listar Livros" enabled="true"/><hashTree/>
+  </hashTree>
+</hashTree></hashTree></jmeterTestPlan>
+"""
+
+def test_intervalo_esperado_dos_timers(tmp_path):
+    arquivo = tmp_path / 'timers.jmx'
+    arquivo.write_text(PLANO_TIMERS, encoding='utf-8')
+    plano = analisador.plano_jmx.ler_plano_jmx(arquivo)
+
+    # 600/min divididos entre 20 threads: 30/min por thread, uma a cada 2 s
+    assert (plano['Vazao']['intervalo_ms'], plano['Vazao']['timer']) == (2000, 'vazao')
+    # Uniforme de 100 a 300 ms antes de cada sampler e mais 400 ms só antes do POST
+    assert (plano['Pausa']['intervalo_ms'], plano['Pausa']['timer']) == (400, 'pausa')
+    assert plano['Sem Timers']['intervalo_ms'] is None
+
+def test_omissao_coordenada_usa_intervalo_do_plano():
+    # Uma thread a cada 100 ms; uma resposta de 1 s deixou 9 requisições sem enviar
+    histograma = analisador.HistogramaLatencia.de_valores(np.array([20] * 99 + [1000]))
+
+    planejado = analisador.metricas_omissao_coordenada(histograma, 100)
+    assert (planejado['origem_intervalo'], planejado['amostras_sinteticas']) == ('plano', 9)
+    mediana = analisador.metricas_omissao_coordenada(histograma)
+    assert (mediana['origem_intervalo'], mediana['intervalo_ms']) == ('mediana', 20)
+
+# ==================== Lei de Little ====================
+
+# 100 req/s com 200 ms de média: 20 requisições em andamento durante 60 s
+METRICAS_LITTLE = {
+    'total_requests': 6_000, 'throughput': 100.0, 'avg_response_time': 200.0, 'endpoints': {'GET /a': {}, 'GET /b': {}},
+}
+
+@pytest.mark.parametrize('grupo, razao, diagnostico', [
+    ({'threads': 20}, 1.0, 'consistente'),
+    ({'threads': 40}, 0.5, 'ociosas'),
+    ({'threads': 10}, 2.0, 'acima'),
+    # Ramp-up de toda a duração: em média metade das threads ativas
+    ({'threads': 40, 'ramp_up': 60}, 1.0, 'consistente'),
+])
+def test_lei_little_contra_as_threads_do_plano(grupo, razao, diagnostico):
+    little = analisador.verificar_lei_little(METRICAS_LITTLE, grupo)
+    assert little['concorrencia_medida'] == pytest.approx(20)
+    assert little['razao'] == pytest.approx(razao)
+    assert diagnostico in little['diagnostico']
+
+def test_lei_little_amostras_esperadas():
+    little = analisador.verificar_lei_little(METRICAS_LITTLE, {'threads': 20, 'loops': 150})
+    assert little['amostras_esperadas'] == 20 * 150 * 2
+    assert little['amostras_medidas'] == 6_000
+    assert analisador.verificar_lei_little(METRICAS_LITTLE, {'threads': 20, 'loops': -1})['amostras_esperadas'] is None
+    assert analisador.verificar_lei_little(METRICAS_LITTLE, {}) == {}
+
+# ==================== Taxonomia de erros ====================
+
+@pytest.mark.parametrize('codigo, mensagem, classe', [
+    ('Non HTTP response code: java.net.SocketTimeoutException', 'Read timed out', 'timeout'),
+    ('Non HTTP response code: org.apache.http.NoHttpResponseException', 'failed to respond', 'conexao_recusada'),
+    ('500', '[SQLITE_BUSY] The database file is locked', 'banco_ocupado'),
+    ('503', 'Service Unavailable', 'sobrecarga_http'),
+    ('429', 'Too Many Requests', 'sobrecarga_http'),
+    ('500', 'Internal Server Error', 'http_5xx'),
+    ('404', 'Not Found', 'http_4xx'),
+    ('200', 'Test failed: text expected to contain /livro/', 'assercao'),
+    ('', 'Erro desconhecido', 'outro'),
+])
+def test_classificacao_de_erros(codigo, mensagem, classe):
+    codigo = analisador.normalizar_codigo_resposta(codigo)
+    assert analisador.classificar_erro(codigo, analisador.normalizar_mensagem_erro(mensagem)) == classe
+    assert classe in analisador.NATUREZA_ERRO
+
+def test_erros_agrupados_por_modelo_de_mensagem():
+    inicio = 1_700_000_000_000
+    amostras = [(inicio + i * 100, True, '200', 'OK', None, 'GET /livros') for i in range(600)]
+    # Rajada de timeouts nas janelas 30 a 32 e 404 esparsos com ids diferentes na mensagem
+    amostras += [(inicio + 30_000 + i * 100, False, 'Non HTTP response code: java.net.SocketTimeoutException',
+                  f'Read timed out after {1000 + i} ms', None, 'GET /livros') for i in range(30)]
+    amostras += [(inicio + i * 10_000, False, '404', 'Not Found', f'Livro {i} inexistente', 'GET /livros/{id}')
+                 for i in range(6)]
+    chunk = pd.DataFrame(amostras, columns=['timeStamp', 'success', 'responseCode', 'responseMessage',
+                                            'failureMessage', 'label'])
+    erros = analisador.AcumuladorErros(JANELA_MS)
+    erros.adicionar_chunk(chunk)
+
+    grupos = erros.grupos()
+    assert grupos[['classe', 'natureza', 'contagem']].values.tolist() == [
+        ['timeout', 'capacidade', 30], ['http_4xx', 'defeito', 6],
+    ]
+    # failureMessage tem precedência sobre responseMessage
+    assert grupos['mensagem'].tolist() == ['Read timed out after <n> ms', 'Livro <n> inexistente']
+
+    resumo = erros.resumo()
+    assert resumo['total'] == 36
+    assert resumo['por_classe']['timeout']['percentual'] == pytest.approx(30 / 36 * 100)
+    rajadas = resumo['rajadas']
+    assert [(r['classe'], r['janelas'], r['erros']) for r in rajadas] == [('timeout', 3, 30)]
+    assert erros.serie().sum().to_dict() == {'http_4xx': 6, 'timeout': 30}
+
+# ==================== Gerador de carga ====================
+
+def test_expansao_de_expressoes_jmx():
+    variaveis = {'HOST': 'catalogo', 'busca': 'tolkien'}
+    texto = '/livros/${__Random(1,50)}?q=${busca}&p=${__P(pagina,3)}&h=${__P(HOST)}&x=${desconhecida}'
+
+    expandido = carga.expandir_jmx(texto, variaveis, random.Random(7))
+    assert expandido == carga.expandir_jmx(texto, variaveis, random.Random(7))
+    caminho, consulta = expandido.split('?')
+    assert 1 <= int(caminho.rsplit('/', 1)[1]) <= 50
+    # Variáveis ausentes ficam como o JMeter as deixa; __P sem padrão vira texto vazio
+    assert consulta == 'q=tolkien&p=3&h=catalogo&x=${desconhecida}'
+    assert carga.expandir_jmx('${__P(ausente)}', {}, random.Random()) == ''
+
+def test_requisicao_montada_do_sampler():
+    sampler = {
+        'nome': 'Busca', 'metodo': 'GET', 'protocolo': 'http', 'dominio': '${HOST}', 'porta': '${__P(porta,5000)}',
+        'caminho': '/api/livros', 'parametros': [('q', 'o ${__Random(1,1)}º livro')],
+        'corpo_bruto': False, 'keep_alive': True,
+    }
+    modelo = carga.ModeloRequisicao(sampler, {'HOST': 'catalogo'})
+    requisicao, url = modelo.montar(random.Random())
+    assert url == 'http://catalogo:5000/api/livros?q=o%201%C2%BA%20livro'
+    assert requisicao.startswith(b'GET /api/livros?q=o%201%C2%BA%20livro HTTP/1.1\r\nHost: catalogo:5000\r\n')
+    assert requisicao.endswith(b'\r\n\r\n')
+
+    sampler.update(metodo='POST', parametros=[('', '{"titulo": "${titulo}"}')], corpo_bruto=True)
+    requisicao, _ = carga.ModeloRequisicao(sampler, {'HOST': 'catalogo', 'titulo': 'Duna'}).montar(random.Random())
+    assert b'Content-Type: application/json\r\nContent-Length: 18\r\n' in requisicao
+    assert requisicao.endswith(b'\r\n\r\n{"titulo": "Duna"}')
+
+# ==================== HistoricoExecucoes ====================
+
+def test_historico_registra_e_consulta_execucoes(jtl, tmp_path):
+    df = pd.read_csv(jtl)
+    metade = len(df) // 2
+    execucoes = []
+    for nome, parte in (('primeira', df.iloc[:metade]), ('segunda', df.iloc[metade:])):
+        arquivo = tmp_path / f'{nome}.jtl'
+        parte.to_csv(arquivo, index=False)
+        execucoes.append({'teste': _acumulador(arquivo)})
+
+    historico = analisador.HistoricoExecucoes(tmp_path / 'historico.db')
+    try:
+        primeira = historico.registrar(execucoes[0], rotulo='v1')
+        historico.registrar(execucoes[1], rotulo='v2')
+        # Registrar o mesmo JTL de novo substitui a execução em vez de duplicá-la
+        assert historico.registrar(execucoes[0], rotulo='v1') != primeira
+        assert historico.execucoes()['rotulo'].tolist() == ['v1', 'v2']
+
+        tendencia = historico.tendencia('p95')
+        assert tendencia['rotulo'].tolist() == ['v1', 'v2']
+        esperadas = [e['teste'].metricas() for e in execucoes]
+        assert tendencia['p95'].tolist() == pytest.approx([m['p95'] for m in esperadas])
+        endpoint = next(iter(esperadas[0]['endpoints']))
+        amostras = historico.tendencia('amostras', endpoint=endpoint, cenario='teste')['amostras']
+        assert amostras.tolist() == [m['endpoints'][endpoint]['count'] for m in esperadas]
+
+        assert historico.histograma().total == len(df)
+        ultima = historico.execucoes().index[-1]
+        serie = execucoes[1]['teste'].janelas.serie()
+        janelas = historico.janelas(ultima)
+        assert len(janelas) == len(serie)
+        assert janelas['requisicoes'].sum() == len(df) - metade
+
+        with pytest.raises(ValueError):
+            historico.tendencia('inexistente')
+    finally:
+        historico.fechar()
+
+# ==================== Detecção de anomalias ====================
+
+def _janelas_sinteticas(segundos=180, lentas=(), vazias=()):
+    """AcumuladorJanelas de 50 req/s com 10 threads; lentas e vazias são faixas de segundos perturbadas"""
+    rng = np.random.default_rng(3)
+    inicio = 1_700_000_000_000
+    linhas = []
+    for segundo in range(segundos):
+        quantidade = 5 if any(segundo in faixa for faixa in vazias) else 50
+        offsets = np.sort(rng.integers(0, 1000, quantidade))
+        elapsed = rng.integers(80, 120, quantidade)
+        label = np.where(np.arange(quantidade) % 2, 'GET /livros', 'GET /autores')
+        if any(segundo in faixa for faixa in lentas):
+            elapsed = np.where(label == 'GET /livros', rng.integers(600, 800, quantidade), elapsed)
+        linhas.append(pd.DataFrame({
+            'timeStamp': inicio + segundo * 1000 + offsets, 'elapsed': elapsed, 'label': label,
+            'success': True, 'allThreads': 10,
+        }))
+    janelas = analisador.AcumuladorJanelas(JANELA_MS)
+    janelas.adicionar_chunk(pd.concat(linhas, ignore_index=True))
+    return janelas
+
+def test_anomalias_nao_aparecem_em_serie_estavel():
+    assert analisador.detectar_anomalias(_janelas_sinteticas()) == []
+
+def test_anomalias_de_p99_e_de_throughput():
+    anomalias = analisador.detectar_anomalias(_janelas_sinteticas(lentas=[range(60, 65)], vazias=[range(120, 124)]))
+    assert [(a['tipos'], a['janelas']) for a in anomalias] == [(['p99'], 5), (['throughput'], 4)]
+
+    pico, queda = anomalias
+    assert pico['p99_pico'] >= 600 > 2 * pico['p99_referencia']
+    assert [e['endpoint'] for e in pico['endpoints']] == ['GET /livros']
+    assert queda['throughput_minimo'] == pytest.approx(5) and queda['throughput_referencia'] == pytest.approx(50)
+    assert queda['threads'] == 10
+
+# ==================== Heatmap de latência ====================
+
+def test_faixas_logaritmicas_de_latencia():
+    tempos = np.array([0, 1, 9, 10, 99, 100, 999, 1000, 1001, 60_000])
+    faixas = analisador.faixas_latencia(tempos)
+    assert faixas.tolist() == [0, 0, 9, 10, 19, 20, 29, 30, 30, 47]
+
+    tempos = np.arange(1, 100_000)
+    faixas = analisador.faixas_latencia(tempos)
+    assert (analisador.limites_faixas(faixas) <= tempos + 1e-9).all()
+    assert (tempos < analisador.limites_faixas(faixas + 1) - 1e-9).all()
+
+def test_heatmap_conta_todas_as_amostras(jtl):
+    acumulador = _acumulador(jtl)
+    heatmap = acumulador.heatmap()
+    assert heatmap['contagem'].sum() == acumulador.total
+    assert heatmap.attrs['janela_ms'] == JANELA_MS
+
+    serie = acumulador.janelas.serie()
+    por_janela = heatmap.groupby('janela')['contagem'].sum()
+    requisicoes = serie['requisicoes'][serie['requisicoes'] > 0]
+    assert por_janela.tolist() == requisicoes.tolist()
+    assert (por_janela.index * JANELA_MS).tolist() == requisicoes.index.as_unit('ms').asi8.tolist()
+
+def test_grade_do_heatmap_agrupa_janelas_acima_do_limite():
+    janelas = 3 * analisador.COLUNAS_MAXIMAS_HEATMAP
+    tabela = pd.DataFrame({'janela': np.arange(janelas), 'faixa': 20 + np.arange(janelas) % 5, 'contagem': 2})
+    bordas_x, bordas_y, grade = analisador.GeradorGraficos._grade_heatmap(tabela, JANELA_MS, (0, janelas - 1), (20, 24))
+    assert grade.shape == (5, analisador.COLUNAS_MAXIMAS_HEATMAP)
+    assert grade.sum() == 2 * janelas
+    assert len(bordas_x) == grade.shape[1] + 1 and (bordas_x[1] - bordas_x[0]).total_seconds() == 3
+    assert bordas_y[[0, -1]].tolist() == pytest.approx([100, 10 ** 2.5])
+
+# ==================== PerfilEtapas ====================
+
+@pytest.mark.parametrize('reset_peak', [True, False])
+def test_perfil_pico_de_etapas_aninhadas(monkeypatch, reset_peak):
+    if not reset_peak:
+        # Python < 3.9: o pico é zerado reiniciando o tracemalloc
+        monkeypatch.delattr(analisador.tracemalloc, 'reset_peak')
+    perfil = analisador.PerfilEtapas().iniciar()
+    try:
+        with perfil.etapa('externa'):
+            externo = bytearray(8 * 2**20)
+            with perfil.etapa('interna'):
+                interno = bytearray(4 * 2**20)
+                del interno
+            del externo
+    finally:
+        perfil.finalizar()
+
+    assert perfil.etapas['interna']['pico_mb'] == pytest.approx(4, abs=0.5)
+    assert perfil.etapas['externa']['pico_mb'] == pytest.approx(12, abs=0.5)
+
+# ==================== JTLDistribuido ====================
+
+DESLOCAMENTOS_NOS = [0, 1234, -870]  # Relógio de cada nó em relação ao primeiro (ms)
+ATRASOS_INICIO_NOS = [0, 300, -150]  # Nós começam em instantes diferentes: o início sozinho erraria o deslocamento
+
+def _gravar_nos(diretorio, semente=3):
+    """JTLs de três nós contra o mesmo servidor, com pausas (GC) que atingem todos ao mesmo tempo"""
+    rng = np.random.default_rng(semente)
+    inicio, duracao = 1_760_000_000_000, 120_000
+    pausas = np.sort(rng.uniform(inicio, inicio + duracao, 40))
+    duracoes = rng.uniform(200, 900, len(pausas))
+
+    arquivos = []
+    for no, (deslocamento, atraso) in enumerate(zip(DESLOCAMENTOS_NOS, ATRASOS_INICIO_NOS)):
+        envios = np.sort(rng.uniform(inicio + atraso, inicio + duracao, 15_000))
+        tempos = rng.lognormal(np.log(20), 0.3, len(envios))
+        # Uma requisição enviada durante uma pausa espera o fim dela
+        indice = np.searchsorted(pausas, envios, side='right') - 1
+        dentro = (indice >= 0) & (envios < pausas[np.maximum(indice, 0)] + duracoes[np.maximum(indice, 0)])
+        tempos[dentro] += (pausas[indice] + duracoes[indice] - envios)[dentro]
+        arquivo = diretorio / f'no{no}.jtl'
+        pd.DataFrame({
+            'timeStamp': envios.astype(np.int64) + deslocamento,
+            'elapsed': tempos.astype(np.int64),
+            'label': 'GET - Listar Livros',
+            'responseCode': '200',
+            'threadName': f'1. Carga no{no} 1-1',
+            'success': 'true',
+            'allThreads': 30,
+        }).to_csv(arquivo, index=False)
+        arquivos.append(arquivo)
+    return arquivos
+
+def test_distribuido_estima_deslocamentos(tmp_path):
+    distribuido = analisador.JTLDistribuido(_gravar_nos(tmp_path))
+    nos = distribuido.estimar_deslocamentos()
+
+    assert [no['metodo'] for no in nos] == ['referencia', 'correlacao', 'correlacao']
+    estimados = [no['deslocamento_ms'] for no in nos]
+    assert estimados == pytest.approx(DESLOCAMENTOS_NOS, abs=JANELA_MS / 10)
+
+def test_distribuido_mescla_em_ordem(tmp_path):
+    arquivos = _gravar_nos(tmp_path)
+    distribuido = analisador.JTLDistribuido(arquivos, deslocamentos=DESLOCAMENTOS_NOS)
+
+    chunks = list(distribuido.iterar_chunks(tamanho_chunk=2_000))
+    timestamps = np.concatenate([c['timeStamp'].to_numpy() for c in chunks])
+    assert len(chunks) > 1
+    assert len(timestamps) == sum(len(pd.read_csv(a)) for a in arquivos)
+    assert (np.diff(timestamps) >= 0).all()
+    # Sem deslocamento o nó 1 ficaria 1234 ms à frente dos outros
+    assert timestamps.min() == min(pd.read_csv(a)['timeStamp'].min() - d for a, d in zip(arquivos, DESLOCAMENTOS_NOS))